@@ -0,0 +1,247 @@
+"""CSC111 Winter 2021 Project, BitBoard file
+
+This file contains the BitBoard class, an alternate implementation of
+the Board class that stores each player's pieces as Python int bitboards.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from __future__ import annotations
+from typing import Optional
+
+import copy
+
+from board import Board, _UNKNOWN
+from zobrist import SIDE_KEY
+
+
+class BitBoard(Board):
+    """A bitboard representation of the board in Connect X
+
+    Every column takes up size + 1 bits. Bit col * (size + 1) + k is the
+    k-th cell from the bottom of column col, which is self.board[size - 1 - k][col].
+    The extra padding bit at the top of each column is always empty, so shifting
+    a line of pieces can never wrap around into the next column.
+
+    The board attribute is read only: it is built from the bitboards the first time
+    it is read after a move, and pieces can only be placed with drop_piece.
+
+    Instance Attributes:
+        - bitboards: bitboards[0] holds every occupied cell, bitboards[1] holds
+        the red pieces and bitboards[2] holds the yellow pieces
+
+    Representation Invariants:
+        - self.bitboards[0] == self.bitboards[1] | self.bitboards[2]
+        - self.bitboards[1] & self.bitboards[2] == 0
+    """
+    bitboards: list[int]
+
+    # Private Instance Attributes:
+    #   - _column_height: the number of bits used for each column (size + 1)
+    #   - _column_mask: the bits of the first column, excluding the padding bit
+    #   - _bottom_mask: the bottom cell of every column
+    #   - _board_mask: every cell on the board, excluding the padding bits
+    #   - _line_masks: _line_masks[i] has the bits of the cells in self.winning_lines.lines[i]
+    #   - _grid: the value of self.board, or None if it has changed since it was last built
+    _column_height: int
+    _column_mask: int
+    _bottom_mask: int
+    _board_mask: int
+    _line_masks: list[int]
+    _grid: Optional[tuple[tuple[int, ...], ...]]
+
+    def __init__(self, size: int) -> None:
+        """Initialize the board as an empty size x size bitboard
+
+        Preconditions:
+            - size >= 7
+        """
+        self._column_height = size + 1
+        self._column_mask = (1 << size) - 1
+        self._bottom_mask = 0
+        for col in range(size):
+            self._bottom_mask |= 1 << (col * self._column_height)
+        self._board_mask = self._bottom_mask * self._column_mask
+
+        # Board.__init__ assigns self.board, and the setter needs the size of the
+        # board to find the bit of each cell
+        self.size = size
+        self.bitboards = [0, 0, 0]
+        Board.__init__(self, size)
+
+        self._line_masks = []
+        for line in self.winning_lines.lines:
+            mask = 0
+            for cell in line:
+                mask |= 1 << self._bit_index(cell // size, cell % size)
+            self._line_masks.append(mask)
+
+    @property
+    def board(self) -> tuple[tuple[int, ...], ...]:
+        """Return the state of the board as a two dimensional tuple, the same
+        layout that Board uses.
+
+        The tuple is kept until the next move, so reading it again is free.
+        """
+        if self._grid is None:
+            grid = []
+            for row in range(self.size):
+                shift = self.size - 1 - row
+                grid.append(tuple(
+                    1 if self.bitboards[1] >> (col * self._column_height + shift) & 1
+                    else 2 if self.bitboards[2] >> (col * self._column_height + shift) & 1
+                    else 0 for col in range(self.size)))
+            self._grid = tuple(grid)
+
+        return self._grid
+
+    @board.setter
+    def board(self, grid: list[list[int]]) -> None:
+        """Load the pieces of a two dimensional list into the bitboards."""
+        self.bitboards = [0, 0, 0]
+        self._grid = None
+        for row in range(len(grid)):
+            for col in range(len(grid[row])):
+                if grid[row][col] != 0:
+                    bit = 1 << self._bit_index(row, col)
+                    self.bitboards[grid[row][col]] |= bit
+                    self.bitboards[0] |= bit
+
+    def _bit_index(self, row: int, col: int) -> int:
+        """Return the index of the bit that represents self.board[row][col]"""
+        return col * self._column_height + self.size - 1 - row
+
+    def drop_piece(self, row: int, col: int, piece: int) -> None:
+        """Set the bit for (row, col) in the bitboard of the given piece,
+        indicating that a piece has been dropped there."""
+        bit = 1 << self._bit_index(row, col)
+        self.bitboards[piece] |= bit
+        self.bitboards[0] |= bit
+        self._grid = None
+        self._heights[col] += 1
+        self._num_pieces += 1
+        # Changes who is active
+        self.is_red_active = not self.is_red_active
+        self.last_move = (row, col)
+        self.zobrist_hash ^= self._zobrist[piece][row][col] ^ SIDE_KEY
+        self.mirror_hash ^= self._zobrist[piece][row][self.size - 1 - col] ^ SIDE_KEY
+        self._winner = _UNKNOWN
+
+        # The win flags are not used, since winning_move checks the whole bitboard
+        self._move_stack.append((row, col, piece, False))
+
+    def undo_move(self) -> tuple[int, int]:
+        """Take back the most recently dropped piece and return its (row, col).
+
+        Preconditions:
+            - self.last_move is not None
+        """
+        row, col, piece, _ = self._move_stack.pop()
+
+        bit = 1 << self._bit_index(row, col)
+        self.bitboards[piece] ^= bit
+        self.bitboards[0] ^= bit
+        self._grid = None
+        self._heights[col] -= 1
+        self._num_pieces -= 1
+        self.is_red_active = not self.is_red_active
+        self.last_move = self._move_stack[-1][:2] if self._move_stack else None
+        self.zobrist_hash ^= self._zobrist[piece][row][col] ^ SIDE_KEY
+        self.mirror_hash ^= self._zobrist[piece][row][self.size - 1 - col] ^ SIDE_KEY
+        self._winner = _UNKNOWN
+
+        return (row, col)
+
+    def clone(self) -> BitBoard:
+        """Return an independent copy of this board.
+
+        The bitboards are ints, so only the lists holding them need to be copied.
+        """
+        new_board = copy.copy(self)
+        new_board.bitboards = self.bitboards[:]
+        self._copy_move_state(new_board)
+        return new_board
+
+    def get_valid_moves(self) -> list[tuple[int, int]]:
+        """Return a list of all valid moves from the current position."""
+        mask = self.bitboards[0]
+
+        # Adding the bottom bit of every column carries up through the
+        # occupied cells and lands on the lowest empty cell of each column.
+        # A full column carries into its padding bit, which the board mask removes.
+        open_cells = (mask + self._bottom_mask) & ~mask & self._board_mask
+
+        valid_moves = []
+        while open_cells:
+            lowest = open_cells & -open_cells
+            col, k = divmod(lowest.bit_length() - 1, self._column_height)
+            valid_moves.append((self.size - 1 - k, col))
+            open_cells ^= lowest
+
+        return valid_moves
+
+    def get_next_open_row(self, col: int) -> Optional[int]:
+        """Return the index of the next open row in the given column"""
+        column = (self.bitboards[0] >> (col * self._column_height)) & self._column_mask
+
+        # The lowest zero bit of the column is the next open cell
+        k = ((column + 1) & ~column).bit_length() - 1
+        if k == self.size:
+            return None
+
+        return self.size - 1 - k
+
+    def winning_move(self, piece: int) -> bool:
+        """Return whether a winning move was made by the color
+        corresponding to piece"""
+        bits = self.bitboards[piece]
+
+        # Vertical, horizontal, negatively sloped and positively sloped lines
+        for shift in (1, self._column_height, self._column_height - 1,
+                      self._column_height + 1):
+            if _has_line(bits, shift, self._connect):
+                return True
+
+        return False
+
+    def get_line_counts(self, piece: int) -> list[int]:
+        """Return the number of pieces of the color corresponding to piece in each
+        line of self.winning_lines, in the same order as self.winning_lines.lines."""
+        bits = self.bitboards[piece]
+        return [bin(bits & mask).count('1') for mask in self._line_masks]
+
+
+def _has_line(bits: int, shift: int, length: int) -> bool:
+    """Return whether bits contains length set bits in a row, where consecutive
+    bits of the line are shift positions apart.
+
+    Each pass doubles the length of the runs that are kept, so only
+    O(log length) shifts are needed.
+
+    Preconditions:
+        - length >= 1
+    """
+    run = 1
+    while run * 2 <= length:
+        bits &= bits >> (run * shift)
+        run *= 2
+
+    if run < length:
+        bits &= bits >> ((length - run) * shift)
+
+    return bits != 0
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'zobrist'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -3,6 +3,10 @@
 This file contains the Board class that will be used
 in the Connect X game
 
+This file only contains the rules of the game and does not import pygame
+or plotly, so the players can be used without any of the rendering code
+(see rendering.py).
+
 Copyright and Usage Information
 ===============================
 
@@ -11,15 +15,19 @@ Corresponding Youtube Tutorial: https://youtube.com/watch?v=XpYz-q1lxu8&t=154s
 
 This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
 Kevin Vaidyan, and Akash Illangovan."""
+from __future__ import annotations
 from typing import Optional
 
+import copy
 import pprint
-import pygame
-
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 from constants import *
+from lines import get_winning_lines, WinningLines
+from symmetry import mirror_move
+from zobrist import get_zobrist_table, SIDE_KEY
+
+# Marks a cached winner that needs to be recomputed
+_UNKNOWN = 'Unknown'
 
 
 class Board:
@@ -32,6 +40,12 @@ class Board:
         - width: The width of the game board
         - height: The height of the game board
         - is_red_active: If red is currently active or not
+        - last_move: The (row, col) of the most recently dropped piece, or None
+        if no piece has been dropped
+        - zobrist_hash: The 64-bit Zobrist hash of the current position
+        - mirror_hash: The Zobrist hash of the mirror image of the current position
+        - winning_lines: The table of every winning line for this size of board,
+        shared by every board of the same size
 
     Representation Invariants:
         - self.size >= 7
@@ -41,6 +55,33 @@ class Board:
     width: int
     height: int
     is_red_active: bool
+    last_move: Optional[tuple[int, int]]
+    zobrist_hash: int
+    mirror_hash: int
+    winning_lines: WinningLines
+
+    # Private Instance Attributes:
+    #   - _connect: the number of pieces in a row needed to win
+    #   - _wins: _wins[piece] is True if piece has connected _connect pieces
+    #       in a row (index 0 is unused)
+    #   - _line_counts: _line_counts[piece][i] is the number of pieces of the given
+    #       colour in self.winning_lines.lines[i] (index 0 is unused)
+    #   - _winner: the cached result of get_winner, or _UNKNOWN if it has not
+    #       been computed since the last drop_piece
+    #   - _heights: _heights[col] is the number of pieces in column col
+    #   - _num_pieces: the number of pieces on the board
+    #   - _move_stack: the (row, col, piece, made_win) of every dropped piece in order,
+    #       where made_win is True if that piece set its colour's win flag
+    #   - _zobrist: the Zobrist table for this size of board, shared by every board
+    #       of the same size
+    _connect: int
+    _wins: list[bool]
+    _line_counts: list[list[int]]
+    _winner: Optional[str]
+    _heights: list[int]
+    _num_pieces: int
+    _move_stack: list[tuple[int, int, int, bool]]
+    _zobrist: list[list[list[int]]]
 
     def __init__(self, size: int) -> None:
         """Initialize the board as a size x size board
@@ -58,166 +99,190 @@ class Board:
         self.width = self.size * SQUARESIZE
         self.height = (self.size + 1) * SQUARESIZE
         self.is_red_active = True
+        self.last_move = None
+
+        self.winning_lines = get_winning_lines(size)
+        self._connect = self.winning_lines.connect
+        self._wins = [False, False, False]
+        self._line_counts = [[], [0] * len(self.winning_lines.lines),
+                             [0] * len(self.winning_lines.lines)]
+        self._winner = _UNKNOWN
+
+        self._heights = [0] * size
+        self._num_pieces = 0
+        self._move_stack = []
+
+        self._zobrist = get_zobrist_table(size)
+        self.zobrist_hash = 0
+        self.mirror_hash = 0
 
     def drop_piece(self, row: int, col: int, piece: int) -> None:
         """Change the value at self.board[row][col] to correspond to piece
-        indicating that a piece has been dropped there."""
+        indicating that a piece has been dropped there.
+
+        Preconditions:
+            - row == self.get_next_open_row(col)
+        """
         # Replaces the 0 with the corresponding piece
         self.board[row][col] = piece
+        self._heights[col] += 1
+        self._num_pieces += 1
         # Changes who is active
         self.is_red_active = not self.is_red_active
+        self.last_move = (row, col)
+        self.zobrist_hash ^= self._zobrist[piece][row][col] ^ SIDE_KEY
+        self.mirror_hash ^= self._zobrist[piece][row][self.size - 1 - col] ^ SIDE_KEY
+
+        # Any new line of pieces must pass through the piece that was just dropped,
+        # so only the counts of the lines through (row, col) need to be updated
+        counts = self._line_counts[piece]
+        made_win = False
+        for line in self.winning_lines.cell_lines[row * self.size + col]:
+            counts[line] += 1
+            if counts[line] == self._connect:
+                made_win = not self._wins[piece]
+        if made_win:
+            self._wins[piece] = True
+        self._winner = _UNKNOWN
+
+        self._move_stack.append((row, col, piece, made_win))
+
+    def undo_move(self) -> tuple[int, int]:
+        """Take back the most recently dropped piece and return its (row, col).
 
-    def get_valid_moves(self) -> list[tuple[int, int]]:
-        """Return a list of all valid moves from the current position."""
+        Preconditions:
+            - self.last_move is not None
+        """
+        row, col, piece, made_win = self._move_stack.pop()
+
+        self.board[row][col] = 0
+        self._heights[col] -= 1
+        self._num_pieces -= 1
+        self.is_red_active = not self.is_red_active
+        self.last_move = self._move_stack[-1][:2] if self._move_stack else None
+        self.zobrist_hash ^= self._zobrist[piece][row][col] ^ SIDE_KEY
+        self.mirror_hash ^= self._zobrist[piece][row][self.size - 1 - col] ^ SIDE_KEY
 
-        # Check if the top of the board has a 0. If it has a 0, then
-        # this column is a valid move. If it is not a 0, that means
-        # the entire column is filled.
-        valid_col_indices = []
-        for i in range(len(self.board[0])):
-            if self.board[0][i] == 0:
-                valid_col_indices.append(i)
+        counts = self._line_counts[piece]
+        for line in self.winning_lines.cell_lines[row * self.size + col]:
+            counts[line] -= 1
+        if made_win:
+            self._wins[piece] = False
+        self._winner = _UNKNOWN
 
-        # Find the corresponding row for each valid column.
-        valid_moves = []
-        for column in valid_col_indices:
-            open_row = self.get_next_open_row(column)
-            valid_moves.append((open_row, column))
+        return (row, col)
 
-        return valid_moves
+    def canonical_hash(self) -> int:
+        """Return the hash shared by the current position and its mirror image.
+
+        Use self.to_canonical and self.from_canonical to translate moves
+        stored under this hash.
+        """
+        return min(self.zobrist_hash, self.mirror_hash)
+
+    def is_mirrored(self) -> bool:
+        """Return whether the canonical position is the mirror image of the
+        current position."""
+        return self.mirror_hash < self.zobrist_hash
+
+    def to_canonical(self, move: tuple[int, int]) -> tuple[int, int]:
+        """Return the move in the canonical position that corresponds to
+        move in the current position."""
+        if self.is_mirrored():
+            return mirror_move(move, self.size)
+        return move
+
+    def from_canonical(self, move: tuple[int, int]) -> tuple[int, int]:
+        """Return the move in the current position that corresponds to
+        move in the canonical position."""
+        # Mirroring is its own inverse
+        return self.to_canonical(move)
+
+    def clone(self) -> Board:
+        """Return an independent copy of this board.
+
+        Only the flat lists that make up the state of the board are copied,
+        which is much faster than copy.deepcopy.
+        """
+        new_board = copy.copy(self)
+        new_board.board = [row[:] for row in self.board]
+        self._copy_move_state(new_board)
+        return new_board
+
+    def get_moves(self) -> list[tuple[int, int, int]]:
+        """Return the (row, col, piece) of every piece dropped on this board, in order.
+
+        Dropping the same pieces on an empty board gives a board equal to this one.
+        """
+        return [move[:3] for move in self._move_stack]
+
+    def _copy_move_state(self, new_board: Board) -> None:
+        """Give new_board its own copies of the lists that drop_piece
+        and undo_move update."""
+        new_board._wins = self._wins[:]
+        new_board._line_counts = [[], self._line_counts[1][:], self._line_counts[2][:]]
+        new_board._heights = self._heights[:]
+        new_board._move_stack = self._move_stack[:]
+
+    def get_valid_moves(self) -> list[tuple[int, int]]:
+        """Return a list of all valid moves from the current position."""
+
+        # A column is a valid move if it is not filled. The open row
+        # sits directly above the pieces already in the column.
+        return [(self.size - 1 - height, col) for col, height in enumerate(self._heights)
+                if height < self.size]
 
     def get_next_open_row(self, col: int) -> Optional[int]:
         """Return the index of the next open row in the given column"""
 
-        # For the given column, start at the bottom and iterate up
-        # until a 0 is found. This is the index of the next open row
-        # for this column
-        for row in range(self.size - 1, -1, -1):
-            if self.board[row][col] == 0:
-                return row
+        # The next open row is directly above the top piece of the column
+        height = self._heights[col]
+        if height == self.size:
+            return None
 
-        return None
+        return self.size - 1 - height
 
     def winning_move(self, piece: int) -> bool:
         """Return whether a winning move was made by the color
         corresponding to piece"""
-        N = int((self.size - 4) - (self.size % 7) / 2)
-        for c in range(self.size - N):
-            for r in range(self.size):
-                if all(self.board[r][c + n] == piece for n in range(N + 1)):
-                    return True
-
-        # Check vertical locations for win
-        for c in range(self.size):
-            for r in range(self.size - N):
-                if all(self.board[r + n][c] == piece for n in range(N + 1)):
-                    return True
-
-        # Check positively sloped diagonals
-        for c in range(self.size - N):
-            for r in range(self.size - N):
-                if all(self.board[r + n][c + n] == piece for n in range(N + 1)):
-                    return True
-
-        # Check negatively sloped diagonals
-        for c in range(self.size - N):
-            for r in range(N, self.size):
-                if all(self.board[r - n][c + n] == piece for n in range(N + 1)):
-                    return True
-
-        return False
+        return self._wins[piece]
+
+    def get_line_counts(self, piece: int) -> list[int]:
+        """Return the number of pieces of the color corresponding to piece in each
+        line of self.winning_lines, in the same order as self.winning_lines.lines.
+
+        The returned list belongs to the board and must not be changed.
+        """
+        return self._line_counts[piece]
+
+    def count_empty_cells(self) -> int:
+        """Return the number of empty cells left on the board."""
+        return self.size * self.size - self._num_pieces
 
     def get_winner(self) -> Optional[str]:
         """Checks if the current game state has a winner or is a draw.
 
-        Return None if the game has not ended."""
+        Return None if the game has not ended. The result is cached
+        until the next piece is dropped."""
+        if self._winner is not _UNKNOWN:
+            return self._winner
+
         if self.winning_move(1):
-            return 'Red'
+            self._winner = 'Red'
         elif self.winning_move(2):
-            return 'Yellow'
-        # if no valid moves remain
-        elif self.get_valid_moves() == []:
-            return 'Draw'
+            self._winner = 'Yellow'
+        # if every cell has been filled, no valid moves remain
+        elif self._num_pieces == self.size * self.size:
+            self._winner = 'Draw'
         else:
-            return None
+            self._winner = None
+
+        return self._winner
 
     def print_board(self) -> None:
         """Print the board in matrix style to the console"""
         pprint.pprint(self.board)
 
-    def draw_board(self, screen: pygame.Surface) -> None:
-        """Draw the current board on the given pygame screen"""
-
-        # Draw an empty board
-        for c in range(self.size):
-            for r in range(self.size):
-                pygame.draw.rect(screen, BLUE, (c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE,
-                                                SQUARESIZE, SQUARESIZE))
-                pygame.draw.circle(screen, BLACK, (
-                    int(c * SQUARESIZE + SQUARESIZE / 2),
-                    int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-
-        # Iterate through the board instance attribute to determine where
-        # to draw the pieces that have been dropped
-        for c in range(self.size):
-            for r in range(self.size):
-                if self.board[r][c] == 1:
-                    pygame.draw.circle(screen, RED, (
-                        int(c * SQUARESIZE + SQUARESIZE / 2),
-                        self.height - int((self.size - r - 1)
-                                          * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-                elif self.board[r][c] == 2:
-                    pygame.draw.circle(screen, YELLOW, (
-                        int(c * SQUARESIZE + SQUARESIZE / 2), self.height - int(
-                            (self.size - r - 1) * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-        pygame.display.update()
-
-
-#
-# def run_games(n: int, red: Player, yellow: Player, game_state: Board, show_stats: bool = True) \
-#       -> None:
-#     """Run n games using the given Players.
-#     """
-#     stats = {'Red': 0, 'Yellow': 0, 'Draw': 0}
-#     results = []
-#     for i in range(0, n):
-#         winner, _ = run_game(red, yellow, game_state)
-#         stats[winner] += 1
-#         results.append(winner)
-#
-#         print(f'Game {i} winner: {winner}')
-#
-#     for outcome in stats:
-#         print(f'{outcome}: {stats[outcome]}/{n} ({100.0 * stats[outcome] / n:.2f}%)')
-#
-#     if show_stats:
-#         plot_game_statistics(results)
-
-
-def plot_game_statistics(results: list[str]) -> None:
-    """Plot the outcomes and win probabilities for a given list of Minichess game results.
-    """
-    outcomes = [1 if result == 'Red' else 0 for result in results]
-
-    cumulative_win_probability = [sum(outcomes[0:i]) / i for i in range(1, len(outcomes) + 1)]
-    rolling_win_probability = \
-        [sum(outcomes[max(i - 50, 0):i]) / min(50, i) for i in range(1, len(outcomes) + 1)]
-
-    fig = make_subplots(rows=2, cols=1)
-    fig.add_trace(go.Scatter(y=outcomes, mode='markers',
-                             name='Outcome (1 = Red win, 0 = Draw/Yellow win)'),
-                  row=1, col=1)
-    fig.add_trace(go.Scatter(y=cumulative_win_probability, mode='lines',
-                             name='Red win percentage (cumulative)'),
-                  row=2, col=1)
-    fig.add_trace(go.Scatter(y=rolling_win_probability, mode='lines',
-                             name='Red win percentage (most recent 50 games)'),
-                  row=2, col=1)
-    fig.update_yaxes(range=[0.0, 1.0], row=2, col=1)
-
-    fig.update_layout(title='Connect X Game Results', xaxis_title='Game')
-    fig.show()
-
 
 if __name__ == '__main__':
     import python_ta
@@ -225,7 +290,7 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
                           'pprint', 'plotly', 'players', 'tree_generation',
-                          'game_tree', 'copy', 'random', 'menu'],
+                          'game_tree', 'copy', 'random', 'menu', 'lines', 'symmetry', 'zobrist'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['R1705', 'C0200', 'E1136', 'E9999']
@@ -13,11 +13,29 @@ This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
 Kevin Vaidyan, and Akash Illangovan."""
 import sys
 import math
+import threading
+import time
+from typing import Optional
+
 import pygame
 from constants import *
 from board import Board
-from players import RandomPlayer, MonteCarloFreeVersion, SabotagePlayer, ExploringPlayer
+from rendering import draw_board
+from players import Player, RandomPlayer, MonteCarloFreeVersion, SabotagePlayer, \
+    ExploringPlayer, MCTSPlayer, NegamaxPlayer
 import tree_generation
+from rollouts import tactical_policy
+
+# The AIs that are given a time budget for each move, and how much the
+# sidebar buttons change that budget by (in milliseconds)
+TIMED_AIS = {'Sabotage', 'Conte Marlo', 'MCTS', 'Negamax'}
+DEFAULT_TIME_PER_MOVE = 1000
+TIME_PER_MOVE_STEP = 250
+
+# The AIs that think on the user's time, and the least time they are given
+# to finish their move once the user has moved (in milliseconds)
+PONDERING_AIS = {'MCTS', 'Negamax'}
+MIN_TIME_AFTER_PONDERING = 100
 
 
 def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
@@ -37,7 +55,7 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
     screen = pygame.display.set_mode(size)
     screen.fill(BLACK)
 
-    new_board.draw_board(screen)
+    draw_board(new_board, screen)
 
     # Create the fonts for the score text and quit button
     myfont = pygame.font.SysFont('monospace', 17)
@@ -101,7 +119,8 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
                     col = int(math.floor(posx / SQUARESIZE))
                     row = new_board.get_next_open_row(col)
 
-                    if (row, col) in new_board.get_valid_moves():
+                    # A full column has no open row
+                    if row is not None:
                         new_board.drop_piece(row, col, 1)
                         pygame.display.update()
 
@@ -113,7 +132,7 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
                         if new_board.winning_move(1):
                             label = myfont.render("Player 1 wins!!", True, RED)
                             screen.blit(label, (10, 10))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 1
@@ -123,7 +142,7 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
                         elif new_board.get_valid_moves() == []:
                             label = myfont.render("Tie!", True, (255, 255, 255))
                             screen.blit(label, (10, 10))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 0
@@ -134,8 +153,8 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
                     col = int(math.floor(posx / SQUARESIZE))
                     row = new_board.get_next_open_row(col)
 
-                    if (row, col) in new_board.get_valid_moves():
-                        row = new_board.get_next_open_row(col)
+                    # A full column has no open row
+                    if row is not None:
                         new_board.drop_piece(row, col, 2)
                         pygame.display.update()
 
@@ -146,20 +165,20 @@ def main(game_size: int, p1_wins: int, p2_wins: int, draws: int) -> int:
                         if new_board.winning_move(2):
                             label = myfont.render("Player 2 wins!!", True, YELLOW)
                             screen.blit(label, (10, 10))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 2
 
                         elif new_board.get_winner() == 'Draw':
                             label = myfont.render("Tie!", True, (255, 255, 255))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             screen.blit(label, (10, 10))
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 0
 
-                new_board.draw_board(screen)
+                draw_board(new_board, screen)
 
                 turn = (turn + 1) % 2
 
@@ -190,28 +209,42 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
     new_board = Board(game_size)
     previous_move = '*'
     game_over = False
-    number_of_mc_sims = 200
+    time_per_move_ms = DEFAULT_TIME_PER_MOVE
+    # the background search of the ai while the user is thinking, if there is one
+    pondering = None
+    pondered_ms = 0
 
     # initialize the ai
     if ai == 'Random':
         ai_player = RandomPlayer()
 
     elif ai == 'Exploring':
-        exploring_tree = tree_generation.run_learning_algorithm(PROBABILITIES, game_size)[0]
-        ai_player = ExploringPlayer(exploring_tree, 1.0)
+        exploring_tree = tree_generation.get_learned_tree(PROBABILITIES, game_size,
+                                                          symmetric=True)
+        ai_player = ExploringPlayer(exploring_tree, 1.0, symmetric=True)
 
     elif ai == 'Sabotage':
         ai_player = SabotagePlayer()
 
+    elif ai == 'MCTS':
+        # Rollouts that take wins and make blocks tell moves apart in far fewer games
+        ai_player = MCTSPlayer(rollout_policy=tactical_policy)
+
+    elif ai == 'Negamax':
+        ai_player = NegamaxPlayer()
+
     else:
-        ai_player = MonteCarloFreeVersion()
+        # Simulate with NumPy on every core so that tens of thousands of
+        # simulations stay responsive
+        ai_player = MonteCarloFreeVersion(vectorised_rollouts=True, workers=None,
+                                          adaptive=True)
 
     # Initialize the pygame screen for the game
     size = (new_board.width + 300, new_board.height)
     screen = pygame.display.set_mode(size)
     screen.fill(BLACK)
 
-    new_board.draw_board(screen)
+    draw_board(new_board, screen)
 
     # Draw the quit button and Win/Loss/Draw ratios for each player
     myfont = pygame.font.SysFont('monospace', 17)
@@ -230,16 +263,16 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                                  True, (255, 255, 0))
     screen.blit(text_surface, (new_board.width + 20, 160))
 
-    if ai == 'Conte Marlo':
+    if ai in TIMED_AIS:
         # Since the AI will always go first, we draw the calculating move text
-        # As well as the buttons to modify the number if simulations
+        # As well as the buttons to modify the time per move
         text_surface = myfont.render('Calculating Move...', True, (255, 255, 255))
         screen.blit(text_surface, (new_board.width + 20, 200))
 
         pygame.draw.rect(screen, (0, 255, 0), (new_board.width + 30, 280, 30, 30), 0, 3)
         pygame.draw.rect(screen, (255, 0, 0), (new_board.width + 90, 280, 30, 30), 0, 3)
 
-        text_surface = myfont.render(f'Number of Simulations: {number_of_mc_sims}', True,
+        text_surface = myfont.render(f'Time per Move: {time_per_move_ms} ms', True,
                                      (255, 255, 255))
         screen.blit(text_surface, (new_board.width + 20, 240))
 
@@ -289,9 +322,12 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                     col = int(math.floor(posx / SQUARESIZE))
                     row = new_board.get_next_open_row(col)
 
-                    if (row, col) in new_board.get_valid_moves():
+                    # A full column has no open row
+                    if row is not None:
                         new_board.drop_piece(row, col, 2)
                         previous_move = (row, col)
+                        pondered_ms = stop_pondering(pondering)
+                        pondering = None
                         pygame.display.update()
                         sound_obj = pygame.mixer.Sound('drop_sound.wav')
                         sound_obj.set_volume(0.4)
@@ -300,7 +336,7 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                         if new_board.winning_move(2):
                             label = myfont.render("Player 2 wins!!", True, YELLOW)
                             screen.blit(label, (10, 10))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 2
@@ -309,18 +345,18 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                         # the winner is not declared, then it must be a tie
                         elif new_board.get_winner() == 'Draw':
                             label = myfont.render("Tie!", True, (255, 255, 255))
-                            new_board.draw_board(screen)
+                            draw_board(new_board, screen)
                             screen.blit(label, (10, 10))
                             pygame.time.wait(1000)
                             pygame.mixer.music.set_volume(0.5)
                             return 0
 
-                    new_board.draw_board(screen)
+                    draw_board(new_board, screen)
 
                     # Once the user the drops their piece, it will be the AI's turn
-                    # We draw the text 'Calculating Move' for Monte Carlo to make it clear
+                    # We draw the text 'Calculating Move' for the timed AIs to make it clear
                     # that it takes some time
-                    if ai == 'Conte Marlo':
+                    if ai in TIMED_AIS:
                         text_surface2 = myfont.render('Calculating Move...', True, (255, 255, 255))
                         screen.blit(text_surface2, (new_board.width + 20, 200))
 
@@ -335,48 +371,58 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                         (new_board.width + 30 <= pygame.mouse.get_pos()[0] <= new_board.width + 90
                          and 50 <= pygame.mouse.get_pos()[1] <= 100):
 
+                    stop_pondering(pondering)
                     pygame.time.wait(500)
                     pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
                     pygame.mixer.music.set_volume(0.5)
                     return 3
 
-                # Check if the user wants to increase the number of simulations for
-                # Monte Carlo and then redraw the screen
-                elif event.type == pygame.MOUSEBUTTONDOWN and ai == 'Conte Marlo' and \
+                # Check if the user wants to increase the time per move for
+                # the AI and then redraw the screen
+                elif event.type == pygame.MOUSEBUTTONDOWN and ai in TIMED_AIS and \
                         (new_board.width + 30 <= pygame.mouse.get_pos()[0] <= new_board.width + 60
                          and 280 <= pygame.mouse.get_pos()[1] <= 310):
-                    number_of_mc_sims += 10
+                    time_per_move_ms += TIME_PER_MOVE_STEP
                     redraw_screen_mc(myfont, new_board, screen, p1_wins, p2_wins, draws,
-                                     quit_surface, number_of_mc_sims)
+                                     quit_surface, time_per_move_ms)
 
-                # Check if the user wants to decrease the number of simulations for
-                # Monte Carlo and then redraw the screen
-                elif event.type == pygame.MOUSEBUTTONDOWN and ai == 'Conte Marlo' and \
+                # Check if the user wants to decrease the time per move for
+                # the AI and then redraw the screen
+                elif event.type == pygame.MOUSEBUTTONDOWN and ai in TIMED_AIS and \
                         (new_board.width + 90 <= pygame.mouse.get_pos()[0] <= new_board.width + 120
-                         and 280 <= pygame.mouse.get_pos()[1] <= 310) and number_of_mc_sims != 10:
-                    number_of_mc_sims -= 10
+                         and 280 <= pygame.mouse.get_pos()[1] <= 310) \
+                        and time_per_move_ms > TIME_PER_MOVE_STEP:
+                    time_per_move_ms -= TIME_PER_MOVE_STEP
                     redraw_screen_mc(myfont, new_board, screen, p1_wins, p2_wins, draws,
-                                     quit_surface, number_of_mc_sims)
+                                     quit_surface, time_per_move_ms)
 
             else:
-                # If the AI being played against is Monte Carlo, pass in the number of
-                # simulations to be played
-                if ai == 'Conte Marlo':
-                    ai_move = ai_player.make_move(new_board, previous_move, number_of_mc_sims)
+                # If the AI being played against searches, pass in how long it may
+                # think for so that every board size takes the same time per move.
+                # The time it spent pondering while the user was thinking counts
+                # towards that time.
+                if ai in TIMED_AIS:
+                    time_budget_ms = max(time_per_move_ms - pondered_ms, MIN_TIME_AFTER_PONDERING)
+                    ai_move = ai_player.make_move(new_board, previous_move,
+                                                  time_budget_ms=time_budget_ms)
                 else:
                     ai_move = ai_player.make_move(new_board, previous_move)
                 previous_move = ai_move
                 new_board.drop_piece(previous_move[0], previous_move[1], 1)
 
-                # If the AI being played against is Monte Carlo, we need to redraw
+                # Keep thinking in the background while the user chooses their move
+                if ai in PONDERING_AIS and new_board.get_winner() is None:
+                    pondering = start_pondering(ai_player, new_board)
+
+                # If the AI being played against is timed, we need to redraw
                 # the pygame screens a bit differently
-                if ai == 'Conte Marlo':
+                if ai in TIMED_AIS:
                     redraw_screen_mc(myfont, new_board, screen, p1_wins, p2_wins, draws,
-                                     quit_surface, number_of_mc_sims)
+                                     quit_surface, time_per_move_ms)
 
                 else:
                     screen.fill(BLACK)
-                    new_board.draw_board(screen)
+                    draw_board(new_board, screen)
                     pygame.draw.rect(screen, (255, 255, 255), (new_board.width + 30, 50, 60, 50), 0,
                                      3)
                     screen.blit(quit_surface, (new_board.width + 40, 60))
@@ -397,18 +443,43 @@ def main_with_ai(game_size: int, p1_wins: int, p2_wins: int, draws: int, ai: str
                 if new_board.winning_move(1):
                     label = myfont.render("Player 1 wins!!", True, RED)
                     screen.blit(label, (10, 10))
-                    new_board.draw_board(screen)
+                    draw_board(new_board, screen)
                     pygame.time.wait(1000)
                     pygame.mixer.music.set_volume(0.5)
                     return 1
 
 
+def start_pondering(ai_player: Player, game: Board) \
+        -> tuple[threading.Thread, threading.Event, float]:
+    """Start ai_player pondering on a copy of game in a background thread.
+
+    Return the thread, the event that stops it and the time it started.
+    """
+    stop = threading.Event()
+    thread = threading.Thread(target=ai_player.ponder, args=(game.clone(), stop), daemon=True)
+    thread.start()
+    return (thread, stop, time.perf_counter())
+
+
+def stop_pondering(pondering: Optional[tuple[threading.Thread, threading.Event, float]]) \
+        -> int:
+    """Stop the pondering started by start_pondering, if there is any, and wait for it
+    to finish. Return how long it pondered for in milliseconds."""
+    if pondering is None:
+        return 0
+
+    thread, stop, start = pondering
+    stop.set()
+    thread.join()
+    return int((time.perf_counter() - start) * 1000)
+
+
 def redraw_screen_mc(myfont: pygame.font.SysFont, new_board: Board, screen: pygame.Surface,
                      p1_wins: int, p2_wins: int, draws: int, quit_surface: pygame.Surface,
-                     number_of_mc_sims: int) -> None:
-    """Redraw the entire screen if the ai being played against is Monte Carlo"""
+                     time_per_move_ms: int) -> None:
+    """Redraw the entire screen if the ai being played against is given a time per move"""
     screen.fill(BLACK)
-    new_board.draw_board(screen)
+    draw_board(new_board, screen)
 
     # Redraw the quit button
     pygame.draw.rect(screen, (255, 255, 255), (new_board.width + 30, 50, 60, 50), 0, 3)
@@ -423,12 +494,12 @@ def redraw_screen_mc(myfont: pygame.font.SysFont, new_board: Board, screen: pyga
                                  (255, 255, 0))
     screen.blit(text_surface, (new_board.width + 20, 160))
 
-    # Redraw the buttons for modifying the number of simulations and the text
-    # displaying the number of simulations
+    # Redraw the buttons for modifying the time per move and the text
+    # displaying the time per move
     pygame.draw.rect(screen, (0, 255, 0), (new_board.width + 30, 280, 30, 30), 0, 3)
     pygame.draw.rect(screen, (255, 0, 0), (new_board.width + 90, 280, 30, 30), 0, 3)
 
-    text_surface = myfont.render(f'Number of Simulations: {number_of_mc_sims}', True,
+    text_surface = myfont.render(f'Time per Move: {time_per_move_ms} ms', True,
                                  (255, 255, 255))
     screen.blit(text_surface, (new_board.width + 20, 240))
 
@@ -444,7 +515,8 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
                           'pprint', 'plotly', 'players', 'tree_generation',
-                          'game_tree', 'copy', 'random', 'menu'],
+                          'game_tree', 'copy', 'random', 'menu', 'rendering', 'threading', 'time',
+                          'rollouts'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['R1705', 'C0200', 'E1136', 'E9999']
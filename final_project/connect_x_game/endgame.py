@@ -0,0 +1,306 @@
+"""CSC111 Winter 2021 Project, Endgame solver file
+
+This file contains the EndgameSolver class, which searches every line of play
+to the end of the game once only a few empty cells are left, and proves whether
+the player to move wins, loses or draws.
+
+Solved positions are kept in memory and saved to a book file (see opening_book.py)
+in opening_book.CACHE_DIRECTORY when the program exits, keyed by their canonical
+hash, so an endgame that has been solved before, in this session or an earlier
+one, is looked up instead of searched again. A saved file that cannot be read is
+thrown away, and the solver starts again with no saved positions.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from typing import Optional
+
+import atexit
+import logging
+import os
+import time
+
+import tactics
+from board import Board
+from opening_book import CACHE_DIRECTORY, PositionBook, write_book
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# The results of a solved position for the player to move
+LOSS = -1
+DRAW = 0
+WIN = 1
+
+# The number of empty cells at which the solver starts solving, for each board size.
+# Larger boards have more lines through each empty cell and take longer to solve,
+# so the slowest solve at each threshold stays under about 0.3 seconds.
+ENDGAME_THRESHOLDS = {7: 16, 9: 16, 11: 12}
+
+# The number of empty cells at which the solver starts solving on other board sizes
+DEFAULT_ENDGAME_THRESHOLD = 12
+
+# How many positions the solver visits between checks of its deadline
+NODES_PER_TIME_CHECK = 256
+
+# Endgame solvers that have already been created, keyed by board size
+_SOLVERS = {}
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EndgameSolver:
+    """An exact solver for Connect X positions with few empty cells.
+
+    Instance Attributes:
+        - size: The number of rows and columns of the boards this solver solves
+        - threshold: positions with at most this many empty cells are solved
+        - book: the solved positions saved to disk. Each value is the column of the
+        best move in the canonical position times 4, plus the result plus 1.
+
+    Representation Invariants:
+        - self.threshold >= 0
+    """
+    size: int
+    threshold: int
+    book: PositionBook
+
+    # Private Instance Attributes:
+    #   - _table: the positions solved in the current session, including the ones
+    #       inside a search, whose values may only be bounds on their result
+    #   - _new_entries: the solved positions that have not been saved to the book yet
+    #   - _deadline: the time.perf_counter() value at which the current solve gives up,
+    #       or None if it has no deadline
+    #   - _nodes: the number of positions visited in the current solve
+    #   - _timed_out: whether the current solve ran out of time
+    _table: TranspositionTable
+    _new_entries: dict[int, int]
+    _deadline: Optional[float]
+    _nodes: int
+    _timed_out: bool
+
+    def __init__(self, size: int, threshold: Optional[int] = None,
+                 path: Optional[str] = None) -> None:
+        """Initialize a solver for size x size boards, whose solved positions are
+        saved to the book file at path (by default, in opening_book.CACHE_DIRECTORY).
+
+        If threshold is None, the threshold for size in ENDGAME_THRESHOLDS is used.
+        """
+        self.size = size
+        self.threshold = threshold if threshold is not None \
+            else ENDGAME_THRESHOLDS.get(size, DEFAULT_ENDGAME_THRESHOLD)
+        self.book = PositionBook(path if path is not None
+                                 else os.path.join(CACHE_DIRECTORY, f'endgame_{size}.bin'))
+        self._table = TranspositionTable(1 << 16)
+        self._new_entries = {}
+        self._deadline = None
+        self._nodes = 0
+        self._timed_out = False
+
+    def can_solve(self, game: Board, threshold: Optional[int] = None) -> bool:
+        """Return whether game has few enough empty cells for this solver to solve.
+
+        If threshold is given, it is used instead of self.threshold, so a player with
+        little time can only solve smaller endgames.
+        """
+        return game.count_empty_cells() <= (self.threshold if threshold is None else threshold)
+
+    def solve(self, game: Board, deadline: Optional[float] = None) \
+            -> Optional[tuple[int, tuple[int, int]]]:
+        """Return the result of game for the player to move with perfect play (WIN, DRAW
+        or LOSS), and the move that achieves it. game is left unchanged.
+
+        The result is kept until the next save, so the position does not need to be
+        solved again. If deadline (a time.perf_counter() value) passes before the
+        game is solved, give up and return None.
+
+        Preconditions:
+            - game.size == self.size
+            - game.get_winner() is None
+        """
+        key = game.canonical_hash()
+        try:
+            value = self.book.lookup(key)
+        except ValueError:
+            self._discard_book()
+            value = None
+        if value is None:
+            value = self._new_entries.get(key)
+
+        if value is not None:
+            col = game.from_canonical((0, value // 4))[1]
+            return (value % 4 - 1, (game.get_next_open_row(col), col))
+
+        self._deadline = deadline
+        self._nodes = 0
+        self._timed_out = False
+        result, move = self._solve_root(game)
+        if self._timed_out:
+            return None
+        self._new_entries[key] = game.to_canonical(move)[1] * 4 + result + 1
+
+        return (result, move)
+
+    def save(self) -> None:
+        """Add the positions solved since the last save to the book file.
+
+        This rewrites the whole file, so it is only done when the program exits
+        (see save_endgame_solvers) rather than after every solve.
+        """
+        if self._new_entries == {}:
+            return
+
+        try:
+            entries = dict(self.book.items())
+        except ValueError:
+            self._discard_book()
+            entries = {}
+        entries.update(self._new_entries)
+        self.book.close()
+        write_book(self.book.path, self.size, entries)
+        self._new_entries = {}
+
+    def _discard_book(self) -> None:
+        """Delete the book file, which cannot be read, so the solver starts again with
+        an empty book.
+
+        The file is in the cache directory and only holds positions that can be solved
+        again, so a file cut short by an interrupted save, or written in an older
+        format, is not worth stopping the game for.
+        """
+        _LOGGER.warning('%s is not a book file, so the endgames saved in it are discarded',
+                        self.book.path)
+        self.book.close()
+        try:
+            os.remove(self.book.path)
+        except OSError:
+            pass
+
+    def _solve_root(self, game: Board) -> tuple[int, tuple[int, int]]:
+        """Return the result of game for the player to move and the best move,
+        by searching to the end of the game."""
+        piece = 1 if game.is_red_active else 2
+
+        wins = tactics.winning_moves(game, piece)
+        if wins != []:
+            return (WIN, wins[0])
+
+        best_result = LOSS - 1
+        best_move = None
+        for move in self._order_moves(game, piece):
+            game.drop_piece(move[0], move[1], piece)
+            result = -self._negamax(game, -WIN, -max(best_result, LOSS))
+            game.undo_move()
+            if self._timed_out:
+                break
+
+            if result > best_result:
+                best_result = result
+                best_move = move
+            if best_result == WIN:
+                break
+
+        return (best_result, best_move)
+
+    def _negamax(self, game: Board, alpha: int, beta: int) -> int:
+        """Return the result of game for the player to move, searched to the end of
+        the game. Results of at least beta or at most alpha are only bounds.
+
+        Once the deadline has passed, the result is meaningless and nothing is stored.
+        """
+        self._nodes += 1
+        if self._deadline is not None and self._nodes % NODES_PER_TIME_CHECK == 0 \
+                and time.perf_counter() >= self._deadline:
+            self._timed_out = True
+        if self._timed_out:
+            return DRAW
+
+        winner = game.get_winner()
+        if winner == 'Draw':
+            return DRAW
+        elif winner is not None:
+            # The game was won by the player who made the last move
+            return LOSS
+
+        piece = 1 if game.is_red_active else 2
+        if tactics.winning_moves(game, piece) != []:
+            return WIN
+
+        # Blocking one of two threats still lets the other player win with the other
+        blocks = tactics.forced_blocks(game, piece)
+        if len(blocks) > 1:
+            return LOSS
+
+        key = game.canonical_hash()
+        entry = self._table.lookup(key)
+        if entry is not None:
+            if entry.flag == EXACT \
+                    or (entry.flag == LOWER_BOUND and entry.value >= beta) \
+                    or (entry.flag == UPPER_BOUND and entry.value <= alpha):
+                return entry.value
+
+        original_alpha = alpha
+        best_result = LOSS
+        for move in blocks or self._order_moves(game, piece):
+            game.drop_piece(move[0], move[1], piece)
+            result = -self._negamax(game, -beta, -alpha)
+            game.undo_move()
+
+            best_result = max(best_result, result)
+            alpha = max(alpha, result)
+            if alpha >= beta:
+                break
+
+        if self._timed_out:
+            return DRAW
+
+        if best_result <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_result >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._table.store(key, best_result, None, 0, flag)
+
+        return best_result
+
+    def _order_moves(self, game: Board, piece: int) -> list[tuple[int, int]]:
+        """Return the valid moves of game in the order they should be searched:
+        closest to the centre first, with the moves directly under a threat of
+        the other player last."""
+        unsafe = tactics.unsafe_moves(game, piece)
+        centre = (game.size - 1) / 2
+
+        return sorted(game.get_valid_moves(),
+                      key=lambda move: (move in unsafe, abs(move[1] - centre)))
+
+
+def get_endgame_solver(size: int) -> EndgameSolver:
+    """Return the shared endgame solver for size x size boards."""
+    if size not in _SOLVERS:
+        _SOLVERS[size] = EndgameSolver(size)
+
+    return _SOLVERS[size]
+
+
+def save_endgame_solvers() -> None:
+    """Save the positions solved by every shared endgame solver to their book files."""
+    for solver in _SOLVERS.values():
+        solver.save()
+
+
+atexit.register(save_endgame_solvers)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'os', 'tactics',
+                          'opening_book', 'transposition', 'atexit', 'logging', 'time'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -11,7 +11,9 @@ Base code for GameTree is retrieved from Assignment 2.
 This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
 Kevin Vaidyan, and Akash Illangovan."""
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Union
+
+import math
 
 GAME_START_MOVE = (-1, -1)
 
@@ -25,31 +27,64 @@ class GameTree:
     Many methods are similar to that of Assignment 2. They have been modified
     to work properly with Connect X.
 
+    Trees built from simulated games have a node for almost every move of every
+    game, so the nodes are kept small: they have no __dict__, the move is stored as
+    two small ints, and the subtrees are only put in a dict once there are two of them.
+    The moves of the subtrees are all made from the same position, so each one is in
+    a different column, and a subtree is found by its column in constant time.
+
+    Each node keeps the number of games inserted through it and the total of
+    their scores, so inserting a game only adds to the nodes along its path.
+
     Instance Attributes:
       - move: the current Connect X move. (-1, -1) as the root move.
       - is_red_move: True if Red is to make the next move after this, False otherwise
       - red_win_probability: the probability that red will win with the root move
+        (the total score of the games through this tree)
+      - visits: the number of games inserted through this tree
 
     Representation Invariants:
         - self.move == GAME_START_MOVE or self.move is a valid Connect X move
         - self.move != GAME_START_MOVE or self.is_red_move == True
+        - self.visits >= 0
+        - all(column == subtree.move[1] for column, subtree in self._subtrees.items())
+          if self._subtrees is a dict
     """
-    move: tuple[int, int]
+    __slots__ = ('_row', '_col', 'is_red_move', 'visits', '_score', '_subtrees')
     is_red_move: bool
-    red_win_probability: float
+    visits: int
 
     # Private Instance Attributes:
-    #  - : the subtrees of this tree, which represent the game trees after a possible
-    #      move by the current player
-    _subtrees: list[GameTree]
+    #  - _row: the row of the current move
+    #  - _col: the column of the current move
+    #  - _score: the total score of the games through this tree
+    #  - _subtrees: the subtrees of this tree, which represent the game trees after a
+    #      possible move by the current player. This is None if there are no subtrees,
+    #      the subtree itself if there is one, and a dict from the column of the move of
+    #      each subtree to the subtree if there are more, in the order they were added.
+    _row: int
+    _col: int
+    _subtrees: Union[None, GameTree, dict[int, GameTree]]
 
     def __init__(self, move: tuple[int, int] = GAME_START_MOVE,
                  is_red_move: bool = True, red_win_probability: Optional[float] = 0.0) -> None:
         """Initialize a new game tree."""
-        self.move = move
+        self._row, self._col = move
         self.is_red_move = is_red_move
-        self._subtrees = []
-        self.red_win_probability = red_win_probability
+        self._subtrees = None
+        self.visits = 0
+        self._score = red_win_probability
+
+    @property
+    def move(self) -> tuple[int, int]:
+        """The current Connect X move. (-1, -1) as the root move."""
+        return (self._row, self._col)
+
+    @property
+    def red_win_probability(self) -> float:
+        """The probability that red will win with the root move, which is
+        the total score of the games through this tree."""
+        return self._score
 
     def __str__(self) -> str:
         """Return a string representation of this tree."""
@@ -65,10 +100,10 @@ class GameTree:
             turn_desc = "Yellow's move"
         move_desc = f'{str(self.move)} -> {turn_desc} {self.red_win_probability}\n'
         s = '  ' * depth + move_desc
-        if self._subtrees == []:
+        if self._subtrees is None:
             return s
         else:
-            for subtree in self._subtrees:
+            for subtree in self.get_subtrees():
                 s += subtree._str_indented(depth + 1)
             return s
 
@@ -94,25 +129,62 @@ class GameTree:
     #     return new_board
 
     def get_subtrees(self) -> list[GameTree]:
-        """Return the subtrees of this game tree."""
-        return self._subtrees
+        """Return the subtrees of this game tree, in the order they were added."""
+        if self._subtrees is None:
+            return []
+        elif isinstance(self._subtrees, GameTree):
+            return [self._subtrees]
+        else:
+            return list(self._subtrees.values())
 
     def find_subtree_by_move(self, move: tuple[int, int]) -> Optional[GameTree]:
         """Return the subtree corresponding to the given move.
 
         Return None if no subtree corresponds to that move.
+
+        >>> tree = GameTree()
+        >>> tree.insert_move_sequence([(6, 3), (5, 3)], 1.0)
+        >>> tree.find_subtree_by_move((6, 3)).move
+        (6, 3)
+        >>> tree.find_subtree_by_move((5, 3)) is None
+        True
         """
-        for subtree in self._subtrees:
-            if subtree.move == move:
-                return subtree
+        if isinstance(self._subtrees, GameTree):
+            subtree = self._subtrees if self._subtrees._col == move[1] else None
+        elif self._subtrees is not None:
+            subtree = self._subtrees.get(move[1])
+        else:
+            subtree = None
+
+        if subtree is not None and subtree._row == move[0]:
+            return subtree
 
         return None
 
     def add_subtree(self, subtree: GameTree) -> None:
-        """Add a subtree to this game tree."""
-        self._subtrees.append(subtree)
+        """Add a subtree to this game tree.
+
+        Preconditions:
+            - no subtree of this tree has a move in the same column as subtree.move
+        """
+        if self._subtrees is None:
+            # a leaf's own value is replaced by the sum of its subtrees
+            self.visits = 0
+            self._score = 0.0
+
+        self._attach(subtree)
         # Update win probability after subtree has been added
-        self._update_red_win_probability()
+        self.visits += subtree.visits
+        self._score += subtree._score
+
+    def _attach(self, subtree: GameTree) -> None:
+        """Add a subtree to this game tree without changing its totals."""
+        if self._subtrees is None:
+            self._subtrees = subtree
+        else:
+            if isinstance(self._subtrees, GameTree):
+                self._subtrees = {self._subtrees._col: self._subtrees}
+            self._subtrees[subtree._col] = subtree
 
     def insert_move_sequence(self, moves: list[tuple[int, int]],
                              win_probability: Optional[float] = 0.0) -> None:
@@ -123,61 +195,283 @@ class GameTree:
             - moves[1] is a child of moves[0]
             - moves[2] is a child of moves[1]
             - etc.
+
+        win_probability is the score of the game, which is added to every tree along
+        the chain, so inserting takes Theta(m) steps for m moves.
+
+        >>> tree = GameTree()
+        >>> tree.insert_move_sequence([(6, 3), (5, 3)], 1.0)
+        >>> tree.insert_move_sequence([(6, 3), (6, 2)], -1.0)
+        >>> subtree = tree.find_subtree_by_move((6, 3))
+        >>> (subtree.visits, subtree.red_win_probability)
+        (2, 0.0)
+        >>> subtree.find_subtree_by_move((5, 3)).red_win_probability
+        1.0
         """
         # Do not run with an empty list
         if not moves:
-            pass
-        else:
+            return
+
+        tree = self
+        tree.visits += 1
+        tree._score += win_probability
+
+        for move in moves:
+            subtree = tree.find_subtree_by_move(move)
+            if subtree is None:
+                subtree = GameTree(move, not tree.is_red_move, win_probability)
+                subtree.visits = 1
+                tree._attach(subtree)
+            else:
+                subtree.visits += 1
+                subtree._score += win_probability
+            tree = subtree
 
-            # Takes m steps
-            reversed_moves = list(reversed(moves))
 
-            # Takes at most m + n steps
-            self.recursive_helper(reversed_moves, win_probability)
+class MCTSNode:
+    """A node of the search tree built by Monte Carlo Tree Search.
 
-            # Update the win probability one last time
-            self._update_red_win_probability()
+    Instance Attributes:
+      - move: the Connect X move that led to this node
+      - piece: the piece (1 for Red, 2 for Yellow) of the player who made move
+      - zobrist_hash: the Zobrist hash of the position at this node
+      - visits: the number of simulated games that passed through this node
+      - wins: the number of those games won by piece, where a draw counts as half a win
+      - children: the expanded children of this node, keyed by the column of their move
+      - untried_moves: the valid moves from this node that have not been expanded yet,
+        or None if they have not been generated
+      - amaf_visits: the number of simulated games through the parent of this node in
+        which piece made move at any point afterwards (all moves as first)
+      - amaf_wins: the number of those games won by piece, where a draw counts as half a win
 
-    def recursive_helper(self, moves: list[tuple[int, int]], win_probability: float) -> None:
-        """A recursive helper function to assist insert_move_sequence in adding moves
-        to the game tree in worst case Theta(m + n) running time.
+    Representation Invariants:
+        - self.piece in {1, 2}
+        - 0 <= self.wins <= self.visits
+        - 0 <= self.amaf_wins <= self.amaf_visits
+    """
+    move: tuple[int, int]
+    piece: int
+    zobrist_hash: int
+    visits: int
+    wins: float
+    children: dict[int, MCTSNode]
+    untried_moves: Optional[list[tuple[int, int]]]
+    amaf_visits: int
+    amaf_wins: float
+
+    def __init__(self, move: tuple[int, int], piece: int, zobrist_hash: int) -> None:
+        """Initialize a new unvisited node."""
+        self.move = move
+        self.piece = piece
+        self.zobrist_hash = zobrist_hash
+        self.visits = 0
+        self.wins = 0.0
+        self.children = {}
+        self.untried_moves = None
+        self.amaf_visits = 0
+        self.amaf_wins = 0.0
+
+    def uct_score(self, parent_visits: int, exploration: float,
+                  rave_equivalence: float = 0.0) -> float:
+        """Return the UCT score of this node, used by its parent to select which
+        child to search.
+
+        If rave_equivalence is positive, the win rate is blended with the all moves
+        as first win rate (see rave_blend).
+
+        Preconditions:
+            - self.visits > 0
         """
-        if moves:
-            # The call to find_subtree_by_move takes at most n steps
-            # across all recursive calls
+        return rave_blend(self.wins, self.visits, self.amaf_wins, self.amaf_visits,
+                          rave_equivalence) \
+            + exploration * math.sqrt(math.log(parent_visits) / self.visits)
+
+    def select_child(self, exploration: float, rave_equivalence: float = 0.0) -> MCTSNode:
+        """Return the child of this node with the highest UCT score.
 
-            # All other code takes constant time
-            subtree = self.find_subtree_by_move(moves[-1])
-            if not self._subtrees or subtree is None:
-                if self.is_red_move:
-                    self.add_subtree(GameTree(moves.pop(), False, win_probability))
-                else:
-                    self.add_subtree(GameTree(moves.pop(), True, win_probability))
+        Preconditions:
+            - self.children != {}
+        """
+        return max(self.children.values(),
+                   key=lambda child: child.uct_score(self.visits, exploration,
+                                                     rave_equivalence))
 
-                self._subtrees[-1].recursive_helper(moves, win_probability)
-                self._update_red_win_probability()
+    def most_visited_child(self) -> MCTSNode:
+        """Return the child of this node that has been visited the most.
 
-            else:
-                moves.pop()
-                subtree.recursive_helper(moves, win_probability)
-                self._update_red_win_probability()
+        Preconditions:
+            - self.children != {}
+        """
+        return max(self.children.values(), key=lambda child: child.visits)
+
+    def update(self, winner: Optional[str]) -> None:
+        """Record the result of a simulated game that passed through this node."""
+        self.visits += 1
+        if winner == 'Draw':
+            self.wins += 0.5
+        elif (winner == 'Red') == (self.piece == 1):
+            self.wins += 1
+
+    def update_amaf(self, winner: Optional[str]) -> None:
+        """Record the result of a simulated game through the parent of this node
+        in which piece made move later on."""
+        self.amaf_visits += 1
+        if winner == 'Draw':
+            self.amaf_wins += 0.5
+        elif (winner == 'Red') == (self.piece == 1):
+            self.amaf_wins += 1
 
-    def _update_red_win_probability(self) -> None:
-        """Recalculate the red win probability of this tree.
 
-        Every subtree's win probability has the value as the sum
-        of all of its subtrees.
+class MoveStats:
+    """The results of the simulated games that started with one move.
+
+    Unlike a GameTree, only the results are kept and not the moves of the games,
+    so recording a game takes constant time and memory.
+
+    Instance Attributes:
+      - visits: the number of games
+      - red_wins: the number of games won by Red
+      - yellow_wins: the number of games won by Yellow
+      - draws: the number of games that were draws
+
+    Representation Invariants:
+        - self.visits == self.red_wins + self.yellow_wins + self.draws
+
+    >>> stats = MoveStats()
+    >>> for winner in ['Red', 'Red', 'Draw', 'Yellow']:
+    ...     stats.record(winner)
+    >>> stats.visits
+    4
+    >>> stats.score
+    1
+    """
+    visits: int
+    red_wins: int
+    yellow_wins: int
+    draws: int
+
+    def __init__(self) -> None:
+        """Initialize statistics with no games."""
+        self.visits = 0
+        self.red_wins = 0
+        self.yellow_wins = 0
+        self.draws = 0
+
+    @property
+    def score(self) -> int:
+        """The total score of the games for Red, where a win is worth 1, a draw 0 and
+        a loss -1. This is the red_win_probability of the same games in a GameTree."""
+        return self.red_wins - self.yellow_wins
+
+    def record(self, winner: Optional[str]) -> None:
+        """Record a game whose result was winner."""
+        self.visits += 1
+        if winner == 'Red':
+            self.red_wins += 1
+        elif winner == 'Yellow':
+            self.yellow_wins += 1
+        else:
+            self.draws += 1
+
+
+class RaveStats:
+    """The direct and all moves as first (AMAF) statistics of the moves from
+    one position, collected from simulated games.
+
+    A game counts towards the direct statistics of the move it started with, and
+    towards the AMAF statistics of every move that piece made during it.
+
+    Instance Attributes:
+      - piece: the piece (1 for Red, 2 for Yellow) of the player to move in the position
+      - visits: visits[move] is the number of games that started with move
+      - wins: wins[move] is the number of those games won by piece, where a draw
+        counts as half a win
+      - amaf_visits: amaf_visits[move] is the number of games in which piece made move
+      - amaf_wins: amaf_wins[move] is the number of those games won by piece
+
+    Representation Invariants:
+        - self.piece in {1, 2}
+    """
+    piece: int
+    visits: dict[tuple[int, int], int]
+    wins: dict[tuple[int, int], float]
+    amaf_visits: dict[tuple[int, int], int]
+    amaf_wins: dict[tuple[int, int], float]
+
+    def __init__(self, piece: int) -> None:
+        """Initialize empty statistics for the moves of piece."""
+        self.piece = piece
+        self.visits = {}
+        self.wins = {}
+        self.amaf_visits = {}
+        self.amaf_wins = {}
+
+    def record(self, moves: list[tuple[int, int]], winner: Optional[str]) -> None:
+        """Record a simulated game, where moves are the moves of the game starting
+        with the move made by piece, and winner is the result of the game."""
+        if winner == 'Draw':
+            result = 0.5
+        elif (winner == 'Red') == (self.piece == 1):
+            result = 1.0
+        else:
+            result = 0.0
+
+        first = moves[0]
+        self.visits[first] = self.visits.get(first, 0) + 1
+        self.wins[first] = self.wins.get(first, 0.0) + result
+
+        # Every other move, starting with the first, was made by piece. Each cell
+        # can only be played once in a game, so no move is counted twice.
+        for move in moves[::2]:
+            self.amaf_visits[move] = self.amaf_visits.get(move, 0) + 1
+            self.amaf_wins[move] = self.amaf_wins.get(move, 0.0) + result
+
+    def merge(self, other: RaveStats) -> None:
+        """Add the statistics of other to these statistics.
+
+        Preconditions:
+            - other.piece == self.piece
+        """
+        for totals, other_totals in ((self.visits, other.visits), (self.wins, other.wins),
+                                     (self.amaf_visits, other.amaf_visits),
+                                     (self.amaf_wins, other.amaf_wins)):
+            for move in other_totals:
+                totals[move] = totals.get(move, 0) + other_totals[move]
+
+    def value(self, move: tuple[int, int], rave_equivalence: float) -> float:
+        """Return the estimated win rate of move for piece (see rave_blend).
+
+        Preconditions:
+            - self.visits.get(move, 0) > 0
         """
-        # Does nothing when self is a leaf
-        if self._subtrees == []:
-            pass
-
-        # Let each subtree node be the sum of every subtree below it.
-        elif self._subtrees != []:
-            count = 0.0
-            for subtree in self._subtrees:
-                count += subtree.red_win_probability
-            self.red_win_probability = count
+        return rave_blend(self.wins[move], self.visits[move], self.amaf_wins.get(move, 0.0),
+                          self.amaf_visits.get(move, 0), rave_equivalence)
+
+
+def rave_blend(wins: float, visits: int, amaf_wins: float, amaf_visits: int,
+               rave_equivalence: float) -> float:
+    """Return a blend of the win rate wins / visits and the all moves as first
+    win rate amaf_wins / amaf_visits.
+
+    The AMAF win rate is available much sooner but is biased, so it is weighted by
+    sqrt(rave_equivalence / (3 * visits + rave_equivalence)), which shrinks as visits
+    grows. rave_equivalence is roughly the number of visits at which both win rates
+    are trusted equally. If it is 0, or there are no AMAF games, only wins / visits is used.
+
+    Preconditions:
+        - visits > 0
+        - rave_equivalence >= 0
+
+    >>> rave_blend(1, 2, 30, 40, 0)
+    0.5
+    >>> rave_blend(1, 2, 30, 40, 2)
+    0.625
+    """
+    if rave_equivalence == 0 or amaf_visits == 0:
+        return wins / visits
+
+    beta = math.sqrt(rave_equivalence / (3 * visits + rave_equivalence))
+    return (1 - beta) * wins / visits + beta * amaf_wins / amaf_visits
 
 
 if __name__ == '__main__':
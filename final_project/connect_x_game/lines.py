@@ -0,0 +1,108 @@
+"""CSC111 Winter 2021 Project, Winning lines file
+
+This file contains the tables of every winning line on a Connect X
+board, which are shared by the Board and every evaluation function.
+
+Cells are numbered row by row as flat indices, so (row, col) is
+cell row * size + col.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+
+# Line tables that have already been built, keyed by (size, connect length)
+_TABLES = {}
+
+
+class WinningLines:
+    """Every line of cells that wins a game of Connect X on a size x size board
+
+    Instance Attributes:
+        - size: The number of rows and columns in the board
+        - connect: The number of pieces in a row needed to win
+        - lines: lines[i] is a tuple of the flat indices of the cells in the i-th line
+        - cell_lines: cell_lines[cell] is a tuple of the indices (in lines) of every
+        line that passes through cell
+
+    Representation Invariants:
+        - all(len(line) == self.connect for line in self.lines)
+        - len(self.cell_lines) == self.size * self.size
+    """
+    size: int
+    connect: int
+    lines: list[tuple[int, ...]]
+    cell_lines: list[tuple[int, ...]]
+
+    def __init__(self, size: int, connect: int) -> None:
+        """Build the line tables for a size x size board where connect pieces
+        in a row win.
+
+        Preconditions:
+            - 1 <= connect <= size
+        """
+        self.size = size
+        self.connect = connect
+        self.lines = []
+
+        # Horizontal, vertical, positively sloped and negatively sloped lines
+        for d_row, d_col in ((0, 1), (1, 0), (-1, 1), (1, 1)):
+            for row in range(size):
+                for col in range(size):
+                    end_row = row + (connect - 1) * d_row
+                    end_col = col + (connect - 1) * d_col
+                    if 0 <= end_row < size and end_col < size:
+                        self.lines.append(tuple((row + n * d_row) * size + col + n * d_col
+                                                for n in range(connect)))
+
+        # Build the inverse index from each cell to the lines through it
+        cell_lines = [[] for _ in range(size * size)]
+        for i in range(len(self.lines)):
+            for cell in self.lines[i]:
+                cell_lines[cell].append(i)
+        self.cell_lines = [tuple(indices) for indices in cell_lines]
+
+
+def get_connect_length(size: int) -> int:
+    """Return the number of pieces in a row needed to win on a size x size board.
+
+    >>> get_connect_length(7)
+    4
+    >>> get_connect_length(9)
+    5
+    """
+    return int((size - 4) - (size % 7) / 2) + 1
+
+
+def get_winning_lines(size: int, connect: int = 0) -> WinningLines:
+    """Return the line tables for a size x size board where connect pieces in a row win.
+
+    If connect is 0, the usual connect length for the size is used. The tables are
+    built once for each (size, connect) and shared by every caller, so they must
+    not be changed.
+
+    Preconditions:
+        - size >= 7
+        - 0 <= connect <= size
+    """
+    if connect == 0:
+        connect = get_connect_length(size)
+
+    if (size, connect) not in _TABLES:
+        _TABLES[(size, connect)] = WinningLines(size, connect)
+
+    return _TABLES[(size, connect)]
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -0,0 +1,215 @@
+"""CSC111 Winter 2021 Project, Opening book file
+
+This file contains the opening books that players look up before they
+start searching, so the first moves of a game cost almost nothing.
+
+A book file is a short header followed by fixed size records of a canonical
+position hash (see Board.canonical_hash) and a one byte value, sorted by hash.
+The file is memory mapped the first time it is looked up in, and each lookup
+is a binary search, so only the pages that are touched are read from disk.
+
+The books are built offline with tree_generation.build_opening_books.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from typing import Iterator, Optional
+
+import mmap
+import os
+import struct
+
+from board import Board
+
+# The directory the book files are stored in
+BOOK_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+# The directory that files written while playing are stored in, such as solved
+# endgames, so that playing a game never changes the files of the project
+if os.name == 'nt':
+    CACHE_DIRECTORY = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')),
+                                   'connect_x')
+else:
+    CACHE_DIRECTORY = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                                  os.path.join(os.path.expanduser('~'), '.cache')),
+                                   'connect_x')
+
+# The header of a book file: the magic bytes, the format version,
+# the size of the board and the number of records
+_MAGIC = b'CXBK'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBI')
+
+# A record of a book file: a canonical position hash and its value
+_RECORD = struct.Struct('<QB')
+
+# Opening books that have already been opened, keyed by board size
+_BOOKS = {}
+
+
+class PositionBook:
+    """A read only table from canonical position hashes to one byte values,
+    stored in a book file.
+
+    A book whose file does not exist is empty.
+
+    Instance Attributes:
+        - path: the path of the book file
+    """
+    path: str
+
+    # Private Instance Attributes:
+    #   - _data: the memory map of the book file, or None if it is not open
+    #   - _count: the number of records in the book file
+    #   - _loaded: whether the book file has been looked for yet
+    _data: Optional[mmap.mmap]
+    _count: int
+    _loaded: bool
+
+    def __init__(self, path: str) -> None:
+        """Initialize a book stored in the file at path. The file is not opened
+        until the book is first used."""
+        self.path = path
+        self._data = None
+        self._count = 0
+        self._loaded = False
+
+    def __len__(self) -> int:
+        """Return the number of positions in this book."""
+        self._load()
+        return self._count
+
+    def _load(self) -> None:
+        """Memory map the book file, if it exists and has not been mapped yet.
+
+        Raise ValueError if the file is not a book file of this format version, or it
+        has been cut short. The book is then still not loaded, so every use of it
+        raises the same error until the file is replaced.
+        """
+        if self._loaded:
+            return
+
+        if not os.path.exists(self.path):
+            self._loaded = True
+            return
+
+        with open(self.path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(data) < _HEADER.size:
+            data.close()
+            raise ValueError(f'{self.path} is not a book file')
+
+        magic, version, _, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION \
+                or len(data) != _HEADER.size + count * _RECORD.size:
+            data.close()
+            raise ValueError(f'{self.path} is not a book file')
+
+        self._data = data
+        self._count = count
+        self._loaded = True
+
+    def lookup(self, key: int) -> Optional[int]:
+        """Return the value stored for the position with the given canonical hash,
+        or None if the position is not in this book."""
+        self._load()
+
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            record_key, value = _RECORD.unpack_from(self._data,
+                                                    _HEADER.size + mid * _RECORD.size)
+            if record_key == key:
+                return value
+            elif record_key < key:
+                low = mid + 1
+            else:
+                high = mid
+
+        return None
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        """Yield every (canonical hash, value) pair in this book, in order of hash."""
+        self._load()
+
+        for i in range(self._count):
+            yield _RECORD.unpack_from(self._data, _HEADER.size + i * _RECORD.size)
+
+    def close(self) -> None:
+        """Unmap the book file. It is mapped again the next time the book is used,
+        so changes to the file are seen."""
+        if self._data is not None:
+            self._data.close()
+        self._data = None
+        self._count = 0
+        self._loaded = False
+
+
+def write_book(path: str, size: int, entries: dict[int, int]) -> None:
+    """Write a book file for a size x size board to path, replacing any file already there.
+
+    The file is written under a temporary name and then renamed, so a book that
+    has the old file mapped is never left reading a half written one.
+
+    Preconditions:
+        - all(0 <= key < 2 ** 64 for key in entries)
+        - all(0 <= entries[key] < 256 for key in entries)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, size, len(entries)))
+        for key in sorted(entries):
+            file.write(_RECORD.pack(key, entries[key]))
+
+    os.replace(temp_path, path)
+
+
+def book_path(size: int) -> str:
+    """Return the path of the opening book file for a size x size board."""
+    return os.path.join(BOOK_DIRECTORY, f'opening_{size}.bin')
+
+
+def get_opening_book(size: int) -> PositionBook:
+    """Return the opening book for a size x size board.
+
+    Each position in the book is mapped to the column of the best move
+    in the canonical position.
+    """
+    if size not in _BOOKS:
+        _BOOKS[size] = PositionBook(book_path(size))
+
+    return _BOOKS[size]
+
+
+def book_move(game: Board) -> Optional[tuple[int, int]]:
+    """Return the opening book move for the player to move in game,
+    or None if the position is not in the book."""
+    col = get_opening_book(game.size).lookup(game.canonical_hash())
+    if col is None:
+        return None
+
+    # The book stores the column of the canonical position
+    col = game.from_canonical((0, col))[1]
+    row = game.get_next_open_row(col)
+    if row is None:
+        return None
+
+    return (row, col)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'mmap', 'os', 'struct'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -15,27 +15,89 @@ RandomPlayer and ExploringPLayer retrieved from Assignment 2.
 This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
 Kevin Vaidyan, and Akash Illangovan."""
 import random
-import copy
+import math
+import os
+import threading
+import time
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 from board import Board
 
+import numpy as np
+
+import endgame
 import game_tree
+import opening_book
+import tactics
+import vectorised
+from rollouts import RolloutPolicy, uniform_policy, play_out
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from symmetry import mirror_move, is_symmetric_move
+
+# The number of simulations per valid move used when none is given
+DEFAULT_SIMULATIONS = 200
+
+# The number of simulations per valid move in each round of a timed or adaptive search
+ROUND_SIMULATIONS = 10
+VECTORISED_ROUND_SIMULATIONS = 100
+
+# The half width of the confidence interval of the mean score of a move after one
+# simulated game, in an adaptive search. It shrinks with the square root of the
+# number of games. Scores are between -1 and 1, so this is about two standard deviations.
+ELIMINATION_WIDTH = 2.0
+
+# The number of moves NegamaxPlayer searches ahead when it has no time budget
+DEFAULT_SEARCH_DEPTH = 8
+
+# The value of a won position for NegamaxPlayer. Every other position is worth less.
+WIN_SCORE = 1000000
+
+# How many positions NegamaxPlayer visits between checks of its deadline
+NODES_PER_TIME_CHECK = 1024
+
+# The most searches MCTSPlayer makes while pondering on one move of the user. Each
+# search adds a node of about half a kilobyte, so this bounds the memory the tree
+# can grow by, however long the user thinks.
+PONDER_ITERATIONS = 100000
+
+# How many searches MCTSPlayer makes while pondering between giving up the
+# interpreter to the other threads, so the game window keeps responding
+PONDER_YIELD_ITERATIONS = 32
+
+# Process pools that have already been started, keyed by their number of workers.
+# They are kept for the rest of the program so every move of every game reuses them.
+_POOLS = {}
 
 
 class Player:
     """The Player abstract class"""
     def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
-                  num_sims: Optional[int] = None) -> tuple[int, int]:
-        """The Player abstract make_move method"""
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
+        """The Player abstract make_move method
+
+        If time_budget_ms is given, players that search keep improving their move
+        until that many milliseconds have passed, then return the best move found.
+        """
         raise NotImplementedError
 
+    def ponder(self, game: Board, stop: threading.Event) -> None:
+        """Think about game on the opponent's time until stop is set.
+
+        game is the position right after this player's move, and belongs to this
+        player until stop is set. Players that keep nothing between moves have nothing
+        to think about, so by default this returns straight away.
+        """
+        return
+
 
 class RandomPlayer(Player):
     """A Connect X AI whose strategy is always picking a random move."""
 
     def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
-                  num_sims: Optional[int] = None) -> tuple[int, int]:
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
         """Make a move given the current game.
 
         previous_move is the opponent player's most recent move, or None if no moves
@@ -55,16 +117,32 @@ class ExploringPlayer(Player):
     #   - _game_tree:
     #       The GameTree that this player uses to make its moves. If None, then this
     #       player just makes random moves.
+    #   - _symmetric:
+    #       True if _game_tree only stores canonical move sequences
+    #       (see symmetry.canonical_sequence)
+    #   - _mirrored:
+    #       Whether the current game is the mirror image of its canonical sequence,
+    #       or None if every move so far has been in the centre column
     _game_tree: Optional[game_tree.GameTree]
     _exploration_probability: float
+    _symmetric: bool
+    _mirrored: Optional[bool]
 
-    def __init__(self, gametree: game_tree.GameTree, exploration_probability: float) -> None:
-        """Initialize this player."""
+    def __init__(self, gametree: game_tree.GameTree, exploration_probability: float,
+                 symmetric: bool = False) -> None:
+        """Initialize this player.
+
+        If symmetric is True, gametree must only contain canonical move sequences,
+        and this player translates between the game and the tree as it plays.
+        """
         self._game_tree = gametree
         self._exploration_probability = exploration_probability
+        self._symmetric = symmetric
+        self._mirrored = None
 
     def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
-                  num_sims: Optional[int] = None) -> tuple[int, int]:
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
         """Make a move given the current game.
 
         previous_move is the opponent player's most recent move, or None if no moves
@@ -76,7 +154,8 @@ class ExploringPlayer(Player):
         # First let the current tree be the subtree that has the root move
         # of the previous move (or None if there is no such subtree)
         if previous_move is not None and self._game_tree is not None:
-            self._game_tree = self._game_tree.find_subtree_by_move(previous_move)
+            self._game_tree = self._game_tree.find_subtree_by_move(
+                self._to_tree_move(previous_move, game.size))
 
         # If the current tree is None (it can be none from the code above or
         # if it was None from the previous move) or it is a leaf, make a random
@@ -96,13 +175,8 @@ class ExploringPlayer(Player):
             # None or the subtree that contains the random move picked.
             if random_p < self._exploration_probability:
                 new_move = random.choice(game.get_valid_moves())
-                new_tree = None
-
-                for subtree in self._game_tree.get_subtrees():
-                    if subtree.move == new_move:
-                        new_tree = subtree
-
-                self._game_tree = new_tree
+                self._game_tree = self._game_tree.find_subtree_by_move(
+                    self._to_tree_move(new_move, game.size))
                 return new_move
 
             # Otherwise, choose the subtree with the highest or lowest white_win_probability
@@ -113,7 +187,35 @@ class ExploringPlayer(Player):
                 str_representation = self.make_move_helper(good_tree).move
                 tuple_representation = (int(str_representation[0]),
                                         int(str_representation[1]))
-                return tuple_representation
+                return self._from_tree_move(tuple_representation, game.size)
+
+    def _to_tree_move(self, move: tuple[int, int], size: int) -> tuple[int, int]:
+        """Return the move in self._game_tree that corresponds to move in the game.
+
+        The first move outside of the centre column decides whether the
+        game is mirrored."""
+        if not self._symmetric:
+            return move
+
+        if self._mirrored is None and not is_symmetric_move(move, size):
+            self._mirrored = move[1] > size - 1 - move[1]
+
+        if self._mirrored:
+            return mirror_move(move, size)
+        return move
+
+    def _from_tree_move(self, move: tuple[int, int], size: int) -> tuple[int, int]:
+        """Return the move in the game that corresponds to move in self._game_tree."""
+        if not self._symmetric:
+            return move
+
+        # Canonical sequences leave the centre column to the left first
+        if self._mirrored is None and not is_symmetric_move(move, size):
+            self._mirrored = False
+
+        if self._mirrored:
+            return mirror_move(move, size)
+        return move
 
     def make_move_helper(self, good_tree: game_tree.GameTree()) -> game_tree.GameTree():
         """Works as a helper to self.make_move()
@@ -149,41 +251,57 @@ class SabotagePlayer(Player):
 
     If the user can win in one move, Sabotage player will stop that move. If the next
     move of Sabotage player can be a winning one, choose that move."""
+    # Private Instance Attributes:
+    #   - _use_book: whether to play known moves from the opening book and the
+    #       endgame solver before looking for wins and blocks
+    #   - _endgame_threshold: the most empty cells of an endgame that is solved,
+    #       or None to use the threshold of the endgame solver
+    _use_book: bool
+    _endgame_threshold: Optional[int]
+
+    def __init__(self, use_book: bool = False, endgame_threshold: Optional[int] = None) -> None:
+        """Initialize this player.
+
+        The book is off by default, since perfect openings and endgames would make
+        this player much stronger than the Sabotage difficulty is meant to be.
+        """
+        self._use_book = use_book
+        self._endgame_threshold = endgame_threshold
 
     def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
-                  num_sims: Optional[int] = None) -> tuple[int, int]:
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
         """Return the move that is either the winning move or the move that stops
-        the user from winning."""
-
-        # the moves where the user wins after this move
-        bad_moves = []
-        # the moves where the ai wins
-        good_moves = []
-
-        # iterate through every valid next move
-        for move in game.get_valid_moves():
-            game_copy = copy.deepcopy(game)
-
-            # simulate this move being played
-            game_copy.drop_piece(move[0], move[1], 1)
-
-            # if this move causes the ai to win, return this move.
-            if game_copy.get_winner() == 'Red':
+        the user from winning.
+
+        If the move is known from the opening book or the endgame solver, it is
+        returned instead."""
+        deadline = get_deadline(time_budget_ms)
+        if self._use_book:
+            move = known_move(game, deadline, self._endgame_threshold)
+            if move is not None:
                 return move
 
-            # if this move is not a winning move, check if yellow can win after this move
-            for yellow_move in game_copy.get_valid_moves():
-                game_copy_copy = copy.deepcopy(game_copy)
-                game_copy_copy.drop_piece(yellow_move[0], yellow_move[1], 2)
-
-                # if yellow can win after this move, append it to the bad moves
-                if game_copy_copy.get_winner() == 'Yellow' or game_copy_copy.get_winner() == 'Draw':
-                    bad_moves.append(move)
-
-        # all good moves are those in valid moves which are not bad moves
-        for move in game.get_valid_moves():
-            if move not in bad_moves:
-                good_moves.append(move)
+        # if a move causes the ai to win, return that move.
+        wins = tactics.winning_moves(game, 1)
+        if wins != []:
+            return wins[0]
+
+        # the good moves are those after which the user cannot win
+        good_moves = tactics.safe_moves(game, 1)
+
+        # if there are multiple good moves and there is time to think, use
+        # the time to simulate games and pick the good move with the best score
+        if len(good_moves) > 1 and deadline is not None:
+            results = {move: game_tree.MoveStats() for move in good_moves}
+            while True:
+                for move in good_moves:
+                    game.drop_piece(move[0], move[1], 1)
+                    simulate_results(results[move], game, move, 1)
+                    game.undo_move()
+                if time_is_up(deadline):
+                    break
+            return max(good_moves, key=lambda m: results[m].score)
 
         # if there are multiple good moves, just pick any random one
         if good_moves != []:
@@ -195,9 +313,77 @@ class SabotagePlayer(Player):
 
 class MonteCarloFreeVersion(Player):
     """A Monte Carlo Tree Search inspired AI for Connect X."""
+    # Private Instance Attributes:
+    #   - _vectorised:
+    #       If True, the games for each move are simulated all at once with NumPy
+    #       (see vectorised.batch_rollout) instead of one at a time.
+    #   - _keep_tree:
+    #       If True, the games simulated one at a time are inserted into a GameTree.
+    #       Otherwise only the results of the games after each move are counted
+    #       (see game_tree.MoveStats), which picks the same moves in less time and memory.
+    #   - _rng: the random number generator used by the vectorised simulations
+    #   - _workers:
+    #       The number of processes the games are simulated in. If it is more than 1,
+    #       the games for each move are split into batches that are simulated in the
+    #       shared process pool (see get_process_pool) and their scores are added up.
+    #   - _use_book: whether to play known moves from the opening book and the
+    #       endgame solver before simulating
+    #   - _endgame_threshold: the most empty cells of an endgame that is solved,
+    #       or None to use the threshold of the endgame solver
+    #   - _policy: the rollout policy that plays out the simulated games. The
+    #       vectorised simulations always play uniformly random moves.
+    #   - _rave_equivalence:
+    #       If positive, each move is scored by blending its win rate with the win rate
+    #       of every game in which Red made that move at any point (see
+    #       game_tree.rave_blend). The vectorised simulations do not record their
+    #       moves, so they always use the plain score.
+    #   - _adaptive:
+    #       If True, the games are simulated in rounds, and after each round the moves
+    #       that are clearly worse than the best one stop being simulated (see
+    #       eliminate_moves), so the rest of the games go to the moves that are close.
+    _vectorised: bool
+    _keep_tree: bool
+    _adaptive: bool
+    _rng: np.random.Generator
+    _workers: int
+    _use_book: bool
+    _endgame_threshold: Optional[int]
+    _policy: RolloutPolicy
+    _rave_equivalence: float
+
+    def __init__(self, vectorised_rollouts: bool = False, workers: Optional[int] = 1,
+                 use_book: bool = False, rollout_policy: RolloutPolicy = uniform_policy,
+                 rave_equivalence: float = 0.0, keep_tree: bool = False,
+                 adaptive: bool = False, endgame_threshold: Optional[int] = None) -> None:
+        """Initialize this player.
+
+        The book is off by default, the same as for SabotagePlayer, so the Conte Marlo
+        difficulty plays the way it did before there were books.
+
+        If workers is None, the games are simulated using every CPU core.
+        rollout_policy must be a module level function (such as one of rollouts.POLICIES)
+        so that it can be sent to the worker processes.
+
+        Preconditions:
+            - workers is None or workers >= 1
+        """
+        self._vectorised = vectorised_rollouts
+        self._keep_tree = keep_tree
+        self._adaptive = adaptive
+        self._rng = np.random.default_rng()
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._use_book = use_book
+        self._endgame_threshold = endgame_threshold
+        self._policy = rollout_policy
+        self._rave_equivalence = rave_equivalence
+
+        # Start the workers now, so starting them does not use up the time of the first move
+        if self._workers > 1:
+            get_process_pool(self._workers)
 
     def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
-                  num_sims: Optional[int] = None) -> tuple[int, int]:
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
         """Returns the best move to make as the next move in Connect X
 
         This function takes the current game state of the connect X board and selects
@@ -206,95 +392,807 @@ class MonteCarloFreeVersion(Player):
         possible move that was selected then updates from its subtrees the total score of
         that move (the sum of all game results). This is then repeated for each possible move.
 
-        Return the possible move with the highest results score."""
+        If time_budget_ms is given, rounds of up to num_sims games per move are simulated
+        until the time runs out instead, so the scores keep improving until the deadline.
+        The first round has one game per worker, and each later round is sized from how
+        fast the games went so far, so that it ends well before the deadline.
+
+        In adaptive mode, num_sims is the average number of games per move. The games
+        are simulated in rounds and a move stops being simulated once it is clearly
+        worse than the best move, so the search may stop early when one move is left.
+
+        If the move is known from the opening book or the endgame solver, it is
+        returned instead.
 
-        # create a new tree instance
+        Return the possible move with the highest results score."""
+        deadline = get_deadline(time_budget_ms)
+        if self._use_book:
+            move = known_move(game, deadline, self._endgame_threshold)
+            if move is not None:
+                return move
+        # give every worker a full round of games
+        round_sims = self._workers \
+            * (VECTORISED_ROUND_SIMULATIONS if self._vectorised else ROUND_SIMULATIONS)
+        if num_sims is None and deadline is None:
+            num_sims = DEFAULT_SIMULATIONS
+        elif num_sims is None:
+            num_sims = round_sims
+
+        moves = game.get_valid_moves()
+        # the number of games left to simulate in an adaptive search without a deadline
+        budget = num_sims * len(moves)
+        if not self._adaptive:
+            round_sims = num_sims
+        max_round_sims = round_sims
+        if deadline is not None:
+            round_sims = self._workers
+
+        # if a move immediately wins the game, do not simulate. Save
+        # time and return that move
+        wins = tactics.winning_moves(game, 1)
+        if wins != []:
+            return wins[0]
+
+        # create a new tree instance, if the games are kept
         tree = game_tree.GameTree()
+        # the results of the games after each move, if only the results are kept
+        results = {move: game_tree.MoveStats() for move in moves}
+        # the total score and number of games of each move
+        scores = {move: 0.0 for move in moves}
+        visits = {move: 0 for move in moves}
+        # the all moves as first statistics of Red's moves, if they are used
+        rave = game_tree.RaveStats(1) \
+            if self._rave_equivalence > 0 and not self._vectorised else None
+        # the moves that are still being simulated
+        active = moves
+
+        # simulate every move at least once, then keep going until the deadline
+        while True:
+            round_start = time.perf_counter()
+            round_games = 0
+
+            if self._workers > 1 or self._vectorised:
+                if self._workers > 1:
+                    self._simulate_in_parallel(game, active, round_sims, scores, rave)
+                else:
+                    # the games after every move are simulated in one NumPy call
+                    round_scores = vectorised_scores(game, active, round_sims, self._rng)
+                    for i in range(len(active)):
+                        scores[active[i]] += round_scores[i]
+
+                for move in active:
+                    visits[move] += round_sims
+                round_games = round_sims * len(active)
+
+            else:
+                for move in active:
+                    # perform the selected move. It is undone once it has been simulated.
+                    game.drop_piece(move[0], move[1], 1)
+
+                    # begin simulating games after the move was made
+                    if self._keep_tree:
+                        simulate(tree, game, move, round_sims, self._policy, rave)
+                        scores[move] = tree.find_subtree_by_move(move).red_win_probability
+                    else:
+                        simulate_results(results[move], game, move, round_sims,
+                                         self._policy, rave)
+                        scores[move] = results[move].score
+                    game.undo_move()
+
+                    visits[move] += round_sims
+                    round_games += round_sims
+                    # once every move has been simulated, stop as soon as the time is up
+                    if time_is_up(deadline) and all(visits[m] > 0 for m in active):
+                        break
+
+            budget -= round_games
+
+            if self._adaptive:
+                active = eliminate_moves(active, scores, visits)
+
+            if len(active) == 1 or (deadline is None and budget <= 0) or time_is_up(deadline):
+                break
+
+            if deadline is not None:
+                # use at most half of the time left, so a slow round cannot overrun
+                seconds_per_game = (time.perf_counter() - round_start) / round_games
+                round_sims = min(max_round_sims, int(time_left(deadline) / 2
+                                                     / (seconds_per_game * len(active))))
+                if round_sims < 1:
+                    break
+
+        if rave is not None:
+            return max(active, key=lambda m: rave.value(m, self._rave_equivalence))
+
+        # pick the move with the highest mean score. If there is a tie, max
+        # returns the first of those moves.
+        return max(active, key=lambda m: scores[m] / visits[m])
+
+    def _simulate_in_parallel(self, game: Board, moves: list[tuple[int, int]], num_sims: int,
+                              scores: dict[tuple[int, int], float],
+                              rave: Optional[game_tree.RaveStats]) -> None:
+        """Simulate num_sims games after each of the given moves in the shared process
+        pool and add the score of each move to scores, and the games to rave if it
+        is not None.
+
+        The games for each move are split into batches so that every worker has
+        something to simulate, even when there are fewer moves than workers. With
+        NumPy, each worker simulates a share of the games after every move in one call.
+        """
+        pool = get_process_pool(self._workers)
+        if self._vectorised:
+            batch_moves = [moves]
+            batches = self._workers
+        else:
+            batch_moves = [[move] for move in moves]
+            batches = max(1, math.ceil(self._workers / len(moves)))
+        # Only the moves of the game are sent to the workers, which is much less to
+        # pickle than the board with its line and hash tables
+        history = game.get_moves()
+
+        futures = []
+        for these_moves in batch_moves:
+            for i in range(batches):
+                # spread the remainder over the first batches
+                batch_sims = num_sims // batches + (i < num_sims % batches)
+                if batch_sims > 0:
+                    futures.append((these_moves, pool.submit(
+                        simulate_batch, type(game), game.size, history, these_moves,
+                        batch_sims, self._vectorised, self._policy, rave is not None)))
+
+        for these_moves, future in futures:
+            batch_scores, batch_rave = future.result()
+            for i in range(len(these_moves)):
+                scores[these_moves[i]] += batch_scores[i]
+            if rave is not None:
+                rave.merge(batch_rave)
+
+
+class MCTSPlayer(Player):
+    """A Connect X AI that uses Monte Carlo Tree Search with UCT selection.
+
+    Each iteration selects a path down the search tree with the UCT formula,
+    expands one new node, plays out a game from it with the rollout policy and
+    backpropagates the result along the path. The search tree is kept between moves, so the work
+    spent on the opponent's actual reply is reused on the next turn.
+    """
+    # Private Instance Attributes:
+    #   - _exploration: the exploration constant of the UCT formula
+    #   - _root: the node of the search tree for the most recent position searched,
+    #       or None if no search has been done
+    #   - _use_book: whether to play known moves from the opening book and the
+    #       endgame solver before searching
+    #   - _endgame_threshold: the most empty cells of an endgame that is solved,
+    #       or None to use the threshold of the endgame solver
+    #   - _policy: the rollout policy that plays out the simulated games
+    #   - _rave_equivalence:
+    #       If positive, the UCT scores blend in the all moves as first statistics
+    #       of each node (see game_tree.rave_blend)
+    _exploration: float
+    _root: Optional[game_tree.MCTSNode]
+    _use_book: bool
+    _endgame_threshold: Optional[int]
+    _policy: RolloutPolicy
+    _rave_equivalence: float
+
+    def __init__(self, exploration: float = math.sqrt(2), use_book: bool = True,
+                 rollout_policy: RolloutPolicy = uniform_policy,
+                 rave_equivalence: float = 0.0,
+                 endgame_threshold: Optional[int] = None) -> None:
+        """Initialize this player."""
+        self._exploration = exploration
+        self._root = None
+        self._use_book = use_book
+        self._endgame_threshold = endgame_threshold
+        self._policy = rollout_policy
+        self._rave_equivalence = rave_equivalence
+
+    def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
+        """Return the most visited move after searching the current game.
+
+        num_sims simulated games are played for each valid move, the same
+        total budget that MonteCarloFreeVersion uses. If time_budget_ms is given,
+        the search instead continues until the time runs out. game is left unchanged.
+        If the move is known from the opening book or the endgame solver, it is
+        returned instead.
 
-        # select each move in get valid moves
-        for move in game.get_valid_moves():
-            # create a copy of the game and perform the selected move
-            game_copy = copy.deepcopy(game)
-            game_copy.drop_piece(move[0], move[1], 1)
-            # if the move immediately wins the game, do not simulate. Save
-            # time and return that move
-            if game_copy.get_winner() == 'Red':
+        Preconditions:
+            - game.get_winner() is None
+        """
+        deadline = get_deadline(time_budget_ms)
+        if self._use_book:
+            move = known_move(game, deadline, self._endgame_threshold)
+            if move is not None:
                 return move
+        if num_sims is None:
+            num_sims = DEFAULT_SIMULATIONS
 
-            # begin simulating games after the move was made
-            simulate(tree, game_copy, move, num_sims)
+        root = self._find_root(game, previous_move)
+        if deadline is None:
+            for _ in range(num_sims * len(game.get_valid_moves())):
+                self._search(game, root)
+        else:
+            self._search(game, root)
+            while not time_is_up(deadline):
+                self._search(game, root)
 
-        # find the next valid move with the highest win score
-        max_tree = tree.get_subtrees()[0]
-        for subtree in tree.get_subtrees():
-            if subtree.red_win_probability > max_tree.red_win_probability:
-                max_tree = subtree
+        # Keep the subtree of the chosen move for the next turn
+        self._root = root.most_visited_child()
+        return self._root.move
 
-        # return the move with the highest win score
-        return max_tree.move
+    def ponder(self, game: Board, stop: threading.Event) -> None:
+        """Keep searching game until stop is set, or PONDER_ITERATIONS searches
+        have been made.
 
+        The search tree is kept, so when the opponent moves, make_move carries on
+        from the subtree of that move and the rest of the tree is thrown away.
+        """
+        root = self._find_root(game, None)
+        self._root = root
+        for i in range(PONDER_ITERATIONS):
+            if stop.is_set() or game.get_winner() is not None:
+                return
+            self._search(game, root)
+
+            # Sleeping for no time lets the main thread run, the same as a blocking call
+            if i % PONDER_YIELD_ITERATIONS == PONDER_YIELD_ITERATIONS - 1:
+                time.sleep(0)
+
+    def _find_root(self, game: Board, previous_move: Optional[tuple[int, int]]) \
+            -> game_tree.MCTSNode:
+        """Return the node of the stored search tree for the position of game,
+        descending through previous_move if needed.
+
+        A new tree is started if the position is not in the stored tree.
+        """
+        root = self._root
+        if root is not None and root.zobrist_hash != game.zobrist_hash \
+                and isinstance(previous_move, tuple):
+            root = root.children.get(previous_move[1])
 
-def simulate(tree: game_tree.GameTree, game_copy: Board, move: tuple[int, int],
-             num_sims: Optional[int]) -> None:
-    """This function takes in a game state and begins simulating games until completion.
+        if root is None or root.zobrist_hash != game.zobrist_hash:
+            # The player who made the last move is the one who is not active
+            last_piece = 2 if game.is_red_active else 1
+            root = game_tree.MCTSNode(game_tree.GAME_START_MOVE, last_piece, game.zobrist_hash)
 
-    The tree is updated with each move sequence and the score of the game."""
-    for _ in range(num_sims):
-        # create another copy of the game to save the state of the previous board
-        # for each game.
-        game_copy_2 = copy.deepcopy(game_copy)
+        return root
 
-        # rollout (simulate 1 game) the game state using random moves.
-        rollout = monte_carlo_rollout(RandomPlayer(), RandomPlayer(), move, game_copy_2)
+    def _search(self, game: Board, root: game_tree.MCTSNode) -> None:
+        """Run one iteration of Monte Carlo Tree Search from root, which is the
+        node for the position of game.
 
-        # apply the score of the game to the move sequence and insert the
-        # move sequence of the 1 rollout to the tree.
-        if rollout[0] == 'Red':
-            red_win = 1.0
-        elif rollout[0] == 'Yellow':
-            red_win = -1.0
+        Every move made on game during the iteration is undone before returning.
+        """
+        node = root
+        path = [root]
+        num_moves = 0
+
+        # Selection: follow the UCT scores down to a node with an unexpanded move
+        while node.untried_moves == [] and node.children != {} and game.get_winner() is None:
+            node = node.select_child(self._exploration, self._rave_equivalence)
+            game.drop_piece(node.move[0], node.move[1], node.piece)
+            path.append(node)
+            num_moves += 1
+
+        # Expansion: add one unexpanded move to the tree
+        if game.get_winner() is None:
+            if node.untried_moves is None:
+                node.untried_moves = game.get_valid_moves()
+                random.shuffle(node.untried_moves)
+
+            move = node.untried_moves.pop()
+            piece = 1 if game.is_red_active else 2
+            game.drop_piece(move[0], move[1], piece)
+            num_moves += 1
+
+            child = game_tree.MCTSNode(move, piece, game.zobrist_hash)
+            node.children[move[1]] = child
+            path.append(child)
+
+        # Simulation: play out the game with the rollout policy
+        winner, rollout_moves = play_out(game, self._policy)
+        num_moves += len(rollout_moves)
+
+        # Backpropagation
+        for visited in path:
+            visited.update(winner)
+        if self._rave_equivalence > 0:
+            self._update_amaf(path, rollout_moves, winner)
+
+        for _ in range(num_moves):
+            game.undo_move()
+
+    def _update_amaf(self, path: list[game_tree.MCTSNode], rollout_moves: list[tuple[int, int]],
+                     winner: Optional[str]) -> None:
+        """Record a simulated game in the all moves as first statistics of every child
+        of a node in path whose move was made by the same player later in the game.
+
+        path is the nodes visited from the root, and rollout_moves are the moves
+        made after the last node of path.
+        """
+        moves = [node.move for node in path[1:]] + rollout_moves
+        # The first move from the root is made by the player who did not make the root's move
+        first_piece = 3 - path[0].piece
+
+        # played[piece] is the set of moves made by piece after the current node of path
+        played = [set(), set(), set()]
+        next_move = len(moves)
+        for i in range(len(path) - 1, -1, -1):
+            while next_move > i:
+                next_move -= 1
+                piece = first_piece if next_move % 2 == 0 else 3 - first_piece
+                played[piece].add(moves[next_move])
+
+            for child in path[i].children.values():
+                if child.move in played[child.piece]:
+                    child.update_amaf(winner)
+
+
+class NegamaxPlayer(Player):
+    """A Connect X AI that searches every line of play a number of moves ahead
+    with alpha-beta negamax.
+
+    The search is repeated one move deeper at a time (iterative deepening), so
+    there is always a best move ready when the time budget runs out. Moves are
+    tried in the order most likely to cause a cutoff: the best move stored in the
+    transposition table, then the killer moves of the same depth, then by the
+    history heuristic and finally closest to the centre first. Positions are stored
+    in the transposition table under their canonical hash, so a position and its
+    mirror image are only searched once.
+    """
+    # Private Instance Attributes:
+    #   - _max_depth: the depth searched to when there is no time budget
+    #   - _table: the results of positions searched so far
+    #   - _killers: _killers[ply] is the columns of the last two moves that
+    #       caused a cutoff ply moves below the root
+    #   - _history: _history[col] is how useful moves in column col have been
+    #       at causing cutoffs
+    #   - _deadline: the deadline of the current search, or None
+    #   - _stop: the event that stops the current search while pondering, or None
+    #   - _nodes: the number of positions visited in the current search
+    #   - _timed_out: whether the current search ran out of time
+    #   - _use_book: whether to play known moves from the opening book and the
+    #       endgame solver before searching
+    #   - _endgame_threshold: the most empty cells of an endgame that is solved,
+    #       or None to use the threshold of the endgame solver
+    _max_depth: int
+    _table: TranspositionTable
+    _killers: list[list[int]]
+    _history: list[int]
+    _deadline: Optional[float]
+    _stop: Optional[threading.Event]
+    _nodes: int
+    _timed_out: bool
+    _use_book: bool
+    _endgame_threshold: Optional[int]
+
+    def __init__(self, max_depth: int = DEFAULT_SEARCH_DEPTH, table_size: int = 1 << 18,
+                 use_book: bool = True, endgame_threshold: Optional[int] = None) -> None:
+        """Initialize this player.
+
+        Preconditions:
+            - max_depth >= 1
+            - table_size > 0
+        """
+        self._max_depth = max_depth
+        self._table = TranspositionTable(table_size)
+        self._killers = []
+        self._history = []
+        self._deadline = None
+        self._stop = None
+        self._nodes = 0
+        self._timed_out = False
+        self._use_book = use_book
+        self._endgame_threshold = endgame_threshold
+
+    def make_move(self, game: Board, previous_move: Optional[tuple[int, int]],
+                  num_sims: Optional[int] = None,
+                  time_budget_ms: Optional[int] = None) -> tuple[int, int]:
+        """Return the best move found by searching the current game.
+
+        The game is searched max_depth moves ahead, or if time_budget_ms is given,
+        as many moves ahead as possible before the time runs out. The search stops
+        early once the result of the game is known. game is left unchanged.
+        If the move is known from the opening book or the endgame solver, it is
+        returned instead.
+
+        Preconditions:
+            - game.get_winner() is None
+        """
+        deadline = get_deadline(time_budget_ms)
+        if self._use_book:
+            move = known_move(game, deadline, self._endgame_threshold)
+            if move is not None:
+                return move
+
+        # Take a win, or make the only block, without searching
+        piece = 1 if game.is_red_active else 2
+        wins = tactics.winning_moves(game, piece)
+        if wins != []:
+            return wins[0]
+        blocks = tactics.forced_blocks(game, piece)
+        if len(blocks) == 1:
+            return blocks[0]
+
+        self._start_search(game, deadline, None)
+
+        empty_cells = game.count_empty_cells()
+        max_depth = empty_cells if self._deadline is not None \
+            else min(self._max_depth, empty_cells)
+
+        return self._deepen(game, max_depth)
+
+    def ponder(self, game: Board, stop: threading.Event) -> None:
+        """Search game one move deeper at a time until stop is set.
+
+        The results are kept in the transposition table, killer and history tables,
+        so the search after the opponent's move starts with most of the work done.
+        """
+        if game.get_winner() is not None:
+            return
+
+        self._start_search(game, None, stop)
+        self._deepen(game, game.count_empty_cells())
+        self._stop = None
+
+    def _start_search(self, game: Board, deadline: Optional[float],
+                      stop: Optional[threading.Event]) -> None:
+        """Reset the state of the previous search before searching game."""
+        self._deadline = deadline
+        self._stop = stop
+        self._nodes = 0
+        self._timed_out = False
+        self._table.new_search()
+        self._killers = [[] for _ in range(game.size * game.size + 1)]
+        # Old history is still useful, but should not outweigh the new search
+        self._history = [value // 2 for value in self._history] \
+            if len(self._history) == game.size else [0] * game.size
+
+    def _deepen(self, game: Board, max_depth: int) -> tuple[int, int]:
+        """Search game one move deeper at a time, up to max_depth moves ahead, and
+        return the best move of the deepest search that finished."""
+        best_move = self._order_moves(game, None, 0)[0]
+        for depth in range(1, max_depth + 1):
+            value, move = self._search_root(game, depth)
+
+            # A search that ran out of time is incomplete, so its move is not used
+            if self._timed_out:
+                break
+            best_move = move
+
+            if abs(value) >= WIN_SCORE or time_is_up(self._deadline):
+                break
+
+        return best_move
+
+    def _search_root(self, game: Board, depth: int) -> tuple[float, tuple[int, int]]:
+        """Return the value and best move of game searched depth moves ahead."""
+        alpha = -math.inf
+        best_move = None
+        piece = 1 if game.is_red_active else 2
+
+        entry = self._table.lookup(game.canonical_hash())
+        tt_move = game.from_canonical(entry.best_move) \
+            if entry is not None and entry.best_move is not None else None
+
+        for move in self._order_moves(game, tt_move, 0):
+            game.drop_piece(move[0], move[1], piece)
+            value = -self._negamax(game, depth - 1, -math.inf, -alpha, 1)
+            game.undo_move()
+
+            if best_move is None or value > alpha:
+                alpha = value
+                best_move = move
+
+        if not self._timed_out:
+            self._table.store(game.canonical_hash(), alpha, game.to_canonical(best_move), depth)
+        return (alpha, best_move)
+
+    def _negamax(self, game: Board, depth: int, alpha: float, beta: float, ply: int) -> float:
+        """Return the value of game for the player to move, searched depth moves ahead.
+
+        Values of at least beta and at most alpha are only bounds on the true value.
+        Wins score at least WIN_SCORE, and wins found with more depth remaining
+        (sooner) score higher.
+        """
+        self._nodes += 1
+        if self._nodes % NODES_PER_TIME_CHECK == 0 and \
+                (time_is_up(self._deadline) or self._stop is not None and self._stop.is_set()):
+            self._timed_out = True
+        if self._timed_out:
+            return 0
+
+        winner = game.get_winner()
+        if winner == 'Draw':
+            return 0
+        elif winner is not None:
+            # The game was won by the player who made the last move
+            return -(WIN_SCORE + depth)
+
+        piece = 1 if game.is_red_active else 2
+        if depth == 0:
+            return evaluate(game, piece)
+
+        # A win on this move scores the same as searching it would, without the search
+        if tactics.winning_moves(game, piece) != []:
+            return WIN_SCORE + depth - 1
+
+        key = game.canonical_hash()
+        entry = self._table.lookup(key)
+        tt_move = None
+        if entry is not None:
+            if entry.depth >= depth:
+                if entry.flag == EXACT \
+                        or (entry.flag == LOWER_BOUND and entry.value >= beta) \
+                        or (entry.flag == UPPER_BOUND and entry.value <= alpha):
+                    return entry.value
+            if entry.best_move is not None:
+                tt_move = game.from_canonical(entry.best_move)
+
+        original_alpha = alpha
+        best_value = -math.inf
+        best_move = None
+        for move in self._order_moves(game, tt_move, ply):
+            game.drop_piece(move[0], move[1], piece)
+            value = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.undo_move()
+
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+
+            if alpha >= beta:
+                self._record_cutoff(move[1], depth, ply)
+                break
+
+        if self._timed_out:
+            return 0
+
+        if best_value <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
         else:
-            red_win = 0
-        tree.insert_move_sequence(rollout[1], red_win)
+            flag = EXACT
+        self._table.store(key, best_value, game.to_canonical(best_move), depth, flag)
+
+        return best_value
+
+    def _order_moves(self, game: Board, tt_move: Optional[tuple[int, int]],
+                     ply: int) -> list[tuple[int, int]]:
+        """Return the valid moves of game in the order they should be searched."""
+        killers = self._killers[ply]
+        centre = (game.size - 1) / 2
+        tt_col = tt_move[1] if tt_move is not None else -1
+
+        return sorted(game.get_valid_moves(),
+                      key=lambda move: (move[1] != tt_col, move[1] not in killers,
+                                        -self._history[move[1]], abs(move[1] - centre)))
+
+    def _record_cutoff(self, col: int, depth: int, ply: int) -> None:
+        """Remember that the move in column col caused a cutoff ply moves below
+        the root, with depth moves left to search."""
+        killers = self._killers[ply]
+        if col not in killers:
+            killers.insert(0, col)
+            del killers[2:]
 
+        # Cutoffs far from the leaves save the most work
+        self._history[col] += depth * depth
 
-def monte_carlo_rollout(red: Player, yellow: Player, move: tuple, game_state: Board) \
-        -> tuple[str, list[tuple[int, int]]]:
-    """Performs one rollout (simulation) of a game and returns a tuple of the winner
-    and the list of moves made in the game.
 
-    Each move made is completely random, as guided by the Monte Carlo Tree Search
-    definition.
+def known_move(game: Board, deadline: Optional[float] = None,
+               endgame_threshold: Optional[int] = None) -> Optional[tuple[int, int]]:
+    """Return the best move for the player to move in game if it is already known,
+    either from the opening book or by solving the endgame exactly. Otherwise, return None.
+
+    Endgames with at most endgame_threshold empty cells are solved, or if it is None,
+    those the shared endgame solver can solve. If there is a deadline, the solver
+    gives up after half of the time left, so the player still has time to search.
 
     Preconditions:
-        - isinstance(yellow, RandomPlayer)
-        - isinstance(red, RandomPlayer)
+        - game.get_winner() is None
     """
+    move = opening_book.book_move(game)
+    if move is not None:
+        return move
 
-    # create the move sequence list with the move that's already been played
-    move_sequences = [move]
+    solver = endgame.get_endgame_solver(game.size)
+    if solver.can_solve(game, endgame_threshold):
+        solve_deadline = None if deadline is None \
+            else time.perf_counter() + time_left(deadline) / 2
+        solved = solver.solve(game, solve_deadline)
+        if solved is not None:
+            return solved[1]
 
-    # yellow is the current player to start because red (the ai) had already made
-    # the previous move.
-    current_player = yellow
-    piece = 2
+    return None
 
-    # loop until the game has finished
-    while game_state.get_winner() is None:
-        # a previous move is not passed in as both RandomPlayer and this AI
-        # does not require it.
-        previous_move = current_player.make_move(game_state, None)
-        game_state.drop_piece(previous_move[0], previous_move[1], piece)
-        move_sequences.append(previous_move)
 
-        if current_player is red:
-            current_player = yellow
-            piece = 2
+def get_deadline(time_budget_ms: Optional[int]) -> Optional[float]:
+    """Return the time.perf_counter() value at which a player with the given
+    time budget must return its move, or None if there is no time budget."""
+    if time_budget_ms is None:
+        return None
+
+    return time.perf_counter() + time_budget_ms / 1000
+
+
+def time_is_up(deadline: Optional[float]) -> bool:
+    """Return whether the given deadline has passed. A deadline of None never passes."""
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def time_left(deadline: float) -> float:
+    """Return the number of seconds until the given deadline, or 0 if it has passed."""
+    return max(0.0, deadline - time.perf_counter())
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the process pool with the given number of workers, starting it
+    the first time it is needed.
+
+    The pool only starts a worker process when it is given a task, so a task is
+    given to every worker straight away and waited for. The processes are then
+    running, with this module imported, before the first games are simulated.
+    """
+    if workers not in _POOLS:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        for future in [pool.submit(start_worker) for _ in range(workers)]:
+            future.result()
+        _POOLS[workers] = pool
+
+    return _POOLS[workers]
+
+
+def start_worker() -> None:
+    """Do nothing. Running this in a worker process of a pool makes the pool start
+    the process and import this module in it (see get_process_pool)."""
+    return
+
+
+def simulate_batch(board_type: type[Board], size: int, history: list[tuple[int, int, int]],
+                   moves: list[tuple[int, int]], num_sims: int, use_numpy: bool,
+                   policy: RolloutPolicy = uniform_policy, use_rave: bool = False) \
+        -> tuple[list[float], Optional[game_tree.RaveStats]]:
+    """Return the total score of num_sims games simulated after Red makes each of the
+    given moves in the game whose moves are history (see Board.get_moves), and the all
+    moves as first statistics of the games if use_rave is True (or None).
+
+    This runs in a worker process of the pool returned by get_process_pool, so the
+    game is rebuilt as a board_type of the given size from its moves.
+
+    Preconditions:
+        - all(move is a valid move of the game for move in moves)
+    """
+    game = board_type(size)
+    for row, col, piece in history:
+        game.drop_piece(row, col, piece)
+
+    if use_numpy:
+        return (vectorised_scores(game, moves, num_sims, np.random.default_rng()), None)
+
+    batch_scores = []
+    rave = game_tree.RaveStats(1) if use_rave else None
+    for move in moves:
+        results = game_tree.MoveStats()
+        game.drop_piece(move[0], move[1], 1)
+        simulate_results(results, game, move, num_sims, policy, rave)
+        game.undo_move()
+        batch_scores.append(results.score)
+
+    return (batch_scores, rave)
+
+
+def vectorised_scores(game: Board, moves: list[tuple[int, int]], num_sims: int,
+                      rng: np.random.Generator) -> list[float]:
+    """Return the number of Red wins minus the number of Yellow wins out of num_sims
+    games simulated with NumPy after Red makes each of the given moves in game.
+    game is left unchanged."""
+    results = vectorised.batch_rollout_after(game, moves, num_sims, rng)
+    return [float(np.count_nonzero(row == vectorised.RED_WIN)
+                  - np.count_nonzero(row == vectorised.YELLOW_WIN)) for row in results]
+
+
+def evaluate(game: Board, piece: int) -> int:
+    """Return a heuristic value of game for the player with the given piece.
+
+    Every winning line that only holds pieces of one colour is still open to that
+    colour, and is worth more the more pieces it already holds. The value is the
+    total worth of the open lines of piece minus that of the other colour.
+
+    Preconditions:
+        - game.get_winner() is None
+    """
+    mine = game.get_line_counts(piece)
+    theirs = game.get_line_counts(3 - piece)
+
+    value = 0
+    for i in range(len(mine)):
+        if theirs[i] == 0:
+            value += mine[i] * mine[i]
+        elif mine[i] == 0:
+            value -= theirs[i] * theirs[i]
+
+    return value
+
+
+def eliminate_moves(moves: list[tuple[int, int]], scores: dict[tuple[int, int], float],
+                    visits: dict[tuple[int, int], int]) -> list[tuple[int, int]]:
+    """Return the moves whose mean score scores[move] / visits[move] could still be
+    the highest, in the same order.
+
+    A move is removed if the upper end of the confidence interval of its mean score
+    is below the lower end of the interval of the move with the best lower end.
+
+    Preconditions:
+        - moves != []
+        - all(visits[move] > 0 for move in moves)
+
+    >>> eliminate_moves([(6, 0), (6, 1), (6, 2)], {(6, 0): 90, (6, 1): -80, (6, 2): 60},
+    ...                 {(6, 0): 100, (6, 1): 100, (6, 2): 100})
+    [(6, 0), (6, 2)]
+    """
+    bounds = {}
+    for move in moves:
+        mean = scores[move] / visits[move]
+        width = ELIMINATION_WIDTH / math.sqrt(visits[move])
+        bounds[move] = (mean - width, mean + width)
+
+    best_lower = max(lower for lower, _ in bounds.values())
+    return [move for move in moves if bounds[move][1] >= best_lower]
+
+
+def simulate(tree: game_tree.GameTree, game_state: Board, move: tuple[int, int],
+             num_sims: Optional[int], policy: RolloutPolicy = uniform_policy,
+             rave: Optional[game_tree.RaveStats] = None) -> None:
+    """This function takes in a game state and begins simulating games until completion.
+
+    move is the move that was just made in game_state, and the rest of each game is
+    played by policy. The tree is updated with each move sequence and the score of
+    the game, and so is rave if it is not None. game_state is left unchanged once all
+    of the games have been simulated."""
+    for _ in range(num_sims):
+        # rollout (simulate 1 game) the game state using the rollout policy.
+        winner, moves = play_out(game_state, policy)
+
+        # undo every move of the rollout except the first, which was made
+        # before simulating, to restore the state of the board for the next game.
+        for _ in range(len(moves)):
+            game_state.undo_move()
+
+        # apply the score of the game to the move sequence and insert the
+        # move sequence of the 1 rollout to the tree.
+        if winner == 'Red':
+            red_win = 1.0
+        elif winner == 'Yellow':
+            red_win = -1.0
         else:
-            current_player = red
-            piece = 1
+            red_win = 0
+        tree.insert_move_sequence([move] + moves, red_win)
+        if rave is not None:
+            rave.record([move] + moves, winner)
+
+
+def simulate_results(results: game_tree.MoveStats, game_state: Board, move: tuple[int, int],
+                     num_sims: int, policy: RolloutPolicy = uniform_policy,
+                     rave: Optional[game_tree.RaveStats] = None) -> None:
+    """Simulate num_sims games the same way as simulate, but only record their
+    results in results (and their moves in rave, if it is not None) instead of
+    inserting every game into a GameTree.
+
+    game_state is left unchanged once all of the games have been simulated."""
+    for _ in range(num_sims):
+        winner, moves = play_out(game_state, policy)
+
+        for _ in range(len(moves)):
+            game_state.undo_move()
 
-    return game_state.get_winner(), move_sequences
+        results.record(winner)
+        if rave is not None:
+            rave.record([move] + moves, winner)
 
 
 def run_game(red: Player, yellow: Player, size: int) -> tuple[str, list[tuple[int, int]]]:
@@ -325,7 +1223,9 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
                           'pprint', 'plotly', 'players', 'tree_generation',
-                          'game_tree', 'copy', 'random', 'menu'],
+                          'game_tree', 'copy', 'random', 'menu', 'numpy', 'vectorised', 'symmetry',
+                          'time', 'os', 'concurrent.futures', 'transposition', 'tactics',
+                          'opening_book', 'endgame', 'threading', 'rollouts'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['R1705', 'C0200', 'E1136', 'E9999']
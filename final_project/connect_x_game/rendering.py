@@ -0,0 +1,111 @@
+"""CSC111 Winter 2021 Project, Rendering file
+
+This file contains the functions that draw Connect X games with pygame
+and plot their statistics with plotly.
+
+They are kept apart from the game logic so that code which only plays
+games, such as the players and tree generation, does not have to import
+pygame or plotly.
+
+Copyright and Usage Information
+===============================
+
+Base Code was retrieved from: https://github.com/KeithGalli/Connect4-Python
+Corresponding Youtube Tutorial: https://youtube.com/watch?v=XpYz-q1lxu8&t=154s
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import pygame
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from constants import *
+from board import Board
+
+
+def draw_board(board: Board, screen: pygame.Surface) -> None:
+    """Draw the given board on the given pygame screen"""
+
+    # Draw an empty board
+    for c in range(board.size):
+        for r in range(board.size):
+            pygame.draw.rect(screen, BLUE, (c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE,
+                                            SQUARESIZE, SQUARESIZE))
+            pygame.draw.circle(screen, BLACK, (
+                int(c * SQUARESIZE + SQUARESIZE / 2),
+                int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)), RADIUS)
+
+    # Iterate through the board attribute of board to determine where
+    # to draw the pieces that have been dropped
+    for c in range(board.size):
+        for r in range(board.size):
+            if board.board[r][c] == 1:
+                pygame.draw.circle(screen, RED, (
+                    int(c * SQUARESIZE + SQUARESIZE / 2),
+                    board.height - int((board.size - r - 1)
+                                       * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
+            elif board.board[r][c] == 2:
+                pygame.draw.circle(screen, YELLOW, (
+                    int(c * SQUARESIZE + SQUARESIZE / 2), board.height - int(
+                        (board.size - r - 1) * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
+    pygame.display.update()
+
+
+#
+# def run_games(n: int, red: Player, yellow: Player, game_state: Board, show_stats: bool = True) \
+#       -> None:
+#     """Run n games using the given Players.
+#     """
+#     stats = {'Red': 0, 'Yellow': 0, 'Draw': 0}
+#     results = []
+#     for i in range(0, n):
+#         winner, _ = run_game(red, yellow, game_state)
+#         stats[winner] += 1
+#         results.append(winner)
+#
+#         print(f'Game {i} winner: {winner}')
+#
+#     for outcome in stats:
+#         print(f'{outcome}: {stats[outcome]}/{n} ({100.0 * stats[outcome] / n:.2f}%)')
+#
+#     if show_stats:
+#         plot_game_statistics(results)
+
+
+def plot_game_statistics(results: list[str]) -> None:
+    """Plot the outcomes and win probabilities for a given list of Minichess game results.
+    """
+    outcomes = [1 if result == 'Red' else 0 for result in results]
+
+    cumulative_win_probability = [sum(outcomes[0:i]) / i for i in range(1, len(outcomes) + 1)]
+    rolling_win_probability = \
+        [sum(outcomes[max(i - 50, 0):i]) / min(50, i) for i in range(1, len(outcomes) + 1)]
+
+    fig = make_subplots(rows=2, cols=1)
+    fig.add_trace(go.Scatter(y=outcomes, mode='markers',
+                             name='Outcome (1 = Red win, 0 = Draw/Yellow win)'),
+                  row=1, col=1)
+    fig.add_trace(go.Scatter(y=cumulative_win_probability, mode='lines',
+                             name='Red win percentage (cumulative)'),
+                  row=2, col=1)
+    fig.add_trace(go.Scatter(y=rolling_win_probability, mode='lines',
+                             name='Red win percentage (most recent 50 games)'),
+                  row=2, col=1)
+    fig.update_yaxes(range=[0.0, 1.0], row=2, col=1)
+
+    fig.update_layout(title='Connect X Game Results', xaxis_title='Game')
+    fig.show()
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -0,0 +1,103 @@
+"""CSC111 Winter 2021 Project, Rollout policies file
+
+This file contains the rollout policies that simulation based players use
+to play out games to the end.
+
+A rollout policy is a function that takes a game and the piece of the player
+to move, and returns the move that player makes. Policies are called directly
+for every move of a rollout, so they do not go through Player.make_move.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from typing import Callable
+
+import random
+
+import tactics
+from board import Board
+
+RolloutPolicy = Callable[[Board, int], tuple[int, int]]
+
+
+def uniform_policy(game: Board, piece: int) -> tuple[int, int]:
+    """Return a uniformly random valid move of game.
+
+    Preconditions:
+        - game.get_winner() is None
+    """
+    return random.choice(game.get_valid_moves())
+
+
+def tactical_policy(game: Board, piece: int) -> tuple[int, int]:
+    """Return a winning move of game for piece if there is one, otherwise a move that
+    blocks the other player from winning, otherwise a random move that does not let
+    the other player win straight away (if there is one).
+
+    Preconditions:
+        - game.get_winner() is None
+    """
+    valid_moves = game.get_valid_moves()
+
+    threats = tactics.threat_cells(game, piece)
+    for move in valid_moves:
+        if move in threats:
+            return move
+
+    other_threats = tactics.threat_cells(game, 3 - piece)
+    for move in valid_moves:
+        if move in other_threats:
+            return move
+
+    safe = [move for move in valid_moves if (move[0] - 1, move[1]) not in other_threats]
+    return random.choice(safe or valid_moves)
+
+
+def centre_policy(game: Board, piece: int) -> tuple[int, int]:
+    """Return a random valid move of game, where columns closer to the centre
+    are more likely to be chosen.
+
+    Preconditions:
+        - game.get_winner() is None
+    """
+    valid_moves = game.get_valid_moves()
+    # The centre column has weight size // 2 + 1 and the edge columns have weight 1
+    weights = [game.size // 2 + 1 - abs(2 * move[1] - game.size + 1) // 2
+               for move in valid_moves]
+    return random.choices(valid_moves, weights)[0]
+
+
+# The built in rollout policies, by name
+POLICIES = {'uniform': uniform_policy, 'tactical': tactical_policy, 'centre': centre_policy}
+
+
+def play_out(game: Board, policy: RolloutPolicy) -> tuple[str, list[tuple[int, int]]]:
+    """Play game to the end, choosing the moves of both players with policy.
+
+    Return the winner and the list of moves made. The moves are not undone.
+    """
+    moves = []
+    piece = 1 if game.is_red_active else 2
+
+    while game.get_winner() is None:
+        move = policy(game, piece)
+        game.drop_piece(move[0], move[1], piece)
+        moves.append(move)
+        piece = 3 - piece
+
+    return game.get_winner(), moves
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'tactics'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -0,0 +1,68 @@
+"""CSC111 Winter 2021 Project, Symmetry file
+
+This file contains helpers for the left-right mirror symmetry of Connect X.
+
+A position and its mirror image have the same value, so trees, tables
+and caches only need to store one of them. The stored one is called the
+canonical position.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+
+
+def mirror_move(move: tuple[int, int], size: int) -> tuple[int, int]:
+    """Return the move that mirrors move across the centre column of a size x size board.
+
+    >>> mirror_move((6, 0), 7)
+    (6, 6)
+    >>> mirror_move((3, 3), 7)
+    (3, 3)
+    """
+    return (move[0], size - 1 - move[1])
+
+
+def is_symmetric_move(move: tuple[int, int], size: int) -> bool:
+    """Return whether move is its own mirror image, i.e. it is in the centre column.
+
+    >>> is_symmetric_move((6, 3), 7)
+    True
+    >>> is_symmetric_move((6, 2), 7)
+    False
+    """
+    return move[1] == size - 1 - move[1]
+
+
+def canonical_sequence(moves: list[tuple[int, int]], size: int) -> list[tuple[int, int]]:
+    """Return the canonical version of a sequence of moves from the start of a game.
+
+    A sequence and its mirror image have the same canonical version. The canonical
+    version is the one whose first move outside of the centre column is on the left.
+
+    >>> canonical_sequence([(6, 3), (6, 5), (6, 1)], 7)
+    [(6, 3), (6, 1), (6, 5)]
+    >>> canonical_sequence([(6, 3), (6, 1), (6, 5)], 7)
+    [(6, 3), (6, 1), (6, 5)]
+    """
+    for move in moves:
+        if not is_symmetric_move(move, size):
+            if move[1] > size - 1 - move[1]:
+                return [mirror_move(m, size) for m in moves]
+            return list(moves)
+
+    return list(moves)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
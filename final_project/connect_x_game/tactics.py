@@ -0,0 +1,154 @@
+"""CSC111 Winter 2021 Project, Tactics file
+
+This file contains quick tactical checks of a Connect X position that
+players can make before (or instead of) searching.
+
+The checks are built on the per-line piece counts of the Board, so
+finding every winning move only takes one pass over the winning lines
+instead of trying every move and checking the whole board for a winner.
+
+A threat of a colour is an empty cell that would complete a line of that
+colour. It can only be played once the cell below it has been filled.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from board import Board
+
+
+def threat_cells(game: Board, piece: int) -> set[tuple[int, int]]:
+    """Return every empty cell of game that would complete a line for the
+    color corresponding to piece, whether or not it can be played yet.
+
+    >>> from board import Board
+    >>> game = Board(7)
+    >>> for col in range(3):
+    ...     game.drop_piece(6, col, 1)
+    >>> sorted(threat_cells(game, 1))
+    [(6, 3)]
+    >>> threat_cells(game, 2)
+    set()
+    """
+    size = game.size
+    lines = game.winning_lines.lines
+    almost = game.winning_lines.connect - 1
+    mine = game.get_line_counts(piece)
+    theirs = game.get_line_counts(3 - piece)
+    grid = game.board
+
+    threats = set()
+    for i in range(len(lines)):
+        if mine[i] == almost and theirs[i] == 0:
+            # Exactly one cell of the line is still empty
+            for cell in lines[i]:
+                row, col = divmod(cell, size)
+                if grid[row][col] == 0:
+                    threats.add((row, col))
+                    break
+
+    return threats
+
+
+def winning_moves(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves of game that win immediately for the color
+    corresponding to piece.
+
+    >>> from board import Board
+    >>> game = Board(7)
+    >>> for col in range(3):
+    ...     game.drop_piece(6, col, 1)
+    >>> winning_moves(game, 1)
+    [(6, 3)]
+    """
+    threats = threat_cells(game, piece)
+    return [move for move in game.get_valid_moves() if move in threats]
+
+
+def forced_blocks(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves that the color corresponding to piece must play
+    to stop the other color from winning on its next move.
+
+    If more than one move is returned, the other color cannot be stopped.
+    """
+    return winning_moves(game, 3 - piece)
+
+
+def unsafe_moves(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves of the color corresponding to piece that are
+    directly under a threat of the other color, so playing them lets the
+    other color win in that column.
+
+    >>> from board import Board
+    >>> game = Board(7)
+    >>> for col in range(3):
+    ...     game.drop_piece(5, col, 2)
+    ...     game.drop_piece(6, col, 1)
+    >>> unsafe_moves(game, 1)
+    [(6, 3)]
+    """
+    threats = threat_cells(game, 3 - piece)
+    return [move for move in game.get_valid_moves() if (move[0] - 1, move[1]) in threats]
+
+
+def safe_moves(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves of the color corresponding to piece after which
+    the other color cannot win immediately.
+
+    A move is safe if it blocks every threat of the other color that can be
+    played, and is not directly under one.
+    """
+    threats = threat_cells(game, 3 - piece)
+    valid_moves = game.get_valid_moves()
+    playable = [move for move in valid_moves if move in threats]
+
+    safe = []
+    for move in valid_moves:
+        # The move only blocks a threat if it is the only playable one
+        if all(threat == move for threat in playable) \
+                and (move[0] - 1, move[1]) not in threats:
+            safe.append(move)
+
+    return safe
+
+
+def double_threats(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves after which the color corresponding to piece has
+    at least two winning moves, so the other color can only block one of them.
+
+    Moves that win immediately are not included. game is left unchanged.
+
+    >>> from board import Board
+    >>> game = Board(7)
+    >>> for col in (2, 3):
+    ...     game.drop_piece(6, col, 1)
+    >>> double_threats(game, 1)
+    [(6, 1), (6, 4)]
+    """
+    threats = threat_cells(game, piece)
+
+    doubles = []
+    for move in game.get_valid_moves():
+        if move in threats:
+            continue
+
+        game.drop_piece(move[0], move[1], piece)
+        if len(winning_moves(game, piece)) >= 2:
+            doubles.append(move)
+        game.undo_move()
+
+    return doubles
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -0,0 +1,42 @@
+"""CSC111 Winter 2021 Project, test configuration file
+
+The game modules import each other by their plain names (for example
+``from board import Board``), so the game directory is put on the path.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board  # noqa: E402
+
+
+def random_position(size: int, num_moves: int, rng: random.Random,
+                    board_type: type = Board) -> Board:
+    """Return a board_type of the given size after up to num_moves random moves,
+    stopping early if the game ends."""
+    game = board_type(size)
+    piece = 1
+    for _ in range(num_moves):
+        if game.get_winner() is not None:
+            break
+        move = rng.choice(game.get_valid_moves())
+        game.drop_piece(move[0], move[1], piece)
+        piece = 3 - piece
+
+    return game
+
+
+def random_unfinished_position(size: int, num_moves: int, rng: random.Random) -> Board:
+    """Return a board of the given size after exactly num_moves random moves in which
+    nobody has won yet."""
+    while True:
+        game = random_position(size, num_moves, rng)
+        if game.get_winner() is None and game.count_empty_cells() == size * size - num_moves:
+            return game
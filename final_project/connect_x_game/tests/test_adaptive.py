@@ -0,0 +1,105 @@
+"""CSC111 Winter 2021 Project, adaptive simulation tests
+
+eliminate_moves is checked against its confidence intervals, and the adaptive
+rounds of MonteCarloFreeVersion are checked to stop simulating eliminated moves
+and to keep to their budget.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import math
+import random
+
+import players
+from conftest import random_unfinished_position
+from players import ELIMINATION_WIDTH, ROUND_SIMULATIONS, MonteCarloFreeVersion, \
+    eliminate_moves
+
+
+def random_results(rng: random.Random) -> tuple[list[tuple[int, int]], dict, dict]:
+    """Return random moves with random scores and visits."""
+    moves = [(6, col) for col in rng.sample(range(11), rng.randint(1, 11))]
+    visits = {move: rng.randint(1, 400) for move in moves}
+    scores = {move: rng.uniform(-1, 1) * visits[move] for move in moves}
+    return (moves, scores, visits)
+
+
+def test_best_mean_is_never_eliminated() -> None:
+    """The move with the best mean score always survives, and the order is kept."""
+    rng = random.Random(0)
+    for _ in range(500):
+        moves, scores, visits = random_results(rng)
+        kept = eliminate_moves(moves, scores, visits)
+
+        best = max(moves, key=lambda m: scores[m] / visits[m])
+        assert best in kept
+        assert kept == [move for move in moves if move in kept]
+
+
+def test_only_clearly_worse_moves_are_eliminated() -> None:
+    """A move is removed exactly when its whole confidence interval is below the
+    interval of some other move."""
+    rng = random.Random(1)
+    eliminated = 0
+    for _ in range(500):
+        moves, scores, visits = random_results(rng)
+        kept = eliminate_moves(moves, scores, visits)
+
+        for move in moves:
+            upper = scores[move] / visits[move] + ELIMINATION_WIDTH / math.sqrt(visits[move])
+            clearly_worse = any(
+                upper < scores[other] / visits[other]
+                - ELIMINATION_WIDTH / math.sqrt(visits[other]) for other in moves)
+            assert (move not in kept) == clearly_worse
+            eliminated += clearly_worse
+
+    assert eliminated > 0
+
+
+def test_equal_moves_are_kept() -> None:
+    """Moves with the same mean score and visits are never told apart."""
+    moves = [(6, col) for col in range(7)]
+    assert eliminate_moves(moves, {move: 30.0 for move in moves},
+                           {move: 1000 for move in moves}) == moves
+
+
+def test_adaptive_rounds(monkeypatch) -> None:
+    """Eliminated moves get no more games, the games stay within the budget, and the
+    move returned survived every round."""
+    rng = random.Random(2)
+    eliminated = 0
+    for _ in range(8):
+        game = random_unfinished_position(7, 2 * rng.randint(2, 10), rng)
+        moves = game.get_valid_moves()
+        rounds = [[]]
+        survivors = [moves]
+
+        def record_games(results, game_state, move, num_sims, policy, rave) -> None:
+            rounds[-1].append((move, num_sims))
+            simulate_results(results, game_state, move, num_sims, policy, rave)
+
+        def record_elimination(active, scores, visits) -> list:
+            kept = eliminate_moves(active, scores, visits)
+            survivors.append(kept)
+            rounds.append([])
+            return kept
+
+        simulate_results = players.simulate_results
+        monkeypatch.setattr(players, 'simulate_results', record_games)
+        monkeypatch.setattr(players, 'eliminate_moves', record_elimination)
+        move = MonteCarloFreeVersion(adaptive=True).make_move(game, game.last_move, num_sims=100)
+        monkeypatch.undo()
+
+        if rounds == [[]]:
+            # The move won at once without simulating
+            continue
+        for i, games in enumerate(rounds):
+            assert {simulated for simulated, _ in games} <= set(survivors[i])
+        total = sum(num_sims for games in rounds for _, num_sims in games)
+        assert total <= 100 * len(moves) + ROUND_SIMULATIONS * len(moves)
+        assert all(move in kept for kept in survivors)
+        eliminated += len(moves) - len(survivors[-1])
+
+    assert eliminated > 0
@@ -0,0 +1,85 @@
+"""CSC111 Winter 2021 Project, BitBoard tests
+
+BitBoard is checked against Board on random games of every board size.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from conftest import random_position
+
+
+def assert_same_state(board: Board, bitboard: BitBoard) -> None:
+    """Assert that board and bitboard hold the same position."""
+    assert [list(row) for row in bitboard.board] == board.board
+    assert bitboard.get_valid_moves() == board.get_valid_moves()
+    assert bitboard.get_winner() == board.get_winner()
+    assert bitboard.is_red_active == board.is_red_active
+    assert bitboard.last_move == board.last_move
+    assert bitboard.zobrist_hash == board.zobrist_hash
+    assert bitboard.canonical_hash() == board.canonical_hash()
+    assert bitboard.count_empty_cells() == board.count_empty_cells()
+    for piece in (1, 2):
+        assert bitboard.winning_move(piece) == board.winning_move(piece)
+        assert bitboard.get_line_counts(piece) == board.get_line_counts(piece)
+    for col in range(board.size):
+        assert bitboard.get_next_open_row(col) == board.get_next_open_row(col)
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_random_games_match_board(size: int) -> None:
+    """Play random games on both boards, then take every move back."""
+    rng = random.Random(size)
+    for _ in range(20):
+        board = Board(size)
+        bitboard = BitBoard(size)
+        piece = 1
+        while board.get_winner() is None:
+            move = rng.choice(board.get_valid_moves())
+            board.drop_piece(move[0], move[1], piece)
+            bitboard.drop_piece(move[0], move[1], piece)
+            piece = 3 - piece
+            assert_same_state(board, bitboard)
+
+        while board.last_move is not None:
+            assert bitboard.undo_move() == board.undo_move()
+            assert_same_state(board, bitboard)
+
+
+def test_clone_is_independent() -> None:
+    """Moves on a clone do not change the original."""
+    bitboard = BitBoard(7)
+    bitboard.drop_piece(6, 3, 1)
+    clone = bitboard.clone()
+    clone.drop_piece(5, 3, 2)
+
+    assert bitboard.board[5][3] == 0
+    assert clone.board[5][3] == 2
+    assert bitboard.get_valid_moves() != clone.get_valid_moves()
+
+
+def test_board_is_read_only() -> None:
+    """The grid of a BitBoard cannot be written to, since writes would be lost."""
+    bitboard = BitBoard(7)
+    with pytest.raises(TypeError):
+        bitboard.board[6][3] = 1
+
+
+def test_board_setter_loads_grid() -> None:
+    """Assigning a grid to board loads its pieces into the bitboards."""
+    rng = random.Random(0)
+    for size in (7, 9, 11):
+        board = random_position(size, 2 * size, rng)
+        bitboard = BitBoard(size)
+        bitboard.board = board.board
+
+        assert [list(row) for row in bitboard.board] == board.board
+        assert bitboard.bitboards[0] == bitboard.bitboards[1] | bitboard.bitboards[2]
+        assert bin(bitboard.bitboards[0]).count('1') == len(board.get_moves())
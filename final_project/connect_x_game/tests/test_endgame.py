@@ -0,0 +1,212 @@
+"""CSC111 Winter 2021 Project, endgame solver tests
+
+EndgameSolver is checked against a search of every line of play without any
+pruning on random 7x7 endgames. The solvers here save to a temporary directory,
+so the cache of the player is never touched.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import logging
+import os
+import random
+import time
+
+import pytest
+
+import endgame
+from board import Board
+from conftest import random_unfinished_position
+from endgame import DRAW, LOSS, WIN, EndgameSolver
+from opening_book import write_book
+from players import MCTSPlayer, MonteCarloFreeVersion, NegamaxPlayer, SabotagePlayer
+
+
+def brute_force(game: Board, results: dict) -> int:
+    """Return the result of game for the player to move with perfect play, found by
+    playing out every move. results holds the positions already solved."""
+    key = tuple(tuple(row) for row in game.board)
+    if key in results:
+        return results[key]
+
+    winner = game.get_winner()
+    if winner == 'Draw':
+        result = DRAW
+    elif winner is not None:
+        result = LOSS
+    else:
+        piece = 1 if game.is_red_active else 2
+        result = LOSS
+        for row, col in game.get_valid_moves():
+            game.drop_piece(row, col, piece)
+            result = max(result, -brute_force(game, results))
+            game.undo_move()
+
+    results[key] = result
+    return result
+
+
+def endgames(seed: int) -> list[Board]:
+    """Return random unfinished 7x7 positions with 8 to 10 empty cells."""
+    rng = random.Random(seed)
+    return [random_unfinished_position(7, rng.randint(39, 41), rng) for _ in range(40)]
+
+
+def test_solve_matches_brute_force(tmp_path) -> None:
+    """Every result matches brute force, and the move returned achieves it."""
+    solver = EndgameSolver(7, path=os.path.join(str(tmp_path), 'endgame_7.bin'))
+    results = {}
+    seen = set()
+    for game in endgames(0):
+        assert solver.can_solve(game)
+        grid = [row[:] for row in game.board]
+        expected = brute_force(game, results)
+
+        result, move = solver.solve(game)
+        assert result == expected
+        assert game.board == grid
+        seen.add(result)
+
+        piece = 1 if game.is_red_active else 2
+        game.drop_piece(move[0], move[1], piece)
+        assert -brute_force(game, results) == expected
+        game.undo_move()
+
+    # The positions should cover every result
+    assert seen == {WIN, DRAW, LOSS}
+
+
+def test_saved_results_are_reused(tmp_path) -> None:
+    """Nothing is written until save, and a new solver reads back the same answers
+    without solving again."""
+    path = os.path.join(str(tmp_path), 'cache', 'endgame_7.bin')
+    solver = EndgameSolver(7, path=path)
+    games = endgames(1)
+    answers = [solver.solve(game) for game in games]
+    assert not os.path.exists(path)
+
+    solver.save()
+    keys = {game.canonical_hash() for game in games}
+    assert len(solver.book) == len(keys)
+
+    new_solver = EndgameSolver(7, path=path)
+    assert [new_solver.solve(game) for game in games] == answers
+    assert new_solver._new_entries == {}
+
+    # Saving with nothing new leaves the file as it was
+    modified = os.path.getmtime(path)
+    new_solver.save()
+    assert os.path.getmtime(path) == modified
+
+
+def test_can_solve_threshold() -> None:
+    """Only positions with at most threshold empty cells can be solved."""
+    solver = EndgameSolver(7, threshold=10)
+    rng = random.Random(2)
+    for num_moves in range(0, 45, 3):
+        game = random_unfinished_position(7, num_moves, rng)
+        assert solver.can_solve(game) == (49 - num_moves <= 10)
+
+
+@pytest.mark.parametrize('contents', [b'', b'CXBK', b'NOPE' + bytes(20), 'cut short'])
+def test_unreadable_book_is_discarded(tmp_path, caplog, contents) -> None:
+    """A saved file that cannot be read is logged and thrown away, and the solver
+    carries on with an empty book."""
+    path = os.path.join(str(tmp_path), 'endgame_7.bin')
+    if contents == 'cut short':
+        write_book(path, 7, {1: 2, 3: 4})
+        with open(path, 'rb') as file:
+            contents = file.read()[:-1]
+    with open(path, 'wb') as file:
+        file.write(contents)
+
+    solver = EndgameSolver(7, path=path)
+    game = endgames(3)[0]
+    with caplog.at_level(logging.WARNING, logger='endgame'):
+        result, move = solver.solve(game)
+    assert result == brute_force(game, {})
+    assert move in game.get_valid_moves()
+    assert path in caplog.text
+    assert not os.path.exists(path)
+
+    solver.save()
+    assert len(EndgameSolver(7, path=path).book) == 1
+
+
+@pytest.mark.parametrize('make_player', [
+    lambda: MonteCarloFreeVersion(use_book=True),
+    lambda: MCTSPlayer(use_book=True),
+    lambda: NegamaxPlayer(use_book=True),
+    lambda: SabotagePlayer(use_book=True),
+], ids=['monte_carlo', 'mcts', 'negamax', 'sabotage'])
+def test_players_survive_unreadable_cache(tmp_path, monkeypatch, make_player) -> None:
+    """A player using the shared solver still moves when the saved endgames in the
+    cache directory cannot be read."""
+    monkeypatch.setattr(endgame, 'CACHE_DIRECTORY', str(tmp_path))
+    monkeypatch.setattr(endgame, '_SOLVERS', {})
+    with open(os.path.join(str(tmp_path), 'endgame_7.bin'), 'wb') as file:
+        file.write(b'CXBK\x01')
+
+    player = make_player()
+    for game in endgames(4)[:3]:
+        assert endgame.get_endgame_solver(7).can_solve(game)
+        move = player.make_move(game, game.last_move, num_sims=5)
+        assert move in game.get_valid_moves()
+
+
+def test_solve_gives_up_at_deadline(tmp_path) -> None:
+    """A solve whose deadline has passed returns None and keeps nothing, and a later
+    solve of the same position is still right."""
+    rng = random.Random(5)
+    solver = EndgameSolver(9, path=os.path.join(str(tmp_path), 'endgame_9.bin'))
+    gave_up = 0
+    for _ in range(10):
+        game = random_unfinished_position(9, 81 - 16, rng)
+        # Positions that take only a few hundred nodes are solved before the first check
+        if solver.solve(game, time.perf_counter()) is None:
+            assert game.canonical_hash() not in solver._new_entries
+            gave_up += 1
+
+        fresh = EndgameSolver(9, path=os.path.join(str(tmp_path), 'fresh.bin'))
+        assert solver.solve(game)[0] == fresh.solve(game)[0]
+
+    assert gave_up > 0
+
+
+def test_can_solve_with_lower_threshold() -> None:
+    """A threshold given to can_solve replaces the threshold of the solver."""
+    solver = EndgameSolver(7, threshold=16)
+    game = random_unfinished_position(7, 49 - 12, random.Random(6))
+    assert solver.can_solve(game)
+    assert solver.can_solve(game, 12)
+    assert not solver.can_solve(game, 11)
+
+
+@pytest.mark.parametrize('make_player', [
+    lambda threshold: MonteCarloFreeVersion(use_book=True, endgame_threshold=threshold),
+    lambda threshold: MCTSPlayer(use_book=True, endgame_threshold=threshold),
+    lambda threshold: NegamaxPlayer(use_book=True, endgame_threshold=threshold),
+    lambda threshold: SabotagePlayer(use_book=True, endgame_threshold=threshold),
+], ids=['monte_carlo', 'mcts', 'negamax', 'sabotage'])
+def test_timed_players_keep_to_budget_in_endgames(tmp_path, monkeypatch, make_player) -> None:
+    """Solving an endgame does not make a timed move overrun its budget, and a player
+    with a lower threshold does not solve larger endgames."""
+    monkeypatch.setattr(endgame, 'CACHE_DIRECTORY', str(tmp_path))
+    monkeypatch.setattr(endgame, '_SOLVERS', {})
+    rng = random.Random(7)
+    games = [random_unfinished_position(9, 81 - 16, rng) for _ in range(5)]
+
+    player = make_player(None)
+    for game in games:
+        start = time.perf_counter()
+        move = player.make_move(game, game.last_move, time_budget_ms=100)
+        assert move in game.get_valid_moves()
+        assert time.perf_counter() - start < 0.3
+
+    monkeypatch.setattr(endgame, '_SOLVERS', {})
+    player = make_player(8)
+    for game in games:
+        player.make_move(game, game.last_move, time_budget_ms=20)
+    assert endgame.get_endgame_solver(9)._new_entries == {}
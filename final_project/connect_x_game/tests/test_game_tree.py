@@ -0,0 +1,139 @@
+"""CSC111 Winter 2021 Project, GameTree tests
+
+GameTree nodes are checked to find their subtrees by move and to keep them in
+the order they were added, however many there are, and their visit and score
+totals are checked against summing the games through them again.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+from conftest import random_position
+from game_tree import GAME_START_MOVE, GameTree
+
+
+def random_sequences(num_games: int, seed: int) -> list[tuple[list[tuple[int, int]], float]]:
+    """Return the first moves of num_games random 7x7 games, with random scores."""
+    rng = random.Random(seed)
+    sequences = []
+    for _ in range(num_games):
+        game = random_position(7, rng.randint(1, 49), rng)
+        moves = [(row, col) for row, col, _ in game.get_moves()]
+        sequences.append((moves, rng.choice([-1.0, 0.0, 1.0, rng.uniform(-1, 1)])))
+
+    return sequences
+
+
+def test_nodes_have_no_dict() -> None:
+    """Nodes keep only their slots, and the move reads back as it was given."""
+    tree = GameTree((5, 2), False, 0.5)
+    assert not hasattr(tree, '__dict__')
+    assert tree.move == (5, 2)
+    assert not tree.is_red_move
+    assert tree.red_win_probability == 0.5
+    assert GameTree().move == GAME_START_MOVE
+    with pytest.raises(AttributeError):
+        tree.other = 1
+
+
+def test_find_subtree_by_move() -> None:
+    """Every inserted move is found from its parent, in the order it was first added,
+    and no other move is."""
+    tree = GameTree()
+    added = {}
+    for moves, score in random_sequences(300, 0):
+        tree.insert_move_sequence(moves, score)
+        parent = ()
+        for move in moves:
+            added.setdefault(parent, [])
+            if move not in added[parent]:
+                added[parent].append(move)
+            parent += (move,)
+
+    for prefix, children in added.items():
+        node = tree
+        for move in prefix:
+            node = node.find_subtree_by_move(move)
+        assert [subtree.move for subtree in node.get_subtrees()] == children
+        for subtree in node.get_subtrees():
+            assert node.find_subtree_by_move(subtree.move) is subtree
+            assert subtree.is_red_move != node.is_red_move
+        for row in range(7):
+            for col in range(7):
+                if (row, col) not in children:
+                    assert node.find_subtree_by_move((row, col)) is None
+
+
+def test_add_subtree_one_and_many() -> None:
+    """Subtrees added one at a time are found the same way whether there is one or
+    several of them."""
+    tree = GameTree()
+    assert tree.get_subtrees() == []
+    assert tree.find_subtree_by_move((6, 0)) is None
+
+    subtrees = [GameTree((6, col), False) for col in (3, 0, 6, 1)]
+    for i, subtree in enumerate(subtrees):
+        tree.add_subtree(subtree)
+        assert tree.get_subtrees() == subtrees[:i + 1]
+        for added in subtrees[:i + 1]:
+            assert tree.find_subtree_by_move(added.move) is added
+            # A move in the same column on another row is a different move
+            assert tree.find_subtree_by_move((5, added.move[1])) is None
+
+
+
+def resum(tree: GameTree, sequences: list[tuple[list[tuple[int, int]], float]],
+          prefix: tuple = ()) -> None:
+    """Assert that every node of tree has the number and total score of the sequences
+    through it, counted again from the start."""
+    through = [(moves, score) for moves, score in sequences
+               if tuple(moves[:len(prefix)]) == prefix]
+    assert tree.visits == len(through)
+    assert tree.red_win_probability == pytest.approx(sum(score for _, score in through))
+    for subtree in tree.get_subtrees():
+        resum(subtree, through, prefix + (subtree.move,))
+
+
+def test_totals_match_resummation() -> None:
+    """After every insert, the totals of every node match summing again the games
+    inserted through it."""
+    rng = random.Random(1)
+    tree = GameTree()
+    inserted = []
+    for moves, score in random_sequences(200, 1):
+        tree.insert_move_sequence(moves, score)
+        inserted.append((moves, score))
+        if rng.random() < 0.1:
+            resum(tree, inserted)
+    resum(tree, inserted)
+
+    # Inserting no moves changes nothing
+    tree.insert_move_sequence([], 1.0)
+    resum(tree, inserted)
+
+
+def test_add_subtree_replaces_leaf_totals() -> None:
+    """A leaf's own totals are replaced by those of its first subtree, and later
+    subtrees add to theirs."""
+    sequences = [(moves, score) for moves, score in random_sequences(100, 2)
+                 if len(moves) > 1 and moves[0][1] != 6]
+    subtrees = {}
+    for moves, score in sequences:
+        subtrees.setdefault(moves[0], GameTree(moves[0], False))
+        subtrees[moves[0]].insert_move_sequence(moves[1:], score)
+
+    tree = GameTree(red_win_probability=5.0)
+    tree.visits = 3
+    for subtree in subtrees.values():
+        tree.add_subtree(subtree)
+    resum(tree, sequences)
+
+    extra = GameTree((6, 6), False)
+    extra.insert_move_sequence([(6, 0)], -1.0)
+    tree.add_subtree(extra)
+    resum(tree, sequences + [([(6, 6), (6, 0)], -1.0)])
@@ -0,0 +1,113 @@
+"""CSC111 Winter 2021 Project, Monte Carlo Tree Search tests
+
+MCTSPlayer is checked to select children by their UCT scores, to keep consistent
+visit counts, and to carry its search tree over to the next move.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import math
+import random
+
+from board import Board
+from conftest import random_unfinished_position
+from game_tree import GAME_START_MOVE, MCTSNode
+from players import MCTSPlayer
+
+
+def check_visits(node: MCTSNode, is_root: bool) -> None:
+    """Assert that every game through node, other than the one that expanded it,
+    went on through one of its children, unless the game ended at node."""
+    total = sum(child.visits for child in node.children.values())
+    if node.children != {}:
+        assert node.visits == total + (0 if is_root else 1)
+    for child in node.children.values():
+        assert 0 <= child.wins <= child.visits
+        check_visits(child, False)
+
+
+def test_select_child_uses_uct() -> None:
+    """select_child picks the child with the highest win rate plus exploration bonus."""
+    rng = random.Random(0)
+    for _ in range(50):
+        parent = MCTSNode(GAME_START_MOVE, 2, 0)
+        for col in range(7):
+            child = MCTSNode((6, col), 1, col)
+            child.visits = rng.randint(1, 100)
+            child.wins = rng.randint(0, child.visits)
+            parent.children[col] = child
+            parent.visits += child.visits
+
+        exploration = rng.choice([0.0, 0.5, math.sqrt(2)])
+        expected = max(parent.children.values(),
+                       key=lambda c: c.wins / c.visits
+                       + exploration * math.sqrt(math.log(parent.visits) / c.visits))
+        assert parent.select_child(exploration) is expected
+
+
+def test_update_counts_wins_for_the_mover() -> None:
+    """A node counts a win for the player who made its move, and half a win for a draw."""
+    node = MCTSNode((6, 3), 2, 0)
+    for winner in ['Yellow', 'Red', 'Draw', 'Yellow']:
+        node.update(winner)
+    assert (node.visits, node.wins) == (4, 2.5)
+
+
+def test_search_visits_are_consistent() -> None:
+    """Each search adds one visit to the root, and the visits of the tree add up."""
+    rng = random.Random(1)
+    for _ in range(5):
+        game = random_unfinished_position(7, 2 * rng.randint(0, 10), rng)
+        grid = [row[:] for row in game.board]
+        player = MCTSPlayer(use_book=False)
+        root = player._find_root(game, game.last_move)
+        for _ in range(300):
+            player._search(game, root)
+
+        assert game.board == grid
+        assert root.visits == 300
+        assert set(root.children) == {col for _, col in game.get_valid_moves()}
+        check_visits(root, True)
+
+
+def test_tree_is_reused_after_opponent_move() -> None:
+    """After make_move and an opponent move, the search carries on from the stored node
+    of that move, with its visits."""
+    rng = random.Random(2)
+    player = MCTSPlayer(use_book=False)
+    game = Board(7)
+    move = player.make_move(game, None, num_sims=50)
+    game.drop_piece(move[0], move[1], 1)
+    chosen = player._root
+    assert chosen.move == move
+    assert chosen.zobrist_hash == game.zobrist_hash
+
+    reply = rng.choice(game.get_valid_moves())
+    game.drop_piece(reply[0], reply[1], 2)
+    stored = chosen.children[reply[1]]
+    visits = stored.visits
+    assert visits > 0
+
+    root = player._find_root(game, reply)
+    assert root is stored
+    assert root.visits == visits
+
+    # The next search adds its games to the stored node
+    player.make_move(game, reply, num_sims=10)
+    assert stored.visits == visits + 10 * len(game.get_valid_moves())
+
+
+def test_new_tree_for_unknown_position() -> None:
+    """A position that is not in the stored tree gets a new, unvisited root."""
+    rng = random.Random(3)
+    player = MCTSPlayer(use_book=False)
+    game = Board(7)
+    player.make_move(game, None, num_sims=20)
+
+    other = random_unfinished_position(7, 6, rng)
+    root = player._find_root(other, other.last_move)
+    assert root.visits == 0
+    assert root.zobrist_hash == other.zobrist_hash
+    assert root.piece == (2 if other.is_red_active else 1)
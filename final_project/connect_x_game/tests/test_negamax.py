@@ -0,0 +1,80 @@
+"""CSC111 Winter 2021 Project, negamax tests
+
+The alpha-beta search of NegamaxPlayer is checked against a plain minimax search
+with the same evaluation on random positions.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+from board import Board
+from conftest import random_unfinished_position
+from players import WIN_SCORE, NegamaxPlayer, evaluate
+
+
+def minimax(game: Board, depth: int) -> float:
+    """Return the value of game for the player to move, searched depth moves ahead
+    without pruning, scored the same way as NegamaxPlayer."""
+    winner = game.get_winner()
+    if winner == 'Draw':
+        return 0
+    elif winner is not None:
+        return -(WIN_SCORE + depth)
+
+    piece = 1 if game.is_red_active else 2
+    if depth == 0:
+        return evaluate(game, piece)
+
+    best = None
+    for row, col in game.get_valid_moves():
+        game.drop_piece(row, col, piece)
+        value = -minimax(game, depth - 1)
+        game.undo_move()
+        if best is None or value > best:
+            best = value
+
+    return best
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3, 4])
+def test_search_matches_minimax(depth: int) -> None:
+    """The root value matches minimax, and the move returned reaches that value."""
+    rng = random.Random(depth)
+    for _ in range(8):
+        game = random_unfinished_position(7, rng.randint(0, 30), rng)
+        grid = [row[:] for row in game.board]
+        expected = minimax(game, depth)
+
+        player = NegamaxPlayer(use_book=False)
+        player._start_search(game, None, None)
+        value, move = player._search_root(game, depth)
+
+        assert value == expected
+        assert game.board == grid
+
+        piece = 1 if game.is_red_active else 2
+        game.drop_piece(move[0], move[1], piece)
+        assert -minimax(game, depth - 1) == expected
+        game.undo_move()
+
+
+def test_make_move_is_best_at_max_depth() -> None:
+    """Without a time budget, make_move returns a move with the best minimax value
+    max_depth moves ahead, including when it takes a win or makes the only block."""
+    rng = random.Random(0)
+    player = NegamaxPlayer(max_depth=2, use_book=False)
+    for _ in range(30):
+        game = random_unfinished_position(7, rng.randint(4, 30), rng)
+        move = player.make_move(game, game.last_move)
+        assert move in game.get_valid_moves()
+
+        piece = 1 if game.is_red_active else 2
+        expected = minimax(game, 2)
+        game.drop_piece(move[0], move[1], piece)
+        assert -minimax(game, 1) == expected
+        game.undo_move()
@@ -0,0 +1,87 @@
+"""CSC111 Winter 2021 Project, opening book tests
+
+Book files are checked to read back what was written, and the opening books of
+the project are checked to only give valid moves.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import os
+import random
+
+import pytest
+
+from board import Board
+from opening_book import PositionBook, book_move, book_path, get_opening_book, write_book
+
+
+def test_write_and_read_book(tmp_path) -> None:
+    """Every entry written can be looked up, and no other key is found."""
+    rng = random.Random(0)
+    entries = {rng.getrandbits(64): rng.randrange(256) for _ in range(1000)}
+    path = os.path.join(str(tmp_path), 'book', 'test.bin')
+    write_book(path, 7, entries)
+
+    book = PositionBook(path)
+    assert len(book) == len(entries)
+    assert list(book.items()) == sorted(entries.items())
+    for key, value in entries.items():
+        assert book.lookup(key) == value
+    for _ in range(1000):
+        key = rng.getrandbits(64)
+        if key not in entries:
+            assert book.lookup(key) is None
+
+    # A closed book sees the file written after it
+    write_book(path, 7, {1: 2})
+    book.close()
+    assert list(book.items()) == [(1, 2)]
+    book.close()
+
+
+def test_missing_book_is_empty(tmp_path) -> None:
+    """A book whose file does not exist has no positions."""
+    book = PositionBook(os.path.join(str(tmp_path), 'missing.bin'))
+    assert len(book) == 0
+    assert book.lookup(123) is None
+    assert list(book.items()) == []
+
+
+@pytest.mark.parametrize('contents', [b'', b'CXBK', b'NOPE' + bytes(8), 'cut short'])
+def test_bad_book_file(tmp_path, contents) -> None:
+    """A file that is not a whole book file raises ValueError."""
+    path = os.path.join(str(tmp_path), 'bad.bin')
+    if contents == 'cut short':
+        write_book(path, 7, {1: 2, 3: 4})
+        with open(path, 'rb') as file:
+            contents = file.read()[:-1]
+    with open(path, 'wb') as file:
+        file.write(contents)
+
+    with pytest.raises(ValueError):
+        len(PositionBook(path))
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_opening_book_moves_are_valid(size: int) -> None:
+    """Each project book is not empty, and following its moves from the empty board,
+    and from random games, only ever gives valid moves."""
+    assert os.path.exists(book_path(size))
+    assert len(get_opening_book(size)) > 0
+
+    rng = random.Random(size)
+    for game_number in range(20):
+        game = Board(size)
+        piece = 1
+        while game.get_winner() is None:
+            move = book_move(game)
+            if move is None:
+                break
+            assert move in game.get_valid_moves()
+            # Leave the book line now and then to reach other book positions
+            if game_number > 0 and rng.random() < 0.3:
+                move = rng.choice(game.get_valid_moves())
+            game.drop_piece(move[0], move[1], piece)
+            piece = 3 - piece
@@ -0,0 +1,112 @@
+"""CSC111 Winter 2021 Project, player tests
+
+The simulations sent to the worker processes are checked to rebuild the same
+game, and every searching player is checked to return a valid move within its
+time budget.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+import time
+
+import pytest
+
+import players
+import tactics
+from board import Board
+from conftest import random_position, random_unfinished_position
+from players import MCTSPlayer, MonteCarloFreeVersion, NegamaxPlayer, SabotagePlayer, \
+    simulate_batch
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_get_moves_rebuilds_board(size: int) -> None:
+    """Dropping the pieces of get_moves on an empty board gives the same position."""
+    rng = random.Random(size)
+    for _ in range(20):
+        game = random_position(size, rng.randint(0, size * size), rng)
+        rebuilt = Board(size)
+        for row, col, piece in game.get_moves():
+            rebuilt.drop_piece(row, col, piece)
+
+        assert rebuilt.board == game.board
+        assert rebuilt.zobrist_hash == game.zobrist_hash
+        assert rebuilt.is_red_active == game.is_red_active
+        assert rebuilt.last_move == game.last_move
+        assert rebuilt.get_winner() == game.get_winner()
+
+
+@pytest.mark.parametrize('use_numpy', [False, True])
+def test_simulate_batch_scores(use_numpy: bool) -> None:
+    """A move that wins at once scores every game, and no move scores more games
+    than were simulated."""
+    rng = random.Random(0)
+    tested = 0
+    while tested < 5:
+        game = random_unfinished_position(7, 2 * rng.randint(3, 15), rng)
+        wins = tactics.winning_moves(game, 1)
+        if wins == []:
+            continue
+
+        moves = game.get_valid_moves()
+        scores, rave = simulate_batch(Board, 7, game.get_moves(), moves, 10, use_numpy,
+                                      use_rave=not use_numpy)
+        assert len(scores) == len(moves)
+        for move, score in zip(moves, scores):
+            assert -10 <= score <= 10
+            if move in wins:
+                assert score == 10
+        assert (rave is None) == use_numpy
+        tested += 1
+
+
+@pytest.mark.parametrize('size', [7, 11])
+@pytest.mark.parametrize('make_player', [
+    lambda: MonteCarloFreeVersion(use_book=False),
+    lambda: MonteCarloFreeVersion(vectorised_rollouts=True, use_book=False),
+    lambda: MonteCarloFreeVersion(use_book=False, adaptive=True),
+    lambda: MCTSPlayer(use_book=False),
+    lambda: NegamaxPlayer(use_book=False),
+    lambda: SabotagePlayer(),
+], ids=['monte_carlo', 'vectorised', 'adaptive', 'mcts', 'negamax', 'sabotage'])
+def test_timed_move(size: int, make_player) -> None:
+    """A player given a time budget returns a valid move well within it and leaves
+    the game unchanged."""
+    rng = random.Random(size)
+    player = make_player()
+    for num_moves in (0, 2 * size):
+        game = random_unfinished_position(size, num_moves, rng)
+        grid = [row[:] for row in game.board]
+
+        start = time.perf_counter()
+        move = player.make_move(game, game.last_move, time_budget_ms=200)
+        elapsed = time.perf_counter() - start
+
+        assert move in game.get_valid_moves()
+        assert game.board == grid
+        assert elapsed < 1.0
+
+
+def test_worker_processes_start_with_the_player() -> None:
+    """The worker processes are running once the player is built, so the first timed
+    move does not wait for them to start."""
+    player = MonteCarloFreeVersion(workers=2, use_book=False)
+    assert len(players._POOLS[2]._processes) == 2
+
+    game = Board(9)
+    start = time.perf_counter()
+    move = player.make_move(game, None, time_budget_ms=200)
+    assert move in game.get_valid_moves()
+    assert time.perf_counter() - start < 1.0
+
+
+def test_book_defaults() -> None:
+    """The difficulty levels that came before the books leave them off by default,
+    and the searching players added with them use them."""
+    assert not SabotagePlayer()._use_book
+    assert not MonteCarloFreeVersion()._use_book
+    assert MCTSPlayer()._use_book
+    assert NegamaxPlayer()._use_book
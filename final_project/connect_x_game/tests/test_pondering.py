@@ -0,0 +1,101 @@
+"""CSC111 Winter 2021 Project, pondering tests
+
+The players that think on the user's time are checked to stop promptly when
+asked, to keep their work for the next move, and to stop on their own before
+they use too much memory.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+import threading
+import time
+
+import pytest
+
+import players
+from board import Board
+from conftest import random_unfinished_position
+from connectX import start_pondering, stop_pondering
+from players import MCTSPlayer, NegamaxPlayer, RandomPlayer
+
+
+@pytest.mark.parametrize('make_player', [
+    lambda: MCTSPlayer(use_book=False),
+    lambda: NegamaxPlayer(use_book=False),
+    RandomPlayer,
+], ids=['mcts', 'negamax', 'random'])
+def test_ponder_stops_promptly(make_player) -> None:
+    """Pondering stops soon after it is asked to, and does not change the game."""
+    game = random_unfinished_position(7, 6, random.Random(0))
+    grid = [row[:] for row in game.board]
+    player = make_player()
+
+    pondering = start_pondering(player, game)
+    time.sleep(0.2)
+    thread = pondering[0]
+    start = time.perf_counter()
+    pondered_ms = stop_pondering(pondering)
+
+    assert time.perf_counter() - start < 0.1
+    assert not thread.is_alive()
+    assert pondered_ms >= 200
+    assert game.board == grid
+    assert stop_pondering(None) == 0
+
+
+def test_mcts_ponder_is_capped(monkeypatch) -> None:
+    """MCTSPlayer stops pondering by itself once it has made PONDER_ITERATIONS searches."""
+    monkeypatch.setattr(players, 'PONDER_ITERATIONS', 500)
+    player = MCTSPlayer(use_book=False)
+    game = Board(7)
+    stop = threading.Event()
+
+    player.ponder(game, stop)
+    assert player._root.visits == 500
+
+    # Another call carries on with the same tree
+    player.ponder(game, stop)
+    assert player._root.visits == 1000
+
+
+def test_mcts_move_reuses_pondered_tree() -> None:
+    """The search made while pondering is used by the move after the user's reply."""
+    player = MCTSPlayer(use_book=False)
+    game = Board(7)
+    stop = threading.Event()
+    thread = threading.Thread(target=player.ponder, args=(game, stop))
+    thread.start()
+    time.sleep(0.2)
+    stop.set()
+    thread.join()
+    pondered = player._root
+
+    reply = (6, 3)
+    game.drop_piece(reply[0], reply[1], 1)
+    stored = pondered.children[reply[1]]
+    visits = stored.visits
+    assert visits > 0
+
+    move = player.make_move(game, reply, num_sims=5)
+    assert move in game.get_valid_moves()
+    assert stored.visits == visits + 5 * len(game.get_valid_moves())
+
+
+def test_negamax_ponder_fills_table() -> None:
+    """Pondering NegamaxPlayer stores the position it searched, with its best move."""
+    player = NegamaxPlayer(use_book=False)
+    game = random_unfinished_position(7, 6, random.Random(1))
+    stop = threading.Event()
+    thread = threading.Thread(target=player.ponder, args=(game, stop))
+    thread.start()
+    time.sleep(0.2)
+    stop.set()
+    thread.join()
+
+    entry = player._table.lookup(game.canonical_hash())
+    assert entry is not None
+    assert game.from_canonical(entry.best_move) in game.get_valid_moves()
+    assert player._stop is None
@@ -0,0 +1,140 @@
+"""CSC111 Winter 2021 Project, RAVE tests
+
+The all moves as first statistics are checked against counting them again from
+the recorded games, and rave_blend against its formula.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import math
+import random
+
+import pytest
+
+from conftest import random_position
+from game_tree import GAME_START_MOVE, MCTSNode, RaveStats, rave_blend
+from players import MCTSPlayer
+
+
+def result_for(piece: int, winner: str) -> float:
+    """Return the result of a game won by winner for piece."""
+    if winner == 'Draw':
+        return 0.5
+    return 1.0 if (winner == 'Red') == (piece == 1) else 0.0
+
+
+def random_games(num_games: int, seed: int) -> list[tuple[list[tuple[int, int]], str]]:
+    """Return the moves and winner of num_games random 7x7 games."""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(num_games):
+        game = random_position(7, 49, rng)
+        games.append(([(row, col) for row, col, _ in game.get_moves()], game.get_winner()))
+
+    return games
+
+
+def test_rave_blend_formula() -> None:
+    """rave_blend is the plain win rate without AMAF games, and otherwise the blend
+    with weight sqrt(k / (3n + k)), which tends to the plain win rate as n grows."""
+    rng = random.Random(0)
+    for _ in range(200):
+        visits = rng.randint(1, 1000)
+        wins = rng.uniform(0, visits)
+        amaf_visits = rng.randint(1, 1000)
+        amaf_wins = rng.uniform(0, amaf_visits)
+        k = rng.uniform(0.1, 1000)
+
+        assert rave_blend(wins, visits, amaf_wins, 0, k) == wins / visits
+        assert rave_blend(wins, visits, amaf_wins, amaf_visits, 0) == wins / visits
+
+        beta = math.sqrt(k / (3 * visits + k))
+        expected = (1 - beta) * wins / visits + beta * amaf_wins / amaf_visits
+        assert rave_blend(wins, visits, amaf_wins, amaf_visits, k) == pytest.approx(expected)
+
+    # With one visit, the AMAF rate is weighted by sqrt(k / (3 + k))
+    assert rave_blend(0, 1, 10, 10, 3) == pytest.approx(math.sqrt(0.5))
+    # With many visits, the AMAF rate barely counts
+    assert rave_blend(10 ** 8, 2 * 10 ** 8, 10, 10, 1) == pytest.approx(0.5, abs=1e-4)
+
+
+def test_uct_score_uses_rave_blend() -> None:
+    """A node's UCT score is its blended win rate plus the exploration bonus."""
+    node = MCTSNode((6, 3), 1, 0)
+    for winner in ['Red', 'Yellow', 'Draw', 'Red']:
+        node.update(winner)
+    for winner in ['Red'] * 6 + ['Yellow'] * 2:
+        node.update_amaf(winner)
+    assert (node.amaf_visits, node.amaf_wins) == (8, 6.0)
+
+    for k in (0, 1, 50):
+        assert node.uct_score(20, 0.7, k) == pytest.approx(
+            rave_blend(2.5, 4, 6.0, 8, k) + 0.7 * math.sqrt(math.log(20) / 4))
+
+
+@pytest.mark.parametrize('piece', [1, 2])
+def test_rave_stats_match_recount(piece: int) -> None:
+    """The statistics recorded for every game match counting the games again, and
+    merging two sets of statistics adds them up."""
+    games = random_games(200, piece)
+    halves = [RaveStats(piece), RaveStats(piece)]
+    for i, (moves, winner) in enumerate(games):
+        halves[i % 2].record(moves, winner)
+    stats = RaveStats(piece)
+    stats.merge(halves[0])
+    stats.merge(halves[1])
+
+    visits, wins, amaf_visits, amaf_wins = {}, {}, {}, {}
+    for moves, winner in games:
+        result = result_for(piece, winner)
+        visits[moves[0]] = visits.get(moves[0], 0) + 1
+        wins[moves[0]] = wins.get(moves[0], 0.0) + result
+        for i in range(0, len(moves), 2):
+            amaf_visits[moves[i]] = amaf_visits.get(moves[i], 0) + 1
+            amaf_wins[moves[i]] = amaf_wins.get(moves[i], 0.0) + result
+
+    assert stats.visits == visits
+    assert stats.wins == wins
+    assert stats.amaf_visits == amaf_visits
+    assert stats.amaf_wins == amaf_wins
+    for move in visits:
+        assert stats.value(move, 10) == rave_blend(wins[move], visits[move], amaf_wins[move],
+                                                   amaf_visits[move], 10)
+
+
+def test_update_amaf_matches_recount() -> None:
+    """A game is added to the AMAF statistics of exactly the children, of every node on
+    its path, whose move the same player made later in the game."""
+    rng = random.Random(1)
+    player = MCTSPlayer(use_book=False, rave_equivalence=10)
+    for moves, winner in random_games(100, 3):
+        path_length = rng.randint(1, len(moves))
+        root = MCTSNode(GAME_START_MOVE, 2, 0)
+        path = [root]
+        for i in range(path_length - 1):
+            piece = 1 if i % 2 == 0 else 2
+            node = MCTSNode(moves[i], piece, 0)
+            path[-1].children[moves[i][1]] = node
+            path.append(node)
+
+        # Give every node on the path children for random other moves
+        for i, node in enumerate(path):
+            piece = 1 if i % 2 == 0 else 2
+            for col in rng.sample(range(7), 3):
+                move = (rng.randrange(7), col)
+                if col not in node.children:
+                    node.children[col] = MCTSNode(move, piece, 0)
+
+        player._update_amaf(path, moves[path_length - 1:], winner)
+
+        for i, node in enumerate(path):
+            for child in node.children.values():
+                later = {moves[j] for j in range(i, len(moves))
+                         if (1 if j % 2 == 0 else 2) == child.piece}
+                if child.move in later:
+                    assert child.amaf_visits == 1
+                    assert child.amaf_wins == result_for(child.piece, winner)
+                else:
+                    assert child.amaf_visits == 0
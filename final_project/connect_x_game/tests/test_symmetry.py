@@ -0,0 +1,75 @@
+"""CSC111 Winter 2021 Project, mirror symmetry tests
+
+Random positions are checked against their mirror images, built by playing
+every move in the mirrored column.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+from board import Board
+from conftest import random_position
+from symmetry import canonical_sequence, mirror_move
+
+
+def mirror_board(game: Board) -> Board:
+    """Return the mirror image of game."""
+    mirror = Board(game.size)
+    for row, col, piece in game.get_moves():
+        mirror.drop_piece(row, game.size - 1 - col, piece)
+
+    return mirror
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_mirror_shares_canonical_hash(size: int) -> None:
+    """A position and its mirror image have the same canonical hash, and exactly one
+    of them is mirrored unless they are the same position."""
+    rng = random.Random(size)
+    for _ in range(50):
+        game = random_position(size, rng.randint(0, size * size), rng)
+        mirror = mirror_board(game)
+
+        assert mirror.board == [row[::-1] for row in game.board]
+        assert mirror.zobrist_hash == game.mirror_hash
+        assert mirror.mirror_hash == game.zobrist_hash
+        assert mirror.canonical_hash() == game.canonical_hash()
+        if game.board == mirror.board:
+            assert not game.is_mirrored() and not mirror.is_mirrored()
+        else:
+            assert game.is_mirrored() != mirror.is_mirrored()
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_moves_map_onto_mirror(size: int) -> None:
+    """A move and its mirror image are the same canonical move in the two positions,
+    unless the position is its own mirror image, and from_canonical takes it back."""
+    rng = random.Random(size)
+    games = [Board(size)] + [random_position(size, rng.randint(0, size * size - 1), rng)
+                             for _ in range(50)]
+    for game in games:
+        mirror = mirror_board(game)
+        for move in game.get_valid_moves():
+            canonical = game.to_canonical(move)
+            if game.board == mirror.board:
+                assert canonical == move
+            else:
+                assert mirror.to_canonical(mirror_move(move, size)) == canonical
+                assert mirror.from_canonical(canonical) == mirror_move(move, size)
+            assert game.from_canonical(canonical) == move
+
+
+def test_canonical_sequence_of_mirror() -> None:
+    """A sequence of moves and its mirror image have the same canonical sequence."""
+    rng = random.Random(0)
+    for _ in range(50):
+        game = random_position(7, rng.randint(0, 49), rng)
+        moves = [(row, col) for row, col, _ in game.get_moves()]
+        mirrored = [mirror_move(move, 7) for move in moves]
+        assert canonical_sequence(moves, 7) == canonical_sequence(mirrored, 7)
+        assert canonical_sequence(moves, 7) in (moves, mirrored)
@@ -0,0 +1,112 @@
+"""CSC111 Winter 2021 Project, tactics tests
+
+The tactical checks are compared with trying every move on the board and
+looking for a winner.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+import tactics
+from board import Board
+from conftest import random_unfinished_position
+
+
+def completes_line(game: Board, row: int, col: int, piece: int) -> bool:
+    """Return whether a piece at (row, col) would give piece a line, read straight
+    from the grid."""
+    grid = game.board
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        length = 1
+        for sign in (1, -1):
+            r, c = row + sign * d_row, col + sign * d_col
+            while 0 <= r < game.size and 0 <= c < game.size and grid[r][c] == piece:
+                length += 1
+                r, c = r + sign * d_row, c + sign * d_col
+        if length >= game.winning_lines.connect:
+            return True
+
+    return False
+
+
+def wins_after(game: Board, move: tuple[int, int], piece: int) -> bool:
+    """Return whether piece wins by playing move."""
+    game.drop_piece(move[0], move[1], piece)
+    won = game.winning_move(piece)
+    game.undo_move()
+    return won
+
+
+def brute_winning_moves(game: Board, piece: int) -> list[tuple[int, int]]:
+    """Return the valid moves that win for piece, found by playing each one."""
+    return [move for move in game.get_valid_moves() if wins_after(game, move, piece)]
+
+
+def positions(size: int) -> list[tuple[Board, int]]:
+    """Return random unfinished positions of the given size with the piece to move."""
+    rng = random.Random(size)
+    games = [random_unfinished_position(size, rng.randint(0, size * size // 2), rng)
+             for _ in range(150)]
+    return [(game, 1 if game.is_red_active else 2) for game in games]
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_threat_cells(size: int) -> None:
+    """Every empty cell is a threat exactly when it would complete a line."""
+    for game, _ in positions(size):
+        for piece in (1, 2):
+            expected = {(row, col) for row in range(size) for col in range(size)
+                        if game.board[row][col] == 0 and completes_line(game, row, col, piece)}
+            assert tactics.threat_cells(game, piece) == expected
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_winning_moves_and_blocks(size: int) -> None:
+    """winning_moves and forced_blocks match playing every move."""
+    for game, piece in positions(size):
+        assert tactics.winning_moves(game, piece) == brute_winning_moves(game, piece)
+        assert tactics.forced_blocks(game, piece) == brute_winning_moves(game, 3 - piece)
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_safe_and_unsafe_moves(size: int) -> None:
+    """A move is safe when no reply wins, and unsafe when the reply on top of it wins."""
+    for game, piece in positions(size):
+        grid = [row[:] for row in game.board]
+        safe = []
+        unsafe = []
+        for move in game.get_valid_moves():
+            game.drop_piece(move[0], move[1], piece)
+            if brute_winning_moves(game, 3 - piece) == []:
+                safe.append(move)
+            above = (move[0] - 1, move[1])
+            if above in game.get_valid_moves() and wins_after(game, above, 3 - piece):
+                unsafe.append(move)
+            game.undo_move()
+
+        assert tactics.safe_moves(game, piece) == safe
+        assert tactics.unsafe_moves(game, piece) == unsafe
+        assert game.board == grid
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_double_threats(size: int) -> None:
+    """A double threat does not win at once, but leaves at least two winning moves."""
+    for game, piece in positions(size):
+        grid = [row[:] for row in game.board]
+        expected = []
+        for move in game.get_valid_moves():
+            if wins_after(game, move, piece):
+                continue
+            game.drop_piece(move[0], move[1], piece)
+            if len(brute_winning_moves(game, piece)) >= 2:
+                expected.append(move)
+            game.undo_move()
+
+        assert tactics.double_threats(game, piece) == expected
+        assert game.board == grid
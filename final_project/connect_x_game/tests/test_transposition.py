@@ -0,0 +1,107 @@
+"""CSC111 Winter 2021 Project, Zobrist hashing and transposition table tests
+
+Board hashes are checked against hashing the whole grid, and the replacement
+policies of TranspositionTable are checked slot by slot.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import pytest
+
+from board import Board
+from conftest import random_position
+from transposition import ALWAYS_REPLACE, DEPTH_PREFERRED, EXACT, LOWER_BOUND, \
+    TranspositionTable
+from zobrist import SIDE_KEY, get_zobrist_table
+
+
+def full_hash(game: Board) -> int:
+    """Return the Zobrist hash of game computed from every cell of its grid."""
+    table = get_zobrist_table(game.size)
+    value = 0 if game.is_red_active else SIDE_KEY
+    for row in range(game.size):
+        for col in range(game.size):
+            if game.board[row][col] != 0:
+                value ^= table[game.board[row][col]][row][col]
+
+    return value
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_hash_matches_grid(size: int) -> None:
+    """The hash kept by drop_piece and undo_move is the hash of the whole grid."""
+    rng = random.Random(size)
+    for _ in range(10):
+        game = random_position(size, size * size, rng)
+        assert game.zobrist_hash == full_hash(game)
+        while game.last_move is not None:
+            game.undo_move()
+            assert game.zobrist_hash == full_hash(game)
+        assert game.zobrist_hash == 0
+
+
+def test_transposed_moves_share_a_hash() -> None:
+    """The same position reached in another order of moves has the same hash."""
+    first = Board(7)
+    second = Board(7)
+    for game, cols in ((first, (0, 2, 4, 6)), (second, (4, 6, 0, 2))):
+        for i, col in enumerate(cols):
+            game.drop_piece(game.get_next_open_row(col), col, 1 if i % 2 == 0 else 2)
+
+    assert first.board == second.board
+    assert first.zobrist_hash == second.zobrist_hash
+
+
+def test_depth_preferred_replacement() -> None:
+    """A deeper entry survives a shallower store in the same search, and is replaced
+    by anything once a new search starts."""
+    table = TranspositionTable(16, DEPTH_PREFERRED)
+    table.store(5, 1.0, (6, 3), 4)
+    table.store(21, 2.0, (6, 2), 2)
+    assert table.lookup(5).value == 1.0
+    assert table.lookup(21) is None
+
+    # The same position searched less deeply does not replace it either
+    table.store(5, 3.0, (6, 1), 3)
+    assert table.lookup(5).value == 1.0
+
+    table.store(21, 4.0, (6, 2), 4)
+    assert table.lookup(5) is None
+    assert table.lookup(21).value == 4.0
+
+    table.new_search()
+    assert table.lookup(21).value == 4.0
+    table.store(5, 5.0, (6, 0), 1, LOWER_BOUND)
+    entry = table.lookup(5)
+    assert (entry.value, entry.best_move, entry.depth, entry.flag) == (5.0, (6, 0), 1, LOWER_BOUND)
+    assert table.lookup(21) is None
+
+
+def test_always_replace() -> None:
+    """An always replace table keeps the newest entry of each slot."""
+    table = TranspositionTable(16, ALWAYS_REPLACE)
+    table.store(5, 1.0, (6, 3), 8)
+    table.store(21, 2.0, (6, 2), 1)
+    assert table.lookup(5) is None
+    assert table.lookup(21).value == 2.0
+    assert len(table) == 1
+
+
+def test_best_move_is_kept() -> None:
+    """A store without a best move keeps the best move already stored for the position."""
+    table = TranspositionTable(16)
+    table.store(5, 1.0, (6, 3), 1)
+    table.store(5, 2.0, None, 2, EXACT)
+    assert table.lookup(5).best_move == (6, 3)
+
+    # but not the best move of another position in the same slot
+    table.store(21, 3.0, None, 3)
+    assert table.lookup(21).best_move is None
+
+    table.clear()
+    assert len(table) == 0
+    assert table.lookup(21) is None
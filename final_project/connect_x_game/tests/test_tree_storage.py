@@ -0,0 +1,144 @@
+"""CSC111 Winter 2021 Project, tree storage tests
+
+Tree files are checked to read back the same tree as the GameTree they were
+written from. Every test maps its own files, and the trees loaded are cleared
+afterwards.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import os
+import random
+
+import pytest
+
+import tree_generation
+import tree_storage
+from conftest import random_position
+from game_tree import GameTree
+
+
+@pytest.fixture(autouse=True)
+def fresh_trees(monkeypatch) -> None:
+    """Start every test with no trees loaded, and never keep the ones it loads."""
+    monkeypatch.setattr(tree_storage, '_TREES', {})
+
+
+def random_tree(size: int, num_games: int, seed: int) -> GameTree:
+    """Return a GameTree of num_games random games on a size x size board."""
+    rng = random.Random(seed)
+    tree = GameTree()
+    for _ in range(num_games):
+        game = random_position(size, size * size, rng)
+        winner = game.get_winner()
+        score = 1.0 if winner == 'Red' else -1.0 if winner == 'Yellow' else 0.0
+        tree.insert_move_sequence([(row, col) for row, col, _ in game.get_moves()], score)
+
+    return tree
+
+
+def assert_same_tree(tree: GameTree, mapped: tree_storage.MappedGameTree) -> None:
+    """Assert that the tree read from a tree file is the same as tree."""
+    trees = [(tree, mapped)]
+    while trees:
+        node, mapped_node = trees.pop()
+        assert mapped_node.move == node.move
+        assert mapped_node.is_red_move == node.is_red_move
+        assert mapped_node.red_win_probability == node.red_win_probability
+        assert mapped_node.visits == node.visits
+
+        subtrees = node.get_subtrees()
+        mapped_subtrees = mapped_node.get_subtrees()
+        assert [subtree.move for subtree in mapped_subtrees] \
+            == [subtree.move for subtree in subtrees]
+        for subtree in subtrees:
+            assert mapped_node.find_subtree_by_move(subtree.move).move == subtree.move
+        assert mapped_node.find_subtree_by_move((-1, -1)) is None
+
+        trees.extend(zip(subtrees, mapped_subtrees))
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_write_and_load_tree(tmp_path, size: int) -> None:
+    """A tree read back from its file matches the GameTree node by node."""
+    tree = random_tree(size, 200, size)
+    path = os.path.join(str(tmp_path), 'trees', 'tree.bin')
+    tree_storage.write_tree(path, size, tree)
+
+    mapped = tree_storage.load_tree(path)
+    assert_same_tree(tree, mapped)
+    # A file is only mapped once
+    assert tree_storage.load_tree(path) is mapped
+
+
+def test_missing_tree_file(tmp_path) -> None:
+    """There is no tree without a file."""
+    assert tree_storage.load_tree(os.path.join(str(tmp_path), 'missing.bin')) is None
+
+
+@pytest.mark.parametrize('damage', ['empty', 'header', 'magic', 'version', 'cut short',
+                                    'too long'])
+def test_bad_tree_file(tmp_path, damage: str) -> None:
+    """A file that is not a whole tree file of this format version raises ValueError."""
+    path = os.path.join(str(tmp_path), 'tree.bin')
+    tree_storage.write_tree(path, 7, random_tree(7, 10, 0))
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    if damage == 'empty':
+        data = b''
+    elif damage == 'header':
+        data = data[:tree_storage._HEADER.size - 1]
+    elif damage == 'magic':
+        data = b'NOPE' + data[4:]
+    elif damage == 'version':
+        data = data[:4] + bytes([tree_storage._VERSION + 1]) + data[5:]
+    elif damage == 'cut short':
+        data = data[:-1]
+    else:
+        data = data + bytes(tree_storage._NODE.size)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+    with pytest.raises(ValueError):
+        tree_storage.load_tree(path)
+
+
+def test_tree_path_options() -> None:
+    """The path of a tree file changes with every option the tree is learned with."""
+    probabilities = [1.0, 0.5, 0.0]
+    path = tree_storage.tree_path(7, probabilities, True)
+
+    assert os.path.dirname(path) == tree_storage.CACHE_DIRECTORY
+    assert tree_storage.tree_path(7, list(probabilities), True) == path
+    assert tree_storage.tree_path(7, probabilities, False) != path
+    assert tree_storage.tree_path(9, probabilities, True) != path
+    assert tree_storage.tree_path(7, [1.0, 0.5], True) != path
+
+
+def test_learned_tree_is_learned_again_if_damaged(tmp_path, monkeypatch) -> None:
+    """get_learned_tree saves the tree it learns, and learns it again if the file
+    cannot be read."""
+    monkeypatch.setattr(tree_storage, 'CACHE_DIRECTORY', str(tmp_path))
+    probabilities = [1.0] * 5
+
+    tree = tree_generation.get_learned_tree(probabilities, 7)
+    path = tree_storage.tree_path(7, probabilities, True)
+    assert os.path.dirname(path) == str(tmp_path)
+    assert tree.visits == len(probabilities)
+
+    with open(path, 'r+b') as file:
+        file.truncate(os.path.getsize(path) - 1)
+    monkeypatch.setattr(tree_storage, '_TREES', {})
+
+    tree = tree_generation.get_learned_tree(probabilities, 7)
+    assert tree.visits == len(probabilities)
+    assert os.path.getsize(path) \
+        == tree_storage._HEADER.size + tree_storage._NODE.size * count_nodes(tree)
+
+
+def count_nodes(tree: tree_storage.MappedGameTree) -> int:
+    """Return the number of nodes in tree."""
+    return 1 + sum(count_nodes(subtree) for subtree in tree.get_subtrees())
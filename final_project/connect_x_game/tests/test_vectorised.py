@@ -0,0 +1,94 @@
+"""CSC111 Winter 2021 Project, vectorised game logic tests
+
+The NumPy game logic is checked against Board on random positions of every
+board size, including finished ones.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+import numpy as np
+import pytest
+
+from board import Board
+from conftest import random_position
+from vectorised import DRAW, ONGOING, RED_WIN, WINNER_NAMES, YELLOW_WIN, \
+    batch_rollout, batch_rollout_after, batch_winners, boards_to_array
+
+
+def drawn_board(size: int) -> Board:
+    """Return a full board of the given size with no line of more than two pieces."""
+    game = Board(size)
+    for col in range(size):
+        for row in range(size - 1, -1, -1):
+            game.drop_piece(row, col, 1 + (col // 2 + row) % 2)
+
+    return game
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_batch_winners_match_board(size: int) -> None:
+    """Every winner code matches get_winner, with games stopped at every length."""
+    rng = random.Random(size)
+    boards = [random_position(size, rng.randint(0, size * size), rng) for _ in range(300)]
+    boards.append(drawn_board(size))
+    array = boards_to_array(boards)
+
+    assert array.shape == (len(boards), size, size)
+    assert array.dtype == np.int8
+    for board, grid in zip(boards, array):
+        assert grid.tolist() == board.board
+
+    winners = batch_winners(array)
+    assert [WINNER_NAMES[code] for code in winners] == [board.get_winner() for board in boards]
+    # The positions should cover every kind of result
+    assert set(winners.tolist()) == {ONGOING, RED_WIN, YELLOW_WIN, DRAW}
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_batch_rollout_finishes_games(size: int) -> None:
+    """A rollout from an unfinished position ends every game, and a rollout from a
+    finished position returns its result."""
+    rng = random.Random(size)
+    np_rng = np.random.default_rng(size)
+    for _ in range(10):
+        game = random_position(size, rng.randint(0, size * size), rng)
+        results = batch_rollout(game, 20, np_rng)
+        winner = batch_winners(boards_to_array([game]))[0]
+        if winner == ONGOING:
+            assert ONGOING not in results
+        else:
+            assert (results == winner).all()
+
+
+@pytest.mark.parametrize('size', [7, 9, 11])
+def test_batch_rollout_after_winning_move(size: int) -> None:
+    """The row of a move that wins at once is all wins, and the other rows end every game."""
+    rng = random.Random(size)
+    np_rng = np.random.default_rng(size)
+    tested = 0
+    while tested < 5:
+        game = random_position(size, rng.randint(size, size * size - 1), rng)
+        if game.get_winner() is not None:
+            continue
+        piece = 1 if game.is_red_active else 2
+        moves = game.get_valid_moves()
+        winners = []
+        for row, col in moves:
+            game.drop_piece(row, col, piece)
+            winners.append(game.get_winner())
+            game.undo_move()
+        if 'Red' not in winners and 'Yellow' not in winners:
+            continue
+
+        results = batch_rollout_after(game, moves, 30, np_rng)
+        assert results.shape == (len(moves), 30)
+        for winner, row in zip(winners, results):
+            if winner is None:
+                assert ONGOING not in row
+            else:
+                assert [WINNER_NAMES[code] for code in row] == [winner] * len(row)
+        tested += 1
@@ -0,0 +1,132 @@
+"""CSC111 Winter 2021 Project, Transposition table file
+
+This file contains the TranspositionTable class, a fixed size table
+that search based players use to remember the results of positions
+they have already searched.
+
+Positions are keyed by their Zobrist hash (see zobrist.py), so the same
+position reached through a different order of moves is only searched once.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from typing import NamedTuple, Optional
+
+# Whether a stored value is exact, or only a bound on the true value
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Replacement policies
+DEPTH_PREFERRED = 'depth'
+ALWAYS_REPLACE = 'always'
+
+
+class TableEntry(NamedTuple):
+    """The stored search result of one position
+
+    Instance Attributes:
+        - key: the full Zobrist hash of the position
+        - value: the value of the position for the player to move
+        - best_move: the best move found in the position, or None if it is not known
+        - depth: the depth that the position was searched to
+        - flag: EXACT, LOWER_BOUND or UPPER_BOUND
+        - generation: the search that stored this entry
+    """
+    key: int
+    value: float
+    best_move: Optional[tuple[int, int]]
+    depth: int
+    flag: int
+    generation: int
+
+
+class TranspositionTable:
+    """A bounded transposition table of search results.
+
+    Each position hashes to a single slot. When two positions share a slot, the
+    replacement policy decides which one is kept:
+        - ALWAYS_REPLACE: the newest entry is always kept
+        - DEPTH_PREFERRED: an entry is only replaced by one searched at least
+        as deep, unless it was stored by an earlier search (see new_search)
+
+    Instance Attributes:
+        - capacity: the number of slots in the table
+        - policy: the replacement policy of the table
+
+    Representation Invariants:
+        - self.capacity > 0
+        - self.policy in {DEPTH_PREFERRED, ALWAYS_REPLACE}
+    """
+    capacity: int
+    policy: str
+
+    # Private Instance Attributes:
+    #   - _entries: the slots of the table
+    #   - _generation: the number of times new_search has been called
+    _entries: list[Optional[TableEntry]]
+    _generation: int
+
+    def __init__(self, capacity: int = 1 << 20, policy: str = DEPTH_PREFERRED) -> None:
+        """Initialize an empty table with the given number of slots."""
+        self.capacity = capacity
+        self.policy = policy
+        self._entries = [None] * capacity
+        self._generation = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries stored in this table."""
+        return self.capacity - self._entries.count(None)
+
+    def new_search(self) -> None:
+        """Mark every stored entry as coming from an earlier search.
+
+        Old entries can still be looked up, but a depth preferred table
+        will replace them regardless of their depth.
+        """
+        self._generation += 1
+
+    def clear(self) -> None:
+        """Remove every entry from this table."""
+        self._entries = [None] * self.capacity
+
+    def lookup(self, key: int) -> Optional[TableEntry]:
+        """Return the entry stored for the position with the given hash,
+        or None if there is no such entry."""
+        entry = self._entries[key % self.capacity]
+        if entry is not None and entry.key == key:
+            return entry
+
+        return None
+
+    def store(self, key: int, value: float, best_move: Optional[tuple[int, int]],
+              depth: int, flag: int = EXACT) -> None:
+        """Store the result of searching the position with the given hash,
+        following the replacement policy of this table."""
+        index = key % self.capacity
+        old = self._entries[index]
+
+        if self.policy == DEPTH_PREFERRED and old is not None \
+                and old.generation == self._generation and depth < old.depth:
+            return
+
+        # Keep the best move of a shallower search if this search did not find one
+        if best_move is None and old is not None and old.key == key:
+            best_move = old.best_move
+
+        self._entries[index] = TableEntry(key, value, best_move, depth, flag, self._generation)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
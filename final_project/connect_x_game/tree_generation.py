@@ -10,13 +10,20 @@ Base code for these two functions are retrieved from Assignment 2
 
 This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
 Kevin Vaidyan, and Akash Illangovan."""
-import copy
-
 from typing import Any
-from players import ExploringPlayer, RandomPlayer, run_game
+from players import ExploringPlayer, RandomPlayer, NegamaxPlayer, run_game
 
 import board
 import game_tree
+import opening_book
+import tree_storage
+from symmetry import canonical_sequence
+
+# The number of moves covered by the opening book of each standard board size
+BOOK_PLIES = {7: 4, 9: 3, 11: 3}
+
+# The number of moves NegamaxPlayer searches ahead for each opening book position
+BOOK_SEARCH_DEPTH = 8
 
 
 def generate_complete_game_tree(root_move: tuple[int, int], game_state: board.Board, d: int) \
@@ -55,15 +62,20 @@ def generate_complete_game_tree(root_move: tuple[int, int], game_state: board.Bo
 
         for move in moves:
             if game_state.board[move[0]][move[1]] == 0:
-                # copy the game state and generate a new subtree
-                game_copy = copy.deepcopy(game_state)
-                game_copy.drop_piece(move[0], move[1], piece)
-                tree.add_subtree(generate_complete_game_tree(move, game_copy, d - 1))
+                # make the move, generate a new subtree and then undo the move
+                game_state.drop_piece(move[0], move[1], piece)
+                tree.add_subtree(generate_complete_game_tree(move, game_state, d - 1))
+                game_state.undo_move()
         return tree
 
 
-def run_learning_algorithm(exploration_probabilities: list[float], size: int) -> Any:
+def run_learning_algorithm(exploration_probabilities: list[float], size: int,
+                           symmetric: bool = True) -> Any:
     """Play a sequence of Connect X games using an ExploringPlayer as the Red player.
+
+    If symmetric is True, a game and its mirror image are stored as the same canonical
+    move sequence (see symmetry.canonical_sequence), so the returned tree must be used
+    with ExploringPlayer(..., symmetric=True).
     """
     # Start with a GameTree in the initial state
     tree = game_tree.GameTree()
@@ -73,7 +85,7 @@ def run_learning_algorithm(exploration_probabilities: list[float], size: int) ->
 
     for i in range(len(exploration_probabilities)):
 
-        red = ExploringPlayer(tree, exploration_probabilities[i])
+        red = ExploringPlayer(tree, exploration_probabilities[i], symmetric=symmetric)
         yellow = RandomPlayer()
         winner, move_sequence = run_game(red, yellow, size)
 
@@ -82,20 +94,93 @@ def run_learning_algorithm(exploration_probabilities: list[float], size: int) ->
             red_win_probability = 1.0
 
         results_so_far.append(winner)
+        if symmetric:
+            move_sequence = canonical_sequence(move_sequence, size)
         tree.insert_move_sequence(move_sequence, red_win_probability)
 
-    # board.plot_game_statistics(results_so_far)
+    # rendering.plot_game_statistics(results_so_far)
 
     return (tree, results_so_far)
 
 
+def get_learned_tree(exploration_probabilities: list[float], size: int,
+                     symmetric: bool = True) -> tree_storage.MappedGameTree:
+    """Return the tree learned by
+    run_learning_algorithm(exploration_probabilities, size, symmetric).
+
+    The tree is saved to a tree file the first time it is learned, and every
+    later call loads it from that file instead of learning it again. A file that
+    cannot be read is replaced by learning the tree again.
+    """
+    path = tree_storage.tree_path(size, exploration_probabilities, symmetric)
+    try:
+        tree = tree_storage.load_tree(path)
+    except ValueError:
+        tree = None
+
+    if tree is None:
+        learned_tree = run_learning_algorithm(exploration_probabilities, size, symmetric)[0]
+        tree_storage.write_tree(path, size, learned_tree)
+        tree = tree_storage.load_tree(path)
+
+    return tree
+
+
+def build_opening_book(size: int, plies: int, search_depth: int = BOOK_SEARCH_DEPTH) \
+        -> dict[int, int]:
+    """Return the opening book entries for every position of a size x size board
+    reached in fewer than plies moves.
+
+    Each position is searched search_depth moves ahead by a NegamaxPlayer, and is
+    mapped from its canonical hash to the column of the best move in the canonical
+    position, so a position and its mirror image are only searched once.
+
+    Preconditions:
+        - size >= 7
+        - plies >= 0
+    """
+    player = NegamaxPlayer(search_depth, use_book=False)
+    entries = {}
+    add_book_positions(board.Board(size), player, plies, entries)
+    return entries
+
+
+def add_book_positions(game_state: board.Board, player: NegamaxPlayer, plies: int,
+                       entries: dict[int, int]) -> None:
+    """Add the best move of player for game_state and every position reached from it
+    in fewer than plies moves to entries. game_state is left unchanged."""
+    key = game_state.canonical_hash()
+    # Every way of reaching a position takes the same number of moves,
+    # so a position that is already in the book has had its moves added
+    if plies == 0 or key in entries or game_state.get_winner() is not None:
+        return
+
+    move = player.make_move(game_state, None)
+    entries[key] = game_state.to_canonical(move)[1]
+
+    piece = 1 if game_state.is_red_active else 2
+    for move in game_state.get_valid_moves():
+        game_state.drop_piece(move[0], move[1], piece)
+        add_book_positions(game_state, player, plies - 1, entries)
+        game_state.undo_move()
+
+
+def build_opening_books() -> None:
+    """Build the opening book of every standard board size and save them
+    to opening_book.BOOK_DIRECTORY."""
+    for size, plies in BOOK_PLIES.items():
+        opening_book.write_book(opening_book.book_path(size), size,
+                                build_opening_book(size, plies))
+
+
 if __name__ == '__main__':
     import python_ta
 
     python_ta.check_all(config={
         'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
                           'pprint', 'plotly', 'players', 'tree_generation',
-                          'game_tree', 'copy', 'random', 'menu'],
+                          'game_tree', 'copy', 'random', 'menu', 'symmetry', 'opening_book',
+                          'tree_storage'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['R1705', 'C0200', 'E1136', 'E9999']
@@ -0,0 +1,185 @@
+"""CSC111 Winter 2021 Project, Tree storage file
+
+This file contains functions to save a GameTree to a tree file and load it
+again, so the tree learned by tree_generation.run_learning_algorithm does not
+have to be learned again at the start of every game.
+
+A tree file is a short header followed by one fixed size record per node, in
+breadth first order, so the subtrees of each node are next to each other. The
+file is memory mapped when it is loaded, and a node is only read from the file
+when a player reaches it, so loading takes the same time however big the tree is.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from __future__ import annotations
+from typing import Optional
+
+import hashlib
+import mmap
+import os
+import struct
+
+from game_tree import GameTree
+from opening_book import CACHE_DIRECTORY
+
+# The header of a tree file: the magic bytes, the format version,
+# the size of the board and the number of nodes
+_MAGIC = b'CXGT'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBI')
+
+# A node of a tree file: the row and column of its move, whether Red moves next,
+# its number of subtrees, the index of its first subtree, its number of games
+# and the total score of those games
+_NODE = struct.Struct('<bbBBIId')
+
+# The row and column at the start of a node
+_MOVE = struct.Struct('<bb')
+
+# Trees that have already been loaded, keyed by the path of their file
+_TREES = {}
+
+
+class MappedGameTree:
+    """A read only GameTree stored in a memory mapped tree file.
+
+    It has the same attributes and methods for reading a tree as GameTree,
+    so it can be given to an ExploringPlayer.
+
+    Instance Attributes:
+      - move: the current Connect X move. (-1, -1) as the root move.
+      - is_red_move: True if Red is to make the next move after this, False otherwise
+      - red_win_probability: the total score of the games through this tree
+      - visits: the number of games through this tree
+    """
+    __slots__ = ('move', 'is_red_move', 'red_win_probability', 'visits',
+                 '_data', '_first_subtree', '_num_subtrees')
+    move: tuple[int, int]
+    is_red_move: bool
+    red_win_probability: float
+    visits: int
+
+    # Private Instance Attributes:
+    #  - _data: the memory map of the tree file
+    #  - _first_subtree: the index of the node of the first subtree of this tree
+    #  - _num_subtrees: the number of subtrees of this tree
+    _data: mmap.mmap
+    _first_subtree: int
+    _num_subtrees: int
+
+    def __init__(self, data: mmap.mmap, index: int) -> None:
+        """Initialize the tree of the node with the given index in the tree file data."""
+        row, col, is_red_move, num_subtrees, first_subtree, visits, score = \
+            _NODE.unpack_from(data, _HEADER.size + index * _NODE.size)
+        self.move = (row, col)
+        self.is_red_move = bool(is_red_move)
+        self.red_win_probability = score
+        self.visits = visits
+        self._data = data
+        self._first_subtree = first_subtree
+        self._num_subtrees = num_subtrees
+
+    def get_subtrees(self) -> list[MappedGameTree]:
+        """Return the subtrees of this game tree."""
+        return [MappedGameTree(self._data, self._first_subtree + i)
+                for i in range(self._num_subtrees)]
+
+    def find_subtree_by_move(self, move: tuple[int, int]) -> Optional[MappedGameTree]:
+        """Return the subtree corresponding to the given move.
+
+        Return None if no subtree corresponds to that move.
+        """
+        for i in range(self._first_subtree, self._first_subtree + self._num_subtrees):
+            if _MOVE.unpack_from(self._data, _HEADER.size + i * _NODE.size) == move:
+                return MappedGameTree(self._data, i)
+
+        return None
+
+
+def write_tree(path: str, size: int, tree: GameTree) -> None:
+    """Write a tree file of tree, learned on a size x size board, to path,
+    replacing any file already there.
+
+    The file is written under a temporary name and then renamed, so a tree that
+    has the old file mapped is never left reading a half written one.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Each node is followed by the nodes after it in breadth first order, and its
+    # subtrees are the next ones to be added, so they start at len(nodes)
+    nodes = [tree]
+    records = []
+    for node in nodes:
+        subtrees = node.get_subtrees()
+        row, col = node.move
+        records.append(_NODE.pack(row, col, node.is_red_move, len(subtrees),
+                                  len(nodes) if subtrees else 0, node.visits,
+                                  node.red_win_probability))
+        nodes.extend(subtrees)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, size, len(records)))
+        file.write(b''.join(records))
+
+    os.replace(temp_path, path)
+
+
+def load_tree(path: str) -> Optional[MappedGameTree]:
+    """Return the tree stored in the tree file at path, or None if there is no such file.
+
+    Raise ValueError if the file is not a tree file of this format version, or it
+    has been cut short.
+    """
+    if path in _TREES:
+        return _TREES[path]
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(data) < _HEADER.size:
+        data.close()
+        raise ValueError(f'{path} is not a tree file')
+
+    magic, version, _, count = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION or count == 0 \
+            or len(data) != _HEADER.size + count * _NODE.size:
+        data.close()
+        raise ValueError(f'{path} is not a tree file')
+
+    _TREES[path] = MappedGameTree(data, 0)
+    return _TREES[path]
+
+
+def tree_path(size: int, exploration_probabilities: list[float], symmetric: bool) -> str:
+    """Return the path of the tree file in opening_book.CACHE_DIRECTORY for the tree
+    learned on a size x size board with the given exploration probabilities, storing
+    canonical move sequences if symmetric is True (see run_learning_algorithm).
+
+    Everything that changes the tree or how its file is read is part of the file
+    name, so a file learned with other options or written in another format is
+    never loaded by mistake.
+    """
+    config = (_VERSION, _HEADER.format, _NODE.format, symmetric, list(exploration_probabilities))
+    digest = hashlib.sha256(repr(config).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIRECTORY, f'learned_{size}_{digest}.bin')
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'hashlib', 'mmap', 'os',
+                          'struct', 'opening_book'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
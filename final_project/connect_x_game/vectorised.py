@@ -0,0 +1,230 @@
+"""CSC111 Winter 2021 Project, Vectorised game logic file
+
+This file contains NumPy versions of the Board game logic that work on
+many boards at once.
+
+A batch of boards is an (n_boards, size, size) int8 array laid out the same
+way as Board.board: 0 is an empty cell, 1 is a red piece and 2 is a
+yellow piece, and row 0 is the top of the board.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+from typing import Optional
+
+import numpy as np
+
+from board import Board
+from lines import get_connect_length
+
+# Winner codes returned by batch_winners
+ONGOING = 0
+RED_WIN = 1
+YELLOW_WIN = 2
+DRAW = 3
+
+# The get_winner result corresponding to each winner code
+WINNER_NAMES = {ONGOING: None, RED_WIN: 'Red', YELLOW_WIN: 'Yellow', DRAW: 'Draw'}
+
+
+def boards_to_array(boards: list[Board]) -> np.ndarray:
+    """Return the given boards stacked into one (len(boards), size, size) int8 array.
+
+    Preconditions:
+        - boards != []
+        - all(board.size == boards[0].size for board in boards)
+    """
+    return np.array([board.board for board in boards], dtype=np.int8)
+
+
+def batch_winners(boards: np.ndarray) -> np.ndarray:
+    """Return the winner code of every board in the (n_boards, size, size) array boards.
+
+    The result matches Board.get_winner for each board: Red is reported if both
+    colours have a line, and a board is a draw if its top row is full and
+    nobody has won.
+    """
+    size = boards.shape[1]
+    connect = get_connect_length(size)
+
+    winners = np.full(boards.shape[0], ONGOING, dtype=np.int8)
+    winners[np.all(boards[:, 0, :] != 0, axis=1)] = DRAW
+    # Red is assigned last so it takes priority, the same as get_winner
+    winners[has_line(boards == 2, connect)] = YELLOW_WIN
+    winners[has_line(boards == 1, connect)] = RED_WIN
+
+    return winners
+
+
+def has_line(pieces: np.ndarray, connect: int) -> np.ndarray:
+    """Return a boolean array of whether each board in pieces has connect
+    pieces in a row.
+
+    pieces is an (n_boards, size, size) boolean array of the cells holding one colour.
+    Every window of connect cells along the four directions is summed at once
+    by adding together connect shifted slices of the board.
+    """
+    size = pieces.shape[1]
+    cells = pieces.astype(np.uint8)
+    span = size - connect + 1
+
+    horizontal = np.zeros((pieces.shape[0], size, span), dtype=np.uint8)
+    vertical = np.zeros((pieces.shape[0], span, size), dtype=np.uint8)
+    diagonal = np.zeros((pieces.shape[0], span, span), dtype=np.uint8)
+    anti_diagonal = np.zeros((pieces.shape[0], span, span), dtype=np.uint8)
+
+    for n in range(connect):
+        horizontal += cells[:, :, n:n + span]
+        vertical += cells[:, n:n + span, :]
+        diagonal += cells[:, n:n + span, n:n + span]
+        anti_diagonal += cells[:, n:n + span, connect - 1 - n:size - n]
+
+    return np.any(horizontal == connect, axis=(1, 2)) \
+        | np.any(vertical == connect, axis=(1, 2)) \
+        | np.any(diagonal == connect, axis=(1, 2)) \
+        | np.any(anti_diagonal == connect, axis=(1, 2))
+
+
+def batch_rollout(game: Board, num_games: int,
+                  rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Play num_games random games to completion from the position of game and
+    return the winner code of each one.
+
+    Every game is advanced in lock-step as one (num_games, size, size) array. On each
+    ply, a random legal column is picked for every game that is still in progress,
+    the pieces are dropped with fancy indexing, and the games that were just won
+    are retired. Since all of the games start from the same position, they all
+    have the same number of pieces, so a board that fills up is a draw at the same ply.
+
+    game is not changed.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    start = np.array(game.board, dtype=np.int8)
+    boards = np.repeat(start[np.newaxis], num_games, axis=0)
+    heights = np.repeat(np.count_nonzero(start, axis=0)[np.newaxis], num_games, axis=0)
+
+    winner = batch_winners(start[np.newaxis])[0]
+    results = np.full(num_games, winner, dtype=np.int8)
+    if winner != ONGOING:
+        return results
+
+    _play_out(boards, heights, results, np.arange(num_games), int(np.count_nonzero(start)),
+              1 if game.is_red_active else 2, rng)
+    return results
+
+
+def batch_rollout_after(game: Board, moves: list[tuple[int, int]], num_games: int,
+                        rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Play num_games random games to completion after each of the given moves of the
+    player to move in game, and return the winner codes as a (len(moves), num_games)
+    array, with one row per move.
+
+    The games after every move are advanced together, so one call costs about the
+    same as a single batch_rollout, however many moves there are.
+
+    game is not changed.
+
+    Preconditions:
+        - moves != []
+        - all(move in game.get_valid_moves() for move in moves)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    start = np.array(game.board, dtype=np.int8)
+    piece = 1 if game.is_red_active else 2
+
+    starts = np.repeat(start[np.newaxis], len(moves), axis=0)
+    for i in range(len(moves)):
+        starts[i, moves[i][0], moves[i][1]] = piece
+
+    boards = np.repeat(starts, num_games, axis=0)
+    heights = np.count_nonzero(boards, axis=1)
+    results = np.repeat(batch_winners(starts), num_games)
+
+    # Every board has the same number of pieces, whichever move was made
+    _play_out(boards, heights, results, np.flatnonzero(results == ONGOING),
+              int(np.count_nonzero(start)) + 1, 3 - piece, rng)
+    return results.reshape(len(moves), num_games)
+
+
+def _play_out(boards: np.ndarray, heights: np.ndarray, results: np.ndarray,
+              live: np.ndarray, num_pieces: int, piece: int, rng: np.random.Generator) -> None:
+    """Play the games boards[live] to completion with random moves, starting with
+    piece, and store their winner codes in results.
+
+    heights holds the number of pieces in each column of each board, and every
+    board holds num_pieces pieces.
+    """
+    size = boards.shape[1]
+    connect = get_connect_length(size)
+
+    while live.size > 0:
+        live_heights = heights[live]
+
+        # Pick a uniformly random column that is not full for each game
+        keys = rng.random(live_heights.shape)
+        keys[live_heights == size] = -1.0
+        cols = keys.argmax(axis=1)
+        rows = size - 1 - live_heights[np.arange(live.size), cols]
+
+        boards[live, rows, cols] = piece
+        heights[live, cols] += 1
+        num_pieces += 1
+
+        won = _wins_through(boards, live, rows, cols, piece, connect)
+        results[live[won]] = piece
+        live = live[~won]
+
+        if num_pieces == size * size:
+            results[live] = DRAW
+            break
+
+        piece = 3 - piece
+
+
+def _wins_through(boards: np.ndarray, live: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                  piece: int, connect: int) -> np.ndarray:
+    """Return a boolean array of whether the piece just dropped at (rows[i], cols[i])
+    in boards[live[i]] completed a line of connect pieces.
+
+    Only the four lines through each dropped piece are checked, the same as
+    Board does for its last move.
+    """
+    size = boards.shape[1]
+    won = np.zeros(live.size, dtype=bool)
+
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = np.ones(live.size, dtype=np.int8)
+
+        # Count the matching pieces on both sides of the dropped piece in this direction
+        for sign in (1, -1):
+            running = np.ones(live.size, dtype=bool)
+            for step in range(1, connect):
+                r = rows + sign * step * d_row
+                c = cols + sign * step * d_col
+                inside = (r >= 0) & (r < size) & (c >= 0) & (c < size)
+                running &= inside
+                running[running] = boards[live[running], r[running], c[running]] == piece
+                count += running
+
+        won |= count >= connect
+
+    return won
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu', 'numpy', 'lines'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
@@ -0,0 +1,52 @@
+"""CSC111 Winter 2021 Project, Zobrist hashing file
+
+This file contains the random keys used to hash Connect X
+positions with Zobrist hashing.
+
+A position's hash is the XOR of the key of every piece on the board,
+together with SIDE_KEY if Yellow is to move. Dropping or undoing a piece
+therefore only takes a single XOR to update the hash.
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 Greg Sherman, Ismail Ahmed,
+Kevin Vaidyan, and Akash Illangovan."""
+import random
+
+# The key XORed into the hash whenever the player to move changes
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+# Zobrist tables that have already been generated, keyed by board size
+_TABLES = {}
+
+
+def get_zobrist_table(size: int) -> list[list[list[int]]]:
+    """Return the Zobrist table for a size x size board.
+
+    table[piece][row][col] is the 64-bit key of a piece of the given colour at (row, col).
+    table[0] is unused. The same size always gives the same keys, so hashes can
+    be compared between boards and between runs.
+
+    Preconditions:
+        - size >= 7
+    """
+    if size not in _TABLES:
+        rng = random.Random(size)
+        _TABLES[size] = [[]] + [[[rng.getrandbits(64) for _ in range(size)]
+                                 for _ in range(size)] for _ in range(2)]
+
+    return _TABLES[size]
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'math', 'pygame', 'constants', 'board',
+                          'pprint', 'plotly', 'players', 'tree_generation',
+                          'game_tree', 'copy', 'random', 'menu'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'E1136', 'E9999']
+    })
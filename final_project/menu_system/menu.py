@@ -221,9 +221,17 @@ class DifficultyMenu(Menu):
         the screen
         - cm_y: The y coordinate where the 'Conte Marlo' text appears on
         the screen
+        - mcts_x: The x coordinate where the 'MCTS' text appears on
+        the screen
+        - mcts_y: The y coordinate where the 'MCTS' text appears on
+        the screen
+        - negamax_x: The x coordinate where the 'Negamax' text appears on
+        the screen
+        - negamax_y: The y coordinate where the 'Negamax' text appears on
+        the screen
 
     Representation Invariants:
-        - self.state in {'Random', 'Exploring', 'Sabotage', 'Conte Marlo'}
+        - self.state in {'Random', 'Exploring', 'Sabotage', 'Conte Marlo', 'MCTS', 'Negamax'}
     """
     state: str
     rand_x: float
@@ -234,6 +242,10 @@ class DifficultyMenu(Menu):
     sabo_y: float
     cm_x: float
     cm_y: float
+    mcts_x: float
+    mcts_y: float
+    negamax_x: float
+    negamax_y: float
 
     def __init__(self, game) -> None:
         """Initialize the current Difficulty menu"""
@@ -243,6 +255,8 @@ class DifficultyMenu(Menu):
         self.explore_x, self.explore_y = self.mid_w, self.mid_h + 40
         self.sabo_x, self.sabo_y = self.mid_w, self.mid_h + 60
         self.cm_x, self.cm_y = self.mid_w, self.mid_h + 80
+        self.mcts_x, self.mcts_y = self.mid_w, self.mid_h + 100
+        self.negamax_x, self.negamax_y = self.mid_w, self.mid_h + 120
         self.cursor_rect.midtop = (self.rand_x + self.offset, self.rand_y)
 
     def display_menu(self) -> None:
@@ -258,6 +272,8 @@ class DifficultyMenu(Menu):
             self.game.draw_text("Exploring", 15, self.explore_x, self.explore_y)
             self.game.draw_text("Sabotage", 15, self.sabo_x, self.sabo_y)
             self.game.draw_text("Conte Marlo", 15, self.cm_x, self.cm_y)
+            self.game.draw_text("MCTS", 15, self.mcts_x, self.mcts_y)
+            self.game.draw_text("Negamax", 15, self.negamax_x, self.negamax_y)
             self.draw_cursor()
             self.blit_screen()
 
@@ -270,8 +286,8 @@ class DifficultyMenu(Menu):
             self.run_display = False
         elif self.game.UP_KEY:
             if self.state == 'Random':
-                self.state = 'Conte Marlo'
-                self.cursor_rect.midtop = (self.cm_x + self.offset, self.cm_y)
+                self.state = 'Negamax'
+                self.cursor_rect.midtop = (self.negamax_x + self.offset, self.negamax_y)
             elif self.state == 'Exploring':
                 self.state = 'Random'
                 self.cursor_rect.midtop = (self.rand_x + self.offset, self.rand_y)
@@ -281,6 +297,12 @@ class DifficultyMenu(Menu):
             elif self.state == 'Conte Marlo':
                 self.state = 'Sabotage'
                 self.cursor_rect.midtop = (self.sabo_x + self.offset, self.sabo_y)
+            elif self.state == 'MCTS':
+                self.state = 'Conte Marlo'
+                self.cursor_rect.midtop = (self.cm_x + self.offset, self.cm_y)
+            elif self.state == 'Negamax':
+                self.state = 'MCTS'
+                self.cursor_rect.midtop = (self.mcts_x + self.offset, self.mcts_y)
 
         elif self.game.DOWN_KEY:
             if self.state == 'Random':
@@ -293,6 +315,12 @@ class DifficultyMenu(Menu):
                 self.state = 'Conte Marlo'
                 self.cursor_rect.midtop = (self.cm_x + self.offset, self.cm_y)
             elif self.state == 'Conte Marlo':
+                self.state = 'MCTS'
+                self.cursor_rect.midtop = (self.mcts_x + self.offset, self.mcts_y)
+            elif self.state == 'MCTS':
+                self.state = 'Negamax'
+                self.cursor_rect.midtop = (self.negamax_x + self.offset, self.negamax_y)
+            elif self.state == 'Negamax':
                 self.state = 'Random'
                 self.cursor_rect.midtop = (self.rand_x + self.offset, self.rand_y)
 